@@ -1,13 +1,10 @@
 # app/ai/nl_entry.py
 from __future__ import annotations
-import re
+import asyncio, re
 from typing import Any, Dict
 
-from app.engines.Core import valuation as valuation_engine
-try:
-    from app.engines.Core import market_prediction as market_pred
-except Exception:
-    market_pred = None
+from app.engines import REGISTRY
+from app.engines.executor import run_engine
 
 
 # --- helpers ---------------------------------------------------------------
@@ -36,6 +33,15 @@ def _extract_address(q: str) -> str | None:
 def _detect_pool(q: str) -> bool:
     return "pool" in q.lower()
 
+async def _prediction(params: Dict[str, Any]) -> Dict[str, Any] | None:
+    """Market prediction overlay; optional, so any failure (incl. a busy pool) degrades to status none."""
+    if "market_prediction" not in REGISTRY:
+        return None
+    try:
+        return _unwrap(await run_engine("market_prediction", params))
+    except Exception:
+        return {"status": "none"}
+
 
 # --- main entry ------------------------------------------------------------
 
@@ -73,7 +79,9 @@ async def route_query(prompt: str) -> dict:
             "tokens_outstanding": 1_000_000,
         }
 
-        result = _unwrap(valuation_engine.run(params))
+        # valuation and the prediction overlay are independent: run them side by side, off the event loop
+        result, pred = await asyncio.gather(run_engine("valuation", params), _prediction(params))
+        result = _unwrap(result)
         core = (result.get("core_valuation") or {})
         low, base, high = core.get("low"), core.get("base"), core.get("high")
 
@@ -86,13 +94,6 @@ async def route_query(prompt: str) -> dict:
         else:
             summary = "Got a valuation, but couldn’t format the band."
 
-        pred = None
-        if market_pred:
-            try:
-                pred = _unwrap(market_pred.run(params))
-            except Exception:
-                pred = {"status": "none"}
-
         return {
             "status": "ok",
             "intent": "valuation",
@@ -105,16 +106,13 @@ async def route_query(prompt: str) -> dict:
 
     # 2) market outlook path
     if _looks_like_outlook(prompt):
-        if market_pred is None:
+        if "market_prediction" not in REGISTRY:
             return {
                 "status": "ok",
                 "intent": "market_outlook",
                 "message": "Market prediction engine not available yet.",
             }
-        try:
-            pred = _unwrap(market_pred.run({"query": prompt}))
-        except Exception:
-            pred = {"status": "none"}
+        pred = await _prediction({"query": prompt})
 
         f1w = pred.get("forecast_1w")
         f1m = pred.get("forecast_1m")
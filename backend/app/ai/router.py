@@ -88,11 +88,7 @@ class AgentRouter:
 # -------------------- Direct NL → Engines entry (used by test script) --------------------
 
 import re
-from app.engines.Core import valuation as valuation_engine
-try:
-    from app.engines.Core import market_prediction as market_pred
-except Exception:
-    market_pred = None
+from app.engines import REGISTRY
 
 def _looks_like_valuation(q: str) -> bool:
     return any(kw in q.lower() for kw in ["value", "valuation", "worth", "price", "estimate", "appraise"])
@@ -105,12 +101,8 @@ def _detect_pool(q: str) -> bool:
     return "pool" in q.lower()
 
 # --- Direct query entrypoint (NL → Engines) ---
-import re
-from app.engines.Core import valuation as valuation_engine
-try:
-    from app.engines.Core import market_prediction as market_pred
-except Exception:
-    market_pred = None
+import asyncio
+from app.engines.executor import run_engine
 
 
 def _looks_like_valuation(q: str) -> bool:
@@ -159,7 +151,18 @@ async def route_query(prompt: str) -> dict:
             "tokens_outstanding": 1_000_000,
         }
 
-        result = valuation_engine.run(params)
+        async def _prediction():
+            if "market_prediction" not in REGISTRY:
+                return None
+            try:
+                return await run_engine("market_prediction", params)
+            except Exception:
+                return {"status": "none"}
+
+        # off the event loop; valuation and the prediction overlay run side by side
+        result, pred = await asyncio.gather(run_engine("valuation", params), _prediction())
+        if isinstance(result, tuple):
+            result = result[0]
         core = result.get("core_valuation", {})
         low, base, high = core.get("low"), core.get("base"), core.get("high")
 
@@ -168,13 +171,6 @@ async def route_query(prompt: str) -> dict:
         else:
             summary = "Got a valuation, but couldn’t format the band."
 
-        pred = None
-        if market_pred:
-            try:
-                pred = market_pred.run(params)
-            except Exception:
-                pred = {"status": "none"}
-
         return {
             "status": "ok",
             "intent": "valuation",
@@ -1,7 +1,8 @@
 # app/api/ai.py
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from app.ai.nl_entry import route_query
+from app.engines.executor import EngineBusy
 
 router = APIRouter()
 
@@ -10,4 +11,7 @@ class QueryIn(BaseModel):
 
 @router.post("/ai/query")
 async def ai_query(body: QueryIn):
-    return await route_query(body.prompt)
\ No newline at end of file
+    try:
+        return await route_query(body.prompt)
+    except EngineBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(int(e.retry_after_s))})
@@ -1,6 +1,8 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional
 from app.api.deps import require_admin
 from app.engines import REGISTRY, list_engines  # <-- from __init__.py
 
@@ -22,6 +24,24 @@ class EngineRunOut(BaseModel):
     result: Dict[str, Any] | None = None
     error: str | None = None
 
+class ValuationBatchIn(BaseModel):
+    items: List[Dict[str, Any]]          # ValuationParams dicts
+    ordered: bool = True                 # False → stream results as they complete
+    max_workers: Optional[int] = Field(None, ge=1, le=256)   # further capped at the usable cores
+
+class ValuationSamplesIn(BaseModel):
+    params: Dict[str, Any]               # ValuationParams dict
+    n: int = Field(100_000, ge=1, le=10_000_000)
+    chunk: int = Field(65_536, ge=1, le=1_048_576)
+
+class ValuationCompareIn(BaseModel):
+    params: Dict[str, Any]               # base ValuationParams dict
+    variants: List[Dict[str, Any]]       # [{"name", "macro"?, "progress"?, "liquidity"?, "climate_signals"?}]
+    n: Optional[int] = Field(None, ge=2, le=2_000_000)
+
+class GeocodePrewarmIn(BaseModel):
+    addresses: List[str] = Field(..., max_length=1_000_000)
+
 RUNS: Dict[str, EngineRunOut] = {}
 
 @router.get("/list")
@@ -30,13 +50,16 @@ def list_all_engines():
     return list_engines()
 
 @router.post("/run")
-def run_engine(payload: EngineRunIn):
+async def run_engine(payload: EngineRunIn):
+    from app.engines.executor import EngineBusy, run_engine as run_engine_async
+
     if payload.name not in REGISTRY:
         raise HTTPException(status_code=404, detail="Unknown engine")
-    fn = REGISTRY[payload.name]
 
     try:
-        result = fn(payload.params or {})
+        result = await run_engine_async(payload.name, payload.params or {})
+    except EngineBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(int(e.retry_after_s))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -51,6 +74,113 @@ def run_engine(payload: EngineRunIn):
     RUNS[out.run_id] = out
     return out
 
+@router.post("/valuation/batch")
+def run_valuation_batch(payload: ValuationBatchIn):
+    """
+    Batch valuation fanned out over a process pool.
+    Streams NDJSON, one line per item: {"index", "status", "result" | "errors"}.
+    """
+    from app.engines.Core import valuation
+
+    def lines():
+        for item in valuation.run_batch(payload.items, ordered=payload.ordered, max_workers=payload.max_workers):
+            yield json.dumps(item, default=str) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.post("/valuation/samples")
+def export_valuation_samples(payload: ValuationSamplesIn):
+    """
+    Raw Monte Carlo draws for one valuation, streamed as concatenated .npy record-array
+    chunks (read back with repeated numpy.load on the response body). Columns are listed
+    in the X-Columns header.
+    """
+    from pydantic import ValidationError
+    from app.engines.Core import valuation
+
+    try:
+        columns, chunks = valuation.export_samples(payload.params, n=payload.n, chunk=payload.chunk)
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=ve.errors(include_url=False, include_context=False))
+    return StreamingResponse(
+        chunks,
+        media_type="application/octet-stream",
+        headers={"X-Columns": ",".join(columns), "Content-Disposition": 'attachment; filename="samples.npy"'},
+    )
+
+@router.post("/valuation/compare")
+def compare_valuation_scenarios(payload: ValuationCompareIn):
+    """
+    Overlay variants vs the base request on common random numbers: per-variant band plus
+    paired delta (mean, std_err, ci95, p10/p50/p90 shifts).
+    """
+    from app.engines.Core import valuation
+
+    out = valuation.compare_scenarios(payload.params, payload.variants, n=payload.n)
+    if out.get("status") == "error":
+        raise HTTPException(status_code=422, detail=out.get("errors"))
+    return out
+
+def _cache_scope() -> str:
+    # valuation runs in process-lane workers (app.engines.executor); only the sqlite
+    # backend is shared with them, the memory backend is one cache per process
+    from app.core.config import settings
+    return "shared" if settings.RESULT_CACHE_BACKEND == "sqlite" else "per-process"
+
+@router.get("/valuation/cache")
+def valuation_cache_info():
+    """
+    Result-cache state for valuation.run: backend, entries, bytes, hit/miss counters.
+    With the memory backend these are this process's numbers only (scope "per-process");
+    set RESULT_CACHE_BACKEND=sqlite for one cache shared by every worker.
+    """
+    from app.engines.cache import get_cache
+    return {**get_cache("valuation").info(), "scope": _cache_scope()}
+
+@router.delete("/valuation/cache")
+def valuation_cache_clear():
+    """Clear the valuation cache; with the memory backend, also recycle the process-lane workers holding copies."""
+    from app.engines import executor
+    from app.engines.cache import get_cache
+    get_cache("valuation").clear()
+    recycled = executor.recycle("process") if _cache_scope() == "per-process" else False
+    return {"status": "ok", "scope": _cache_scope(), "workers_recycled": recycled}
+
+@router.post("/geocode/prewarm")
+def geocode_prewarm(payload: GeocodePrewarmIn):
+    """Resolve + persist a bulk address list in the shared geocode cache."""
+    from app.engines.geocode import get_geocoder
+    return get_geocoder().prewarm(payload.addresses)
+
+@router.get("/geocode/cache")
+def geocode_cache_info():
+    from app.engines.geocode import get_geocoder
+    return get_geocoder().info()
+
+@router.get("/models")
+def model_registry_info():
+    """
+    Loaded model artifacts in this process (thread-lane engines): versions, default,
+    sha256, load time, hits. Process-lane workers keep their own registries; each
+    re-checks artifacts every check_interval_s, and DELETE /models recycles them.
+    """
+    from app.engines.model_registry import registry
+    return {**registry.info(), "scope": "per-process"}
+
+@router.delete("/models")
+def model_registry_reload():
+    """Force every process to re-check model artifacts on next use."""
+    from app.engines import executor
+    from app.engines.model_registry import registry
+    registry.invalidate()
+    return {"status": "ok", "workers_recycled": executor.recycle("process")}
+
+@router.get("/executor")
+def engine_executor_info():
+    """Async engine lanes (process/thread): workers, admission limit, calls in flight."""
+    from app.engines import executor
+    return executor.info()
+
 @router.get("/{run_id}/status")
 def run_status(run_id: str):
     if run_id not in RUNS:
@@ -1,5 +1,9 @@
+import os
 from pydantic_settings import BaseSettings
-from pydantic import Field
+from pydantic import Field, field_validator
+
+# backend/ — relative cache paths are anchored here, not to whatever the working directory is
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 class Settings(BaseSettings):
     APP_NAME: str = Field(default="Aurexus API")
@@ -12,9 +16,30 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str = "postgresql+psycopg://aurexus:changeme@db:5432/aurexus"
 
+    # Engine result cache (valuation.run): "memory" per process, or "sqlite" shared by workers on a host.
+    # valuation runs in executor process-lane workers, so only "sqlite" gives one cache (and one
+    # DELETE /engines/valuation/cache) across them; with "memory" clearing recycles those workers.
+    RESULT_CACHE_BACKEND: str = "memory"
+    RESULT_CACHE_DIR: str = os.path.join(_BACKEND_DIR, ".cache")
+    RESULT_CACHE_TTL_S: float = 300.0
+    RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Geocode cache (app.engines.geocode): "sqlite" persists to RESULT_CACHE_DIR/geocode.sqlite, "memory" per process
+    GEOCODE_CACHE_BACKEND: str = "sqlite"
+
+    # Async engine execution (app.engines.executor): pool sizes and how many calls may wait per lane before 429
+    ENGINE_PROCESS_WORKERS: int = 0      # 0 → one per available CPU
+    ENGINE_THREAD_WORKERS: int = 8
+    ENGINE_QUEUE_DEPTH: int = 16
+
     OPENAI_API_KEY: str | None = None
     PERPLEXITY_API_KEY: str | None = None
 
+    @field_validator("RESULT_CACHE_DIR")
+    @classmethod
+    def _absolute_cache_dir(cls, v: str) -> str:
+        return v if os.path.isabs(v) else os.path.join(_BACKEND_DIR, v)
+
     class Config:
         env_file = ".env"
         extra = "ignore"
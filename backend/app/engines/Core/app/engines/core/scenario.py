@@ -1,9 +1,16 @@
 # app/engines/Core/scenario.py
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from itertools import accumulate
 from app.engines import register, REGISTRY
-import math
+import bisect, math
+
+try:
+    import numpy as np
+except Exception:  # numpy is optional — projections fall back to the per-month loop
+    np = None
 
 @dataclass
 class Person:
@@ -25,7 +32,93 @@ def _annuity_rate(apr: float, years: int) -> float:
     if r <= 0: return 1.0 / n
     return (r * (1 + r)**n) / ((1 + r)**n - 1)
 
+# -------------------------- Annuity table --------------------------
+
+# Annuity factors on a 1 bp rate grid, one row per term, built once per process. A row
+# increases with the rate, so "highest rate whose factor is still affordable" is a
+# binary search plus one interpolation, polished with a Newton step on the closed form.
+_GRID_STEP = 0.0001
+_GRID_MAX = 0.30
+
+@lru_cache(maxsize=64)
+def _annuity_row(years: int) -> Tuple[Tuple[float, ...], Any]:
+    """(rates, factors) for one term; factors is a numpy array when numpy is available."""
+    n = int(round(_GRID_MAX / _GRID_STEP)) + 1
+    rates = tuple(i * _GRID_STEP for i in range(n))
+    if np is not None:
+        r = np.array(rates)
+        g = (1.0 + r) ** max(1, years)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            f = np.where(r > 0, r * g / (g - 1.0), 1.0 / max(1, years))
+        return rates, f
+    return rates, tuple(_annuity_rate(r, years) for r in rates)
+
+def annuity_factor(rate: float, years: int) -> float:
+    """Table lookup (linear between 1 bp grid points) for rates on the grid; closed form beyond it."""
+    if rate <= 0 or rate >= _GRID_MAX:
+        return _annuity_rate(rate, years)
+    _rates, f = _annuity_row(years)
+    j = int(rate / _GRID_STEP)
+    w = rate / _GRID_STEP - j
+    return float(f[j] + w * (f[j + 1] - f[j]))
+
+def _newton_polish(r: Any, target: Any, years: int) -> Any:
+    # one Newton step on A(r) - target; A'(r) = g/(g-1) - r*n*(1+r)^(n-1)/(g-1)^2
+    n = max(1, years)
+    g = (1.0 + r) ** n
+    a = r * g / (g - 1.0)
+    da = g / (g - 1.0) - r * n * (1.0 + r) ** (n - 1) / (g - 1.0) ** 2
+    return r - (a - target) / da
+
+def max_affordable_rates(targets: Sequence[float], years: int = 30, cap: float = 0.12) -> Any:
+    """
+    Highest annual rate in [0, cap] with annuity_factor(rate, years) <= target, per target
+    (yearly repayment per $1 borrowed). 0 when even a 0% loan is unaffordable, cap when cap
+    still is. Array in, array out with numpy; list otherwise.
+    """
+    rates, f = _annuity_row(years)
+    f_cap = _annuity_rate(cap, years)
+    if np is not None:
+        t = np.asarray(targets, dtype=float)
+        j = np.clip(np.searchsorted(f, t, side="right") - 1, 0, len(rates) - 2)
+        r = j * _GRID_STEP + (t - f[j]) / (f[j + 1] - f[j]) * _GRID_STEP
+        r = np.clip(r, 0.0, cap)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            polished = _newton_polish(r, t, years)
+        r = np.where((r > 1e-6) & np.isfinite(polished), polished, r)
+        return np.where(t >= f_cap, cap, np.where(t < f[0], 0.0, np.clip(r, 0.0, cap)))
+    out = []
+    for t in targets:
+        if t >= f_cap:
+            out.append(cap)
+            continue
+        if t < f[0]:
+            out.append(0.0)
+            continue
+        j = min(max(bisect.bisect_right(f, t) - 1, 0), len(rates) - 2)
+        r = min(max(j * _GRID_STEP + (t - f[j]) / (f[j + 1] - f[j]) * _GRID_STEP, 0.0), cap)
+        if r > 1e-6:
+            r = _newton_polish(r, t, years)
+        out.append(min(max(r, 0.0), cap))
+    return out
+
+def safe_until_rates(incomes: Sequence[float], dti_max: Sequence[float], lvr_income_share: float = 0.35,
+                     years: int = 30, cap: float = 0.12) -> List[float]:
+    """
+    _safe_until_rate for many borrowers at once (percent, 2 dp). With the loan at
+    income * dti_max and repayments capped at income * share, income cancels: the answer
+    is the highest rate whose annuity factor is <= share / dti_max.
+    """
+    targets = [lvr_income_share / d if (d > 0 and i > 0) else math.inf for i, d in zip(incomes, dti_max)]
+    rates = max_affordable_rates(targets, years, cap)
+    if np is not None:
+        return np.round(np.asarray(rates) * 100, 2).tolist()
+    return [round(r * 100, 2) for r in rates]
+
 def _safe_until_rate(income: float, dti_max: float, lvr_income_share: float = 0.35) -> float:
+    return safe_until_rates([income], [dti_max], lvr_income_share)[0]
+
+def _safe_until_rate_bisect(income: float, dti_max: float, lvr_income_share: float = 0.35) -> float:
     # crude: income * share → max annual repayment, invert annuity to find max rate (solve approx)
     # we’ll search 0%..12%
     repay_cap = income * lvr_income_share
@@ -50,11 +143,33 @@ def _macro_path_array(path: Optional[List[float]], months: int, carry_last=True)
     if carry_last and out: out[-1] = path[-1]
     return out
 
-def _project_affordability(person: Person, macros: Dict[str, Any], months: int = 36) -> List[float]:
-    # Build monthly affordability (max purchase price) under macro paths
-    cash_bps = _macro_path_array(macros.get("cash_rate_path_bps"), months)
-    wages = _macro_path_array(macros.get("wages_path_pct"), months)
-    cpi = _macro_path_array(macros.get("cpi_path_pct"), months)
+MacroArrays = Tuple[List[float], List[float], List[float]]   # (cash_bps, wages_pct, cpi_pct) per month
+
+def _macro_arrays(macros: Dict[str, Any], months: int) -> MacroArrays:
+    return (
+        _macro_path_array(macros.get("cash_rate_path_bps"), months),
+        _macro_path_array(macros.get("wages_path_pct"), months),
+        _macro_path_array(macros.get("cpi_path_pct"), months),
+    )
+
+def _macro_matrix(paths: Sequence[Optional[List[float]]], months: int) -> Any:
+    """_macro_path_array for many paths at once → (len(paths), months); paths of equal length share one index."""
+    out = np.zeros((len(paths), months))
+    m = np.arange(months)
+    by_steps: Dict[int, List[int]] = {}
+    for i, path in enumerate(paths):
+        if path:
+            by_steps.setdefault(len(path), []).append(i)
+    for steps, rows in by_steps.items():
+        idx = np.minimum((m / (months / steps)).astype(np.intp), steps - 1)
+        vals = np.array([paths[i] for i in rows], dtype=float)
+        out[rows] = vals[:, idx]
+        out[rows, -1] = vals[:, -1]     # carry_last
+    return out
+
+def _affordability_series(person: Person, arrays: MacroArrays, months: int) -> List[float]:
+    # Build monthly affordability (max purchase price) under prebuilt macro paths
+    cash_bps, wages, cpi = arrays
     wages_mult = 1.0
     savings = person.savings
 
@@ -79,12 +194,118 @@ def _project_affordability(person: Person, macros: Dict[str, Any], months: int =
         series.append(max(0.0, price_cap * real_trim))
     return series
 
+def _project_affordability(person: Person, macros: Dict[str, Any], months: int = 36) -> List[float]:
+    return _affordability_series(person, _macro_arrays(macros, months), months)
+
+def project_affordability_many(persons: Sequence[Person], macro_idx: Sequence[int],
+                               macro_list: Sequence[Dict[str, Any]], months: int = 36) -> Any:
+    """
+    Affordability paths for many (person, macro path) pairs at once: row i projects
+    persons[i] under macro_list[macro_idx[i]]. Returns a (rows, months) array (nested
+    lists without numpy). Each macro path is expanded to monthly arrays once, however
+    many rows share it; the month recursion becomes cumprod/cumsum along the month axis:
+      income[m]  = income0 * prod_{j<=m}(1 + wages[j]/1200)
+      savings[m] = savings0 + rate/12 * sum_{j<=m} income[j]
+    """
+    if np is None:
+        arrays = [_macro_arrays(mac or {}, months) for mac in macro_list]
+        return [_affordability_series(p, arrays[k], months) for p, k in zip(persons, macro_idx)]
+
+    cash, wages, cpi = (_macro_matrix([(mac or {}).get(key) for mac in macro_list], months)
+                        for key in ("cash_rate_path_bps", "wages_path_pct", "cpi_path_pct"))
+    # per macro path (K × months)
+    wage_mult = np.cumprod(1.0 + (wages / 100.0) / 12.0, axis=1)
+    wage_cum = np.cumsum(wage_mult, axis=1)
+    annual_rate = np.maximum(0.0, cash / 10000.0 + 0.025)
+    growth = (1.0 + annual_rate) ** 30
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pay_rate = np.where(annual_rate > 0, annual_rate * growth / (growth - 1.0), 1.0 / 30)
+    loan_per_income = 0.35 * wage_mult / np.maximum(pay_rate, 1e-6)
+    real_trim = 1 - 0.005 * np.maximum(0.0, cpi - 3.0)
+
+    # per row (rows × 1) against its macro path (rows × months)
+    k = np.asarray(macro_idx, dtype=np.intp)
+    def col(attr: str):
+        return np.array([getattr(p, attr) for p in persons], dtype=float)[:, None]
+    income, savings0, rate, dep = col("income"), col("savings"), col("savings_rate_pct"), col("deposit_pct")
+    savings = savings0 + (income * rate / 12.0) * wage_cum[k]
+    price_cap = income * loan_per_income[k] + savings * dep
+    return np.maximum(0.0, price_cap * real_trim[k])
+
+def affordability_grid(persons: Sequence[Person], macro_list: Sequence[Dict[str, Any]], months: int = 36) -> Any:
+    """persons × macro paths × months (outer product over project_affordability_many)."""
+    P, K = len(persons), len(macro_list)
+    rows = project_affordability_many([p for p in persons for _ in range(K)], [k for _ in range(P) for k in range(K)],
+                                      macro_list, months)
+    if np is None:
+        return [rows[i * K:(i + 1) * K] for i in range(P)]
+    return rows.reshape(P, K, months)
+
 def _unlock_year(price_series: List[float], target_price: float, start_year: int = 2025) -> Optional[int]:
     for i, p in enumerate(price_series):
         if p >= target_price:
             return start_year + int((i+1)/12)
     return None
 
+def unlock_months(rows: Any, targets: Sequence[float], *, per_row: bool = False) -> Any:
+    """
+    First month index each row reaches each target price, or -1 → (rows, targets).
+    With per_row=True, targets[i] is row i's own target → (rows,).
+    The running maximum of a series is sorted and crosses a target in the same month as
+    the series itself, so each lookup is a binary search on it.
+    """
+    if np is not None:
+        cm = np.maximum.accumulate(np.asarray(rows, dtype=float).reshape(len(rows), -1), axis=1)
+        t = np.asarray(targets, dtype=float)
+        if per_row:
+            idx = (cm < t[:, None]).sum(axis=1)     # = searchsorted(row, t_i), all rows at once
+        else:
+            idx = np.stack([np.searchsorted(row, t, side="left") for row in cm]) if len(cm) else np.zeros((0, len(t)), np.intp)
+        return np.where(idx < cm.shape[1], idx, -1)
+    out = []
+    for i, row in enumerate(rows):
+        cm = list(accumulate(row, max))
+        hits = [bisect.bisect_left(cm, t) for t in ([targets[i]] if per_row else targets)]
+        hits = [h if h < len(cm) else -1 for h in hits]
+        out.append(hits[0] if per_row else hits)
+    return out
+
+def _unlock_years(rows: Any, target_price: float, start_year: int = 2025) -> List[Optional[int]]:
+    """_unlock_year for every row of a (rows, months) projection."""
+    return [start_year + int((int(m[0]) + 1) / 12) if m[0] >= 0 else None for m in unlock_months(rows, [target_price])]
+
+# built-in scenarios as person tweaks (run() keeps their historical output keys)
+_SCENARIOS = {
+    "faster_savings": lambda p: replace(p, savings_rate_pct=p.savings_rate_pct * 1.4),
+    "windfall": lambda p: replace(p, savings=p.savings + 50000),     # 50k one-off
+}
+
+def _variant_person(base: Person, v: Dict[str, Any]) -> Person:
+    """Slider variant → person: multipliers/additions on the base person, or absolute overrides."""
+    return Person(
+        income=float(v.get("income", base.income * float(v.get("income_mult", 1.0)))),
+        savings=float(v.get("savings", base.savings + float(v.get("savings_add", 0.0)))),
+        savings_rate_pct=float(v.get("savings_rate_pct", base.savings_rate_pct * float(v.get("savings_rate_mult", 1.0)))),
+        deposit_pct=float(v.get("deposit_pct", base.deposit_pct)),
+        max_dti=float(v.get("max_dti", base.max_dti)),
+    )
+
+def person_from(d: Dict[str, Any]) -> Person:
+    """Person from a request/CSV/JSONL record (missing or blank fields take the defaults)."""
+    return Person(
+        income=float(d.get("income") or 0.0),
+        savings=float(d.get("savings") or 0.0),
+        savings_rate_pct=float(d.get("savings_rate_pct") or 0.0),
+        deposit_pct=float(d.get("deposit_pct") or 0.2),
+        max_dti=float(d.get("max_dti") or 6.0),
+    )
+
+def _gauge(safe_rate: float) -> str:
+    return "green" if safe_rate >= 7.0 else "amber" if safe_rate >= 5.5 else "red"
+
+def _as_list(x: Any) -> List[float]:
+    return x.tolist() if hasattr(x, "tolist") else list(x)
+
 def run(params: Dict[str, Any]) -> Dict[str, Any]:
     body = params or {}
     person_in = body.get("person") or {}
@@ -93,44 +314,48 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
     macros  = body.get("macros") or {}
     scenarios = body.get("scenarios") or ["baseline"]
 
-    person = Person(
-        income=float(person_in.get("income") or 0.0),
-        savings=float(person_in.get("savings") or 0.0),
-        savings_rate_pct=float(person_in.get("savings_rate_pct") or 0.0),
-        deposit_pct=float(person_in.get("deposit_pct") or 0.2),
-        max_dti=float(person_in.get("max_dti") or 6.0),
-    )
+    person = person_from(person_in)
     mort = Mortgage(
         term_years=int(mort_in.get("term_years") or 30),
         risk_tolerance=str(mort_in.get("risk_tolerance") or "medium"),
     )
 
-    months = 36
-    # baseline affordability
-    aff_base = _project_affordability(person, macros, months=months)
-
-    # scenario variants
-    aff_faster = aff_base[:]
-    if "faster_savings" in scenarios:
-        aff_faster = _project_affordability(
-            Person(person.income, person.savings, person.savings_rate_pct*1.4, person.deposit_pct, person.max_dti),
-            macros, months
-        )
-    aff_windfall = aff_base[:]
-    if "windfall" in scenarios:
-        # 50k one-off in month 3
-        p2 = Person(person.income, person.savings+50000, person.savings_rate_pct, person.deposit_pct, person.max_dti)
-        aff_windfall = _project_affordability(p2, macros, months)
+    months = max(1, min(int(body.get("months") or 36), 600))
+    variants = body.get("variants") or []    # [{"name", "income_mult"?, "savings_add"?, "savings_rate_mult"?, ..., "macros"?}]
+
+    # rows: baseline + requested built-in scenarios + slider variants, all in one projection
+    persons = [person] + [_SCENARIOS[s](person) for s in _SCENARIOS if s in scenarios]
+    names = ["baseline"] + [s for s in _SCENARIOS if s in scenarios]
+    macro_list = [macros]
+    macro_idx = [0] * len(persons)
+    for v in variants:
+        persons.append(_variant_person(person, v))
+        if v.get("macros"):
+            macro_list.append({**macros, **v["macros"]})
+            macro_idx.append(len(macro_list) - 1)
+        else:
+            macro_idx.append(0)
+    rows = project_affordability_many(persons, macro_idx, macro_list, months)
+    by_name = dict(zip(names, rows))
+
+    aff_base = _as_list(by_name["baseline"])
+    # built-in scenarios not requested mirror the baseline
+    aff_faster = _as_list(by_name.get("faster_savings", aff_base))
+    aff_windfall = _as_list(by_name.get("windfall", aff_base))
 
     # target suburb pricing (ask comps engine for an anchor)
     anchor_prices = []
-    for tgt in targets[:3]:
-        suburb = tgt.get("suburb") or "Unknown"
-        comps = REGISTRY.get("comps")
+    suburbs = [tgt.get("suburb") or "Unknown" for tgt in targets[:3]]
+    comps_batch = REGISTRY.get("comps_batch")
+    comps_results = []
+    if comps_batch and suburbs:
+        # one comps pass for all targets
+        resp = comps_batch({"subjects": [{"address": f"{s}", "radius_miles": 1.0, "limit": 8} for s in suburbs]}) or {}
+        comps_results = resp.get("results") or []
+    for i, suburb in enumerate(suburbs):
         med_price = None
-        if comps:
-            resp = comps({"address": f"{suburb}", "radius_miles": 1.0, "limit": 8}) or {}
-            comp_list = resp.get("comps") or []
+        if i < len(comps_results):
+            comp_list = comps_results[i].get("comps") or []
             psf = [c["price"]/max(c["sqft"] or 1, 1) for c in comp_list if c.get("price") and c.get("sqft")]
             if psf:
                 med_psf = sorted(psf)[len(psf)//2]
@@ -141,14 +366,27 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
     first_target = anchor_prices[0] if anchor_prices else {"median_guess": None, "suburb": "N/A"}
     target_price = float(first_target["median_guess"] or 2000000.0)
 
+    unlock_rows = _unlock_years(rows, target_price)
     unlock = {
-        "baseline": _unlock_year(aff_base, target_price),
+        "baseline": unlock_rows[0],
         "faster_savings": _unlock_year(aff_faster, target_price),
         "windfall": _unlock_year(aff_windfall, target_price),
     }
+    n_fixed = len(names)
+    variant_out = [
+        {"name": str(v.get("name") or f"variant_{i}"), "unlock_year": unlock_rows[n_fixed + i],
+         "affordability": _as_list(rows[n_fixed + i])}
+        for i, v in enumerate(variants)
+    ]
+
+    # each target against its own anchor price (same 2M default when comps have none)
+    targets_out = []
+    for anchor in anchor_prices:
+        price = float(anchor["median_guess"] or 2000000.0)
+        targets_out.append({"suburb": anchor["suburb"], "unlock_year": _unlock_year(aff_base, price), "current_median": price})
 
     safe_rate = _safe_until_rate(person.income, person.max_dti)
-    gauge = "green" if safe_rate >= 7.0 else "amber" if safe_rate >= 5.5 else "red"
+    gauge = _gauge(safe_rate)
 
     return {
         "status": "ok",
@@ -159,7 +397,8 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
             "affordability_windfall": aff_windfall,
             "safe_until_rate": safe_rate
         },
-        "targets": [{"suburb": a["suburb"], "unlock_year": unlock.get("baseline"), "current_median": target_price}],
+        "variants": variant_out,
+        "targets": targets_out,
         "stress_gauge": gauge,
         "ai_summary": "stub"  # replaced by ai_explainer later
     }
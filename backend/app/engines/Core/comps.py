@@ -1,21 +1,26 @@
 # app/engines/Core/comps.py
 from __future__ import annotations
-import csv, math, random, statistics, os
-from typing import Any, Dict, List, Optional, Tuple
+import csv, heapq, math, random, statistics, os, threading, time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from app.engines import register
+from app.engines import geocode as _geo
+from app.engines import workers
+from app.engines.Core import quantiles as _q
+
+try:
+    import numpy as np
+except Exception:  # numpy is optional — enrichment falls back to the per-comp loop
+    np = None
 
 # ----------------------------- Helpers -----------------------------
 
 def _seed_from_address(addr: str) -> int:
-    return abs(hash((addr or "").lower())) % (2**32)
+    return _geo.address_seed(addr)
 
 def _fake_lat_lon(addr: str) -> tuple[float, float]:
-    # Cheap, deterministic "geocode"
-    h = _seed_from_address(addr)
-    # Roughly AU-ish bbox; harmless for offline dev
-    lat = -37.0 + (h % 1000) / 1000.0 * 10.0    # -37 .. -27
-    lon = 144.0 + ((h >> 10) % 1000) / 1000.0 * 10.0  # 144 .. 154
-    return (round(lat, 6), round(lon, 6))
+    # Cheap, deterministic "geocode" (cached + shared across workers by app.engines.geocode)
+    return _geo.geocode(addr)
 
 def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     R = 6371.0
@@ -28,7 +33,7 @@ def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
 def _iqr_bounds(xs: List[float]) -> Tuple[float, float]:
     if len(xs) < 4:
         return (min(xs, default=0.0), max(xs, default=0.0))
-    q1, q3 = statistics.quantiles(xs, n=4)[0], statistics.quantiles(xs, n=4)[2]
+    q1, q3 = _q.exact(xs, [0.25, 0.75], method="exclusive")   # == statistics.quantiles(xs, n=4)[0], [2]
     iqr = q3 - q1
     return (q1 - 1.5*iqr, q3 + 1.5*iqr)
 
@@ -61,49 +66,154 @@ def _weighted_median(values: List[float], weights: List[float]) -> Optional[floa
 # ----------------------------- Providers -----------------------------
 
 class BaseProvider:
+    # name in quality.providers; per-provider timeout (None → bounded only by the request
+    # deadline); hedge_after_s: issue a duplicate request if the first hasn't answered by then;
+    # local: answers from data on this host (a file index), so it is never cut off by the
+    # request deadline — only by its own timeout_s, if set
+    name: str = "provider"
+    timeout_s: Optional[float] = None
+    hedge_after_s: Optional[float] = None
+    local: bool = False
+
     def fetch(self, *, address: str, lat: float, lon: float, radius_km: float, limit: int) -> List[Dict[str, Any]]:
         raise NotImplementedError
 
+    def fetch_many(self, queries: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        One result list per query ({address, lat, lon, radius_km, limit}). Indexed providers
+        override this to share one lookup; the default just calls fetch() per query.
+        """
+        return [self.fetch(**q) for q in queries]
+
+    def signature(self) -> str:
+        """Changes whenever the data behind this provider's answers does (keys cached results built on it)."""
+        return self.name
+
+def _file_signature(name: str, path: str) -> str:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"{name}:missing"
+    return f"{name}:{st.st_mtime_ns}:{st.st_size}"
+
+def _parse_comp_row(row: Dict[str, Any], source: str) -> Dict[str, Any]:
+    return {
+        "address": row.get("address") or "Unknown",
+        "price": float(row.get("price") or 0.0),
+        "sqft": int(float(row.get("sqft") or 0)),
+        "lat": float(row.get("lat") or 0.0),
+        "lon": float(row.get("lon") or 0.0),
+        "beds": int(float(row.get("beds") or 0)),
+        "baths": float(row.get("baths") or 0.0),
+        "months_ago": int(float(row.get("months_ago") or 0)),
+        "year_built": int(float(row.get("year_built") or 0)) or None,
+        "source": source,
+    }
+
+class CompsGridIndex:
+    """
+    In-memory spatial index: comps bucketed into fixed lat/lon cells (cell_deg on a side,
+    ~2 km at the default). A radius query only visits the cells overlapping the query's
+    bounding box, computes each candidate's haversine once, and keeps the k nearest.
+    """
+    def __init__(self, rows: List[Dict[str, Any]], cell_deg: float = 0.02):
+        self.rows = rows
+        self.cell_deg = float(cell_deg)
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, r in enumerate(rows):
+            self.cells.setdefault(self._cell(r["lat"], r["lon"]), []).append(i)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg)))
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> Iterable[int]:
+        dlat = radius_km / 110.574
+        dlon = radius_km / (111.320 * max(1e-6, math.cos(math.radians(min(abs(lat) + dlat, 89.9)))))
+        (i0, j0), (i1, j1) = self._cell(lat - dlat, lon - dlon), self._cell(lat + dlat, lon + dlon)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) >= len(self.cells):
+            return range(len(self.rows))     # box covers most of the map: a plain scan is cheaper
+        return (k for i in range(i0, i1 + 1) for j in range(j0, j1 + 1) for k in self.cells.get((i, j), ()))
+
+    def nearest_ids(self, lat: float, lon: float, radius_km: float, limit: int) -> List[int]:
+        """Row ids within radius_km, nearest then freshest first, at most `limit`."""
+        hits = []
+        for k in self._candidates(lat, lon, radius_km):
+            r = self.rows[k]
+            d_km = _haversine_km(lat, lon, r["lat"], r["lon"])
+            if d_km <= radius_km:
+                hits.append((d_km, r["months_ago"], k))
+        return [k for _, _, k in heapq.nsmallest(max(1, limit), hits)]
+
+    def nearest(self, lat: float, lon: float, radius_km: float, limit: int) -> List[Dict[str, Any]]:
+        """Comps within radius_km, nearest then freshest first, at most `limit` (copies)."""
+        return [dict(self.rows[k]) for k in self.nearest_ids(lat, lon, radius_km, limit)]
+
+    def nearest_many(self, queries: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """nearest() per query; a row hit by several queries (overlapping radii) is copied once."""
+        ids = [self.nearest_ids(q["lat"], q["lon"], q["radius_km"], q["limit"]) for q in queries]
+        copies = {k: dict(self.rows[k]) for k in set().union(*ids)}
+        return [[copies[k] for k in row_ids] for row_ids in ids]
+
+_CSV_INDEXES: Dict[str, Tuple[Tuple[int, int], CompsGridIndex]] = {}
+_CSV_INDEXES_LOCK = threading.Lock()
+
+def load_csv_index(csv_path: str) -> Optional[CompsGridIndex]:
+    """
+    Parsed + indexed comps CSV, shared per process. Rebuilt only when the file's
+    (mtime, size) changes; None if the file is missing.
+    """
+    try:
+        st = os.stat(csv_path)
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _CSV_INDEXES_LOCK:
+        hit = _CSV_INDEXES.get(csv_path)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        rows: List[Dict[str, Any]] = []
+        with open(csv_path, newline="") as f:
+            for row in csv.DictReader(f):
+                try:
+                    rows.append(_parse_comp_row(row, "local_csv"))
+                except Exception:
+                    continue
+        index = CompsGridIndex(rows)
+        _CSV_INDEXES[csv_path] = (stamp, index)
+        return index
+
 class LocalCsvProvider(BaseProvider):
     """
     Optional: read seed comps from CSV at app/data/comps_seed.csv
     Columns: address,lat,lon,price,sqft,beds,baths,months_ago,year_built
+    The file is parsed once into a CompsGridIndex and re-read only when it changes on disk.
     """
+    name = "local_csv"
+    local = True      # the first request after a file change rebuilds the index inline
+
     def __init__(self, csv_path: str):
         self.csv_path = csv_path
 
     def fetch(self, *, address: str, lat: float, lon: float, radius_km: float, limit: int) -> List[Dict[str, Any]]:
-        if not os.path.exists(self.csv_path):
+        index = load_csv_index(self.csv_path)
+        if index is None:
             return []
-        out: List[Dict[str, Any]] = []
-        with open(self.csv_path, newline="") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    clat = float(row.get("lat") or 0.0)
-                    clon = float(row.get("lon") or 0.0)
-                    d_km = _haversine_km(lat, lon, clat, clon)
-                    if d_km <= radius_km:
-                        out.append({
-                            "address": row.get("address") or "Unknown",
-                            "price": float(row.get("price") or 0.0),
-                            "sqft": int(float(row.get("sqft") or 0)),
-                            "lat": clat,
-                            "lon": clon,
-                            "beds": int(float(row.get("beds") or 0)),
-                            "baths": float(row.get("baths") or 0.0),
-                            "months_ago": int(float(row.get("months_ago") or 0)),
-                            "year_built": int(float(row.get("year_built") or 0)) or None,
-                            "source": "local_csv",
-                        })
-                except Exception:
-                    continue
         # nearest & freshest first
-        out.sort(key=lambda c: (_haversine_km(lat, lon, c["lat"], c["lon"]), c.get("months_ago", 999)))
-        return out[:max(1, limit)]
+        return index.nearest(lat, lon, radius_km, limit)
+
+    def fetch_many(self, queries: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        index = load_csv_index(self.csv_path)
+        if index is None:
+            return [[] for _ in queries]
+        return index.nearest_many(queries)
+
+    def signature(self) -> str:
+        return _file_signature(self.name, self.csv_path)
 
 class SyntheticProvider(BaseProvider):
     """Deterministic, city-aware generator so you can run offline."""
+    name = "synthetic"
+
     def fetch(self, *, address: str, lat: float, lon: float, radius_km: float, limit: int) -> List[Dict[str, Any]]:
         rng = random.Random(_seed_from_address(address) + int(radius_km * 100))
         n = max(6, min(int(limit or 10), 25))
@@ -171,52 +281,16 @@ def _weight_for_comp(*, distance_km: float, months_ago: int, similarity: float)
     w_sim  = 0.5 + 0.5 * max(0.0, min(1.0, similarity))    # 0.5..1.0
     return w_dist * w_time * w_sim
 
-def run(params: Dict[str, Any]) -> Dict[str, Any]:
+# Candidate count from which the array path beats the per-row loop
+_VECTOR_MIN = 32
+
+def _enrich_and_trim(comps: List[Dict[str, Any]], lat0: float, lon0: float,
+                     subject_sqft: int, subject_beds: int, subject_baths: float
+                     ) -> Tuple[int, List[Dict[str, Any]], Optional[float], Optional[float]]:
     """
-    Realistic comps engine (offline capable).
-    Input:
-      - address (str) REQUIRED
-      - radius_miles (float) OPTIONAL (default 1.0)
-      - limit (int) OPTIONAL (default 8)
-      - subject_{sqft,beds,baths} OPTIONAL (improves adjustments)
-    Output:
-      { status, comps: [...], summary: [...] }
+    Per-comp loop: distance, similarity, adjusted $/sf and weight per candidate, then IQR
+    trim. Returns (count with a usable price/size, trimmed rows, median psf, weighted psf).
     """
-    address: str = params.get("address") or "Unknown Address"
-    radius_miles = float(params.get("radius_miles") or 1.0)
-    limit = int(params.get("limit") or 8)
-    subject_sqft = params.get("subject_sqft") or params.get("living_area_sqft") or 1500
-    subject_beds = params.get("subject_beds") or params.get("bedrooms") or 3
-    subject_baths = params.get("subject_baths") or params.get("bathrooms") or 2.0
-
-    # "Geocode"
-    lat0, lon0 = _fake_lat_lon(address)
-    radius_km = max(0.05, radius_miles * 1.60934)
-
-    # Providers: Local CSV (if present) → Synthetic fallback
-    csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "comps_seed.csv")
-    providers: List[BaseProvider] = [LocalCsvProvider(csv_path), SyntheticProvider()]
-
-    raw: List[Dict[str, Any]] = []
-    for prov in providers:
-        try:
-            got = prov.fetch(address=address, lat=lat0, lon=lon0, radius_km=radius_km, limit=limit*2)
-            raw.extend(got)
-        except Exception:
-            continue
-
-    # Deduplicate by address (first wins — already sorted by distance/recency)
-    seen, comps = set(), []
-    for c in raw:
-        a = c.get("address") or ""
-        if a in seen:
-            continue
-        seen.add(a)
-        comps.append(c)
-        if len(comps) >= limit:
-            break
-
-    # Compute psf_raw, adjusted psf, distance, similarity, weight
     enriched: List[Dict[str, Any]] = []
     psfs_adj_for_iqr: List[float] = []
     for c in comps:
@@ -226,53 +300,246 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
         psf_raw = price / sqft
         months_ago = int(c.get("months_ago") or 0)
         dist_km = _haversine_km(lat0, lon0, float(c.get("lat") or lat0), float(c.get("lon") or lon0))
-        sim = _sim_score(int(subject_sqft), sqft, int(subject_beds), c.get("beds"), float(subject_baths), c.get("baths"))
+        sim = _sim_score(subject_sqft, sqft, subject_beds, c.get("beds"), subject_baths, c.get("baths"))
         psf_adj = _adjust_psf(psf_raw,
                               months_ago=months_ago,
-                              subject_sqft=int(subject_sqft),
+                              subject_sqft=subject_sqft,
                               comp_sqft=sqft,
-                              subject_beds=int(subject_beds),
+                              subject_beds=subject_beds,
                               beds=c.get("beds"),
-                              subject_baths=float(subject_baths),
+                              subject_baths=subject_baths,
                               baths=c.get("baths"))
         w = _weight_for_comp(distance_km=dist_km, months_ago=months_ago, similarity=sim)
-        row = dict(c)
-        row.update({
+        enriched.append({
+            **c,
             "psf_raw": psf_raw,
             "psf_adj": psf_adj,
             "distance_km": dist_km,
             "similarity": sim,
             "weight": w,
         })
-        enriched.append(row)
         psfs_adj_for_iqr.append(psf_adj)
 
     # Outlier trimming on adjusted $/sf
     lo, hi = _iqr_bounds(psfs_adj_for_iqr)
     trimmed = [c for c in enriched if lo <= c["psf_adj"] <= hi] or enriched
 
-    # Estimates
     psf_adj_list = [c["psf_adj"] for c in trimmed]
     weights = [c["weight"] for c in trimmed]
     median_psf = statistics.median(psf_adj_list) if psf_adj_list else None
     weighted_psf = _weighted_median(psf_adj_list, weights) if psf_adj_list else None
+    return len(enriched), trimmed, median_psf, weighted_psf
+
+def _enrich_and_trim_np(comps: List[Dict[str, Any]], lat0: float, lon0: float,
+                        subject_sqft: int, subject_beds: int, subject_baths: float
+                        ) -> Tuple[int, List[Dict[str, Any]], Optional[float], Optional[float]]:
+    """
+    Same contract and arithmetic as _enrich_and_trim, evaluated column-wise over all
+    candidates at once; row dicts are only built for the comps that survive the trim.
+    """
+    price = np.array([float(c.get("price") or 0.0) for c in comps])
+    sqft = np.array([int(c.get("sqft") or 0) for c in comps], dtype=float)
+    ok = np.flatnonzero((price > 0) & (sqft > 0))
+    if not ok.size:
+        return 0, [], None, None
+    rows = [comps[i] for i in ok]
+    price, sqft = price[ok], sqft[ok]
+    months = np.array([int(c.get("months_ago") or 0) for c in rows], dtype=float)
+    lat = np.array([float(c.get("lat") or lat0) for c in rows])
+    lon = np.array([float(c.get("lon") or lon0) for c in rows])
+    beds = np.array([c.get("beds") or 0 for c in rows], dtype=float)
+    baths = np.array([c.get("baths") or 0.0 for c in rows], dtype=float)
+
+    # distance (same haversine as _haversine_km)
+    p1, p2 = math.radians(lat0), np.radians(lat)
+    a = np.sin(np.radians(lat - lat0) / 2)**2 + math.cos(p1) * np.cos(p2) * np.sin(np.radians(lon - lon0) / 2)**2
+    dist = 2 * 6371.0 * np.arcsin(np.sqrt(a))
+
+    # similarity (_sim_score)
+    s_sf = subject_sqft or 1500
+    ds = np.abs(sqft - s_sf) / max(s_sf, 1)
+    sim = np.clip(1.0 - (0.5 * ds + 0.25 * np.abs(beds - (subject_beds or 0)) + 0.25 * np.abs(baths - (subject_baths or 0.0))), 0.0, 1.0)
+
+    # adjusted $/sf (_adjust_psf)
+    psf_raw = price / sqft
+    m = np.maximum(0.0, months)
+    psf_adj = np.maximum(0.0, psf_raw
+                         * (1.0 + 0.002) ** -m
+                         * (1.0 + 0.04 * ((subject_sqft - sqft) / max(subject_sqft, 1)))
+                         * (1.0 + 0.02 * (beds - (subject_beds or 0)))
+                         * (1.0 + 0.015 * (baths - (subject_baths or 0.0))))
+
+    # weight (_weight_for_comp)
+    w = (1.0 / (1.0 + np.maximum(dist, 0.0))) * (1.0 / (1.0 + 0.15 * m)) * (0.5 + 0.5 * sim)
+
+    # IQR trim
+    lo, hi = _iqr_bounds(psf_adj)
+    keep = np.flatnonzero((psf_adj >= lo) & (psf_adj <= hi))
+    if not keep.size:
+        keep = np.arange(len(rows))
+    kp, kw = psf_adj[keep], w[keep]
+
+    # median + weighted median (first value whose cumulative clipped weight reaches half)
+    order = np.argsort(kp, kind="stable")
+    cum = np.cumsum(np.maximum(kw[order], 0.0))
+    if cum[-1] > 0:
+        weighted_psf = float(kp[order[min(int(np.searchsorted(cum, cum[-1] / 2, "left")), len(order) - 1)]])
+    else:
+        weighted_psf = float(np.median(kp))
+    median_psf = float(np.median(kp))
+
+    trimmed = [{
+        **rows[i],
+        "psf_raw": float(psf_raw[i]),
+        "psf_adj": float(psf_adj[i]),
+        "distance_km": float(dist[i]),
+        "similarity": float(sim[i]),
+        "weight": float(w[i]),
+    } for i in keep]
+    return len(rows), trimmed, median_psf, weighted_psf
+
+def _data_dir() -> str:
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data")
+
+def _providers() -> List[BaseProvider]:
+    # Providers: columnar store (if present) → Local CSV (if present) → Synthetic fallback
+    data_dir = _data_dir()
+    providers: List[BaseProvider] = [LocalCsvProvider(os.path.join(data_dir, "comps_seed.csv")), SyntheticProvider()]
+    store_path = os.path.join(data_dir, "comps_store")
+    if os.path.isdir(store_path):
+        from app.engines.Core.comps_store import ColumnarCompsProvider
+        providers.insert(0, ColumnarCompsProvider(store_path))
+    return providers
+
+def source_signature() -> str:
+    """Signature of the comps data currently behind run() (every provider, in order)."""
+    return "|".join(p.signature() for p in _providers())
+
+def _subject(params: Dict[str, Any], latlon: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+    """Normalized subject for one comps request (see run() inputs), incl. its "geocode"."""
+    address: str = params.get("address") or "Unknown Address"
+    radius_miles = float(params.get("radius_miles") or 1.0)
+    lat0, lon0 = latlon or _fake_lat_lon(address)
+    return {
+        "address": address,
+        "radius_miles": radius_miles,
+        "radius_km": max(0.05, radius_miles * 1.60934),
+        "limit": int(params.get("limit") or 8),
+        "sqft": params.get("subject_sqft") or params.get("living_area_sqft") or 1500,
+        "beds": params.get("subject_beds") or params.get("bedrooms") or 3,
+        "baths": params.get("subject_baths") or params.get("bathrooms") or 2.0,
+        "lat": lat0,
+        "lon": lon0,
+    }
+
+# Overall budget for one comps request's provider fan-out (params.deadline_ms overrides)
+_DEADLINE_S = 2.0
+
+def _fetch(providers: List[BaseProvider], subjects: List[Dict[str, Any]],
+           deadline_s: float = _DEADLINE_S) -> Tuple[List[List[Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Candidates per subject from every provider (one fetch_many each), fetched concurrently on
+    the shared I/O pool. Each provider is cut off at min(its timeout_s, the overall deadline),
+    local providers at their timeout_s only;
+    a provider with hedge_after_s gets a duplicate request once that much time has passed and
+    the first answer wins. Whatever arrived in time is merged in provider order (so dedup
+    still prefers earlier providers). Returns (candidates per subject, per-provider stats).
+    """
+    queries = [{"address": s["address"], "lat": s["lat"], "lon": s["lon"],
+                "radius_km": s["radius_km"], "limit": s["limit"] * 2} for s in subjects]
+    pool = workers.io_pool()
+    t0 = time.monotonic()
+    end = t0 + max(0.0, deadline_s)
+    calls = []
+    for prov in providers:
+        fut = pool.submit(prov.fetch_many, queries)
+        limit = math.inf if prov.local else end
+        cutoff = min(limit, t0 + prov.timeout_s) if prov.timeout_s is not None else limit
+        hedge_at = t0 + prov.hedge_after_s if prov.hedge_after_s is not None else None
+        calls.append({"futures": [fut], "cutoff": cutoff, "hedge_at": hedge_at, "result": None,
+                      "stat": {"provider": getattr(prov, "name", type(prov).__name__), "status": "pending",
+                               "latency_ms": None, "hedged": False}})
+
+    def settle(c: Dict[str, Any], status: str, now: float) -> None:
+        c["stat"].update(status=status, latency_ms=round((now - t0) * 1000.0, 3))
+
+    while True:
+        now = time.monotonic()
+        for i, c in enumerate(calls):
+            if c["stat"]["status"] != "pending":
+                continue
+            ok = next((f for f in c["futures"] if f.done() and f.exception() is None), None)
+            if ok is not None:
+                c["result"] = ok.result()
+                settle(c, "ok", now)
+            elif now >= c["cutoff"]:
+                settle(c, "timeout", now)
+            elif c["hedge_at"] is not None and not c["stat"]["hedged"] and (
+                    now >= c["hedge_at"] or all(f.done() for f in c["futures"])):
+                # slow (or failed) first request: send the duplicate now
+                c["futures"].append(pool.submit(providers[i].fetch_many, queries))
+                c["stat"]["hedged"] = True
+            elif all(f.done() for f in c["futures"]):
+                settle(c, "error", now)
+                c["stat"]["error"] = str(c["futures"][-1].exception())
+        pending = [c for c in calls if c["stat"]["status"] == "pending"]
+        if not pending:
+            break
+        events = [c["cutoff"] for c in pending]
+        events += [c["hedge_at"] for c in pending if c["hedge_at"] is not None and not c["stat"]["hedged"]]
+        waiting = [f for c in pending for f in c["futures"] if not f.done()]
+        if waiting:
+            nxt = min(events)
+            wait(waiting, timeout=None if nxt == math.inf else max(0.0, nxt - now), return_when=FIRST_COMPLETED)
+
+    raw: List[List[Dict[str, Any]]] = [[] for _ in subjects]
+    for c in calls:
+        got = c["result"] or []
+        c["stat"]["rows"] = sum(len(rows) for rows in got)
+        for acc, rows in zip(raw, got):
+            acc.extend(rows)
+    return raw, [c["stat"] for c in calls]
+
+def _evaluate(subj: Dict[str, Any], raw: List[Dict[str, Any]], provider_stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+    address, limit = subj["address"], subj["limit"]
+    subject_sqft, subject_beds, subject_baths = subj["sqft"], subj["beds"], subj["baths"]
+    lat0, lon0, radius_km = subj["lat"], subj["lon"], subj["radius_km"]
+
+    # Deduplicate by address (first wins — already sorted by distance/recency)
+    seen, comps = set(), []
+    for c in raw:
+        a = c.get("address") or ""
+        if a in seen:
+            continue
+        seen.add(a)
+        comps.append(c)
+        if len(comps) >= limit:
+            break
+
+    # Compute psf_raw, adjusted psf, distance, similarity, weight; trim outliers on adjusted $/sf
+    subject = (int(subject_sqft), int(subject_beds), float(subject_baths))
+    enrich = _enrich_and_trim_np if (np is not None and len(comps) >= _VECTOR_MIN) else _enrich_and_trim
+    enriched_count, trimmed, median_psf, weighted_psf = enrich(comps, lat0, lon0, *subject)
+    psf_adj_list = [c["psf_adj"] for c in trimmed]
 
     estimate_simple = (median_psf or 0.0) * int(subject_sqft)
     estimate_weighted = (weighted_psf or 0.0) * int(subject_sqft)
 
     # Quality metrics
     quality = {
-        "count_in_radius": len(enriched),
+        "count_in_radius": enriched_count,
         "count_after_trim": len(trimmed),
         "radius_km": radius_km,
         "used_weighted": bool(weighted_psf is not None),
         "psf_spread_pct": ( (max(psf_adj_list)-min(psf_adj_list))/max(statistics.median(psf_adj_list),1.0)
                             if len(psf_adj_list) >= 2 else None),
+        "providers": provider_stats,
+        "provider_timeouts": sum(1 for st in provider_stats if st["status"] == "timeout"),
     }
 
     summary = [{
         "address": address,
-        "radius_miles": radius_miles,
+        "radius_miles": subj["radius_miles"],
         "count": len(trimmed),
         "median_psf": median_psf,
         "weighted_psf": weighted_psf,
@@ -286,10 +553,68 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
 
     return {"status": "ok", "comps": trimmed, "summary": summary}
 
+def run(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Realistic comps engine (offline capable).
+    Input:
+      - address (str) REQUIRED
+      - radius_miles (float) OPTIONAL (default 1.0)
+      - limit (int) OPTIONAL (default 8)
+      - subject_{sqft,beds,baths} OPTIONAL (improves adjustments)
+      - deadline_ms (float) OPTIONAL (default 2000; providers still pending are dropped)
+    Output:
+      { status, comps: [...], summary: [...] }   (summary.quality.providers: latency/status per provider)
+    """
+    subj = _subject(params)
+    raw, stats = _fetch(_providers(), [subj], _deadline_s(params))
+    return _evaluate(subj, raw[0], stats)
+
+def _deadline_s(params: Dict[str, Any]) -> float:
+    ms = params.get("deadline_ms")
+    return float(ms) / 1000.0 if ms is not None else _DEADLINE_S
+
+def run_many(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Comps for many subjects in one call (portfolio re-marks, scenario targets, batch valuation).
+    Providers are set up once and each runs a single fetch_many over all subjects, so indexed
+    providers do one index lookup pass and copy a sale shared by overlapping radii only once.
+    Input:
+      - subjects: [ {address, radius_miles?, limit?, subject_{sqft,beds,baths}?}, ... ]
+      - include_comps (bool) OPTIONAL (default True; False → summaries only)
+      - deadline_ms (float) OPTIONAL (as in run())
+    Output:
+      { status, results: [ {status, comps?, summary}, ... ], candidates: {requested, unique}, providers: [...] }
+    """
+    items = [p or {} for p in (params.get("subjects") or [])]
+    coords = _geo.geocode_many([p.get("address") or "Unknown Address" for p in items])   # one cache round-trip
+    subjects = [_subject(p, ll) for p, ll in zip(items, coords)]
+    raw, stats = _fetch(_providers(), subjects, _deadline_s(params))
+    include = params.get("include_comps", True) is not False
+    results = []
+    for subj, cands in zip(subjects, raw):
+        res = _evaluate(subj, cands, stats)
+        if not include:
+            res.pop("comps")
+        results.append(res)
+    unique = {(c.get("source"), c.get("address"), c.get("lat"), c.get("lon")) for cands in raw for c in cands}
+    return {
+        "status": "ok",
+        "results": results,
+        "candidates": {"requested": sum(len(c) for c in raw), "unique": len(unique)},
+        "providers": stats,
+    }
+
 # Register so valuation can call REGISTRY.get("comps")
 register(
     key="comps",
     fn=run,
     name="Comparable Sales",
     description="Comps engine with filtering, adjustments, weighting, outlier control, and quality metrics. CSV-backed with synthetic fallback.",
-)
\ No newline at end of file
+)
+
+register(
+    key="comps_batch",
+    fn=run_many,
+    name="Comparable Sales (Batch)",
+    description="Comps summaries for many subjects in one pass: shared provider setup and index lookups, overlapping candidates fetched once.",
+)
@@ -0,0 +1,304 @@
+# app/engines/Core/comps_store.py
+from __future__ import annotations
+import csv, json, math, mmap, os, sys, threading
+from array import array
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.engines.Core.comps import BaseProvider, _file_signature, _haversine_km, _parse_comp_row
+
+try:
+    import numpy as np
+except Exception:  # numpy is optional — queries fall back to a scan over the mapped columns
+    np = None
+
+try:
+    import fcntl
+except Exception:  # non-POSIX: appends are serialized per process only
+    fcntl = None
+
+# Memory-mapped columnar comps store.
+#   <dir>/meta.json       committed row count + schema
+#   <dir>/<column>.bin    one fixed-width typed array per numeric column (array typecodes below)
+#   <dir>/address.dat     UTF-8 addresses back to back
+#   <dir>/address.idx     int64 end offset of each address in address.dat
+# Appends write the column tails first and then atomically replace meta.json, so readers
+# never see a torn row (bytes past the committed count are ignored, and overwritten by the
+# next append). Readers map the files read-only, so every worker on the host shares the same
+# pages through the OS cache.
+
+COLUMNS: Dict[str, str] = {
+    "lat": "d",
+    "lon": "d",
+    "price": "d",
+    "sqft": "i",
+    "beds": "h",
+    "baths": "d",
+    "months_ago": "h",
+    "year_built": "h",
+}
+_VERSION = 2                # 2: baths float32 → float64
+_META = "meta.json"
+_CELL_DEG = 0.02
+_CELL_BIAS = 1 << 16       # lat/lon cell numbers are within ±9000 at _CELL_DEG
+
+# -------------------------- Store --------------------------
+
+class ColumnarCompsStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._rows = 0
+        self._cols: Dict[str, Any] = {}
+        self._addr_idx: Any = None
+        self._addr_dat: Any = None
+        self._index: Optional[Tuple[Any, Any]] = None
+        if not os.path.exists(os.path.join(path, _META)):
+            raise FileNotFoundError(f"no comps store at {path}")
+
+    # ---- creation / appends ----
+    @classmethod
+    def create(cls, path: str) -> "ColumnarCompsStore":
+        os.makedirs(path, exist_ok=True)
+        if not os.path.exists(os.path.join(path, _META)):
+            for name in list(COLUMNS) + ["address"]:
+                for ext in ((".dat", ".idx") if name == "address" else (".bin",)):
+                    open(os.path.join(path, name + ext), "ab").close()
+            _write_meta(path, 0)
+        return cls(path)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _writer(self) -> Iterator[None]:
+        with self._lock, open(self._file(".lock"), "a") as lf:
+            if fcntl is not None:
+                fcntl.flock(lf, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lf, fcntl.LOCK_UN)
+
+    def append(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Append sales (comps-shaped dicts or CSV rows). Returns the new committed row count."""
+        with self._writer():
+            n = _read_meta(self.path)["rows"]
+            bufs = {c: array(tc) for c, tc in COLUMNS.items()}
+            ends = array("q")
+            addr = bytearray()
+            base = _last_offset(self._file("address.idx"), n)
+            for row in rows:
+                try:
+                    r = _parse_comp_row(row, "columnar_store")
+                except Exception:
+                    continue
+                for c in COLUMNS:
+                    bufs[c].append(r[c] or 0)
+                addr += r["address"].encode("utf-8")
+                ends.append(base + len(addr))
+            if not ends:
+                return n
+            for c, buf in bufs.items():
+                _write_tail(self._file(c + ".bin"), n * buf.itemsize, buf.tobytes())
+            _write_tail(self._file("address.dat"), base, bytes(addr))
+            _write_tail(self._file("address.idx"), n * ends.itemsize, ends.tobytes())
+            _write_meta(self.path, n + len(ends))
+            return n + len(ends)
+
+    # ---- read side ----
+    def _refresh(self) -> None:
+        """Re-map if another process committed an append since we last looked."""
+        st = os.stat(self._file(_META))
+        stamp = (st.st_ino, st.st_mtime_ns)     # meta.json is replaced (new inode) on every commit
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            meta = _read_meta(self.path)
+            n = int(meta["rows"])
+            self._cols = {c: _map_column(self._file(c + ".bin"), tc, n) for c, tc in COLUMNS.items()}
+            self._addr_idx = _map_column(self._file("address.idx"), "q", n)
+            self._addr_dat = _map_bytes(self._file("address.dat"))
+            self._rows, self._index, self._stamp = n, None, stamp
+
+    def __len__(self) -> int:
+        self._refresh()
+        return self._rows
+
+    def column(self, name: str) -> Any:
+        """Zero-copy view of a numeric column (ndarray with numpy, else a typed memoryview)."""
+        self._refresh()
+        return self._cols[name]
+
+    def address(self, k: int) -> str:
+        start = int(self._addr_idx[k - 1]) if k else 0
+        return bytes(self._addr_dat[start:int(self._addr_idx[k])]).decode("utf-8")
+
+    def row(self, k: int) -> Dict[str, Any]:
+        out: Dict[str, Any] = {c: (float if tc in "df" else int)(self._cols[c][k]) for c, tc in COLUMNS.items()}
+        out["year_built"] = out["year_built"] or None
+        out["address"] = self.address(k)
+        out["source"] = "columnar_store"
+        return out
+
+    def _cell_index(self) -> Tuple[Any, Any]:
+        # rows ordered by lat/lon cell; built per process on first query after a (re)map
+        if self._index is None:
+            lat, lon = self._cols["lat"], self._cols["lon"]
+            keys = _cell_key(np.floor(lat / _CELL_DEG).astype(np.int64), np.floor(lon / _CELL_DEG).astype(np.int64))
+            order = np.argsort(keys, kind="stable")
+            self._index = (keys[order], order)
+        return self._index
+
+    def nearest(self, lat: float, lon: float, radius_km: float, limit: int) -> List[Dict[str, Any]]:
+        """Sales within radius_km, nearest then freshest first, at most `limit`."""
+        self._refresh()
+        return [self.row(k) for k in self._nearest_ids(lat, lon, radius_km, limit)]
+
+    def nearest_many(self, queries: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """nearest() per query; a sale hit by several queries (overlapping radii) is decoded once."""
+        self._refresh()
+        ids = [self._nearest_ids(q["lat"], q["lon"], q["radius_km"], q["limit"]) for q in queries]
+        rows = {k: self.row(k) for k in set().union(*ids)}
+        return [[rows[k] for k in row_ids] for row_ids in ids]
+
+    def _nearest_ids(self, lat: float, lon: float, radius_km: float, limit: int) -> List[int]:
+        if not self._rows:
+            return []
+        limit = max(1, limit)
+        if np is None:
+            hits = []
+            lats, lons, ages = self._cols["lat"], self._cols["lon"], self._cols["months_ago"]
+            for k in range(self._rows):
+                d_km = _haversine_km(lat, lon, lats[k], lons[k])
+                if d_km <= radius_km:
+                    hits.append((d_km, ages[k], k))
+            hits.sort()
+            return [k for _, _, k in hits[:limit]]
+
+        sorted_keys, order = self._cell_index()
+        dlat = radius_km / 110.574
+        dlon = radius_km / (111.320 * max(1e-6, math.cos(math.radians(min(abs(lat) + dlat, 89.9)))))
+        i0, i1 = int(math.floor((lat - dlat) / _CELL_DEG)), int(math.floor((lat + dlat) / _CELL_DEG))
+        j0, j1 = int(math.floor((lon - dlon) / _CELL_DEG)), int(math.floor((lon + dlon) / _CELL_DEG))
+        lo = np.searchsorted(sorted_keys, [_cell_key(i, j0) for i in range(i0, i1 + 1)], "left")
+        hi = np.searchsorted(sorted_keys, [_cell_key(i, j1) for i in range(i0, i1 + 1)], "right")
+        cand = np.concatenate([order[a:b] for a, b in zip(lo, hi)] or [order[:0]])
+        if not cand.size:
+            return []
+        d_km = _haversine_np(lat, lon, self._cols["lat"][cand], self._cols["lon"][cand])
+        keep = d_km <= radius_km
+        cand, d_km = cand[keep], d_km[keep]
+        pick = np.lexsort((self._cols["months_ago"][cand], d_km))[:limit]
+        return [int(k) for k in cand[pick]]
+
+# -------------------------- File helpers --------------------------
+
+def _read_meta(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, _META)) as f:
+        meta = json.load(f)
+    if meta.get("byteorder") != sys.byteorder:
+        raise ValueError(f"comps store at {path} was written on a {meta.get('byteorder')}-endian host")
+    if meta.get("columns") != COLUMNS:
+        raise ValueError(f"comps store at {path} has an older column layout (v{meta.get('version')}); rebuild it from the CSV")
+    return meta
+
+def _write_meta(path: str, rows: int) -> None:
+    tmp = os.path.join(path, _META + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump({"version": _VERSION, "rows": rows, "byteorder": sys.byteorder, "columns": COLUMNS}, f)
+    os.replace(tmp, os.path.join(path, _META))
+
+def _write_tail(fname: str, at: int, data: bytes) -> None:
+    # drop anything past the committed end (an interrupted append), then extend
+    with open(fname, "r+b") as f:
+        f.truncate(at)
+        f.seek(at)
+        f.write(data)
+
+def _last_offset(idx_file: str, n: int) -> int:
+    if not n:
+        return 0
+    with open(idx_file, "rb") as f:
+        f.seek((n - 1) * 8)
+        return array("q", f.read(8))[0]
+
+def _map_bytes(fname: str) -> Any:
+    if not os.path.getsize(fname):
+        return b""
+    with open(fname, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _map_column(fname: str, typecode: str, n: int) -> Any:
+    size = array(typecode).itemsize
+    mm = _map_bytes(fname) if n else b""
+    if np is not None:
+        return np.frombuffer(mm, dtype=np.dtype(typecode), count=n) if n else np.empty(0, dtype=np.dtype(typecode))
+    return memoryview(mm)[:n * size].cast(typecode)
+
+def _cell_key(i: Any, j: Any) -> Any:
+    return (i + _CELL_BIAS) * (2 * _CELL_BIAS) + (j + _CELL_BIAS)
+
+def _haversine_np(lat: float, lon: float, lats: Any, lons: Any) -> Any:
+    p1, p2 = math.radians(lat), np.radians(lats)
+    a = np.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * np.cos(p2) * np.sin(np.radians(lons - lon) / 2) ** 2
+    return 2 * 6371.0 * np.arcsin(np.sqrt(a))
+
+# -------------------------- Shared handles + provider --------------------------
+
+_STORES: Dict[str, ColumnarCompsStore] = {}
+_STORES_LOCK = threading.Lock()
+
+def open_store(path: str) -> ColumnarCompsStore:
+    """One mapped store per path per process."""
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = _STORES[path] = ColumnarCompsStore(path)
+        return store
+
+def convert_csv(csv_path: str, store_path: str, *, chunk: int = 50_000) -> int:
+    """Load a comps CSV (LocalCsvProvider columns) into a store, appending if it already exists."""
+    store = ColumnarCompsStore.create(store_path)
+    n = len(store)
+    with open(csv_path, newline="") as f:
+        batch: List[Dict[str, Any]] = []
+        for row in csv.DictReader(f):
+            batch.append(row)
+            if len(batch) >= chunk:
+                n = store.append(batch)
+                batch = []
+        if batch:
+            n = store.append(batch)
+    return n
+
+class ColumnarCompsProvider(BaseProvider):
+    """Comps from a ColumnarCompsStore directory (e.g. app/data/comps_store)."""
+    name = "columnar_store"
+    local = True
+
+    def __init__(self, store_path: str):
+        self.store_path = store_path
+
+    def fetch(self, *, address: str, lat: float, lon: float, radius_km: float, limit: int) -> List[Dict[str, Any]]:
+        if not os.path.exists(os.path.join(self.store_path, _META)):
+            return []
+        return open_store(self.store_path).nearest(lat, lon, radius_km, limit)
+
+    def fetch_many(self, queries: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        if not os.path.exists(os.path.join(self.store_path, _META)):
+            return [[] for _ in queries]
+        return open_store(self.store_path).nearest_many(queries)
+
+    def signature(self) -> str:
+        return _file_signature(self.name, os.path.join(self.store_path, _META))
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Convert a comps CSV into a columnar comps store")
+    ap.add_argument("csv_path")
+    ap.add_argument("store_path")
+    a = ap.parse_args()
+    print(f"{convert_csv(a.csv_path, a.store_path)} rows in {a.store_path}")
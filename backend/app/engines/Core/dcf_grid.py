@@ -0,0 +1,169 @@
+# app/engines/Core/dcf_grid.py
+from __future__ import annotations
+import itertools, math
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.engines import register
+from app.engines.Core import irr as _irr
+from app.engines.Core.valuation import spend_curve_weights
+
+try:
+    import numpy as np
+except Exception:  # numpy is optional — falls back to a per-cell loop
+    np = None
+
+# Grid axes, in the order cells are laid out (row-major; discount_rate varies fastest)
+AXES = ("land_cost", "build_cost", "sales_revenue", "presale_pct", "discount_rate")
+_MAX_CELLS = 250_000
+
+# -------------------------- Helpers --------------------------
+
+def _number(v: Any, what: str) -> float:
+    try:
+        x = float(v or 0.0)
+    except (TypeError, ValueError):
+        raise ValueError(f"{what}: {v!r} is not a number") from None
+    if not math.isfinite(x):
+        raise ValueError(f"{what}: {v!r} is not finite")
+    return x
+
+def _axis_values(params: Dict[str, Any], base: Dict[str, Any]) -> Dict[str, List[float]]:
+    """Axis values from the request (ValueError names the bad axis/value)."""
+    axes_in = params.get("axes") or {}
+    if not isinstance(axes_in, dict):
+        raise ValueError("axes must be an object of {axis: [values...]}")
+    defaults = {
+        "land_cost": base.get("land_cost"),
+        "build_cost": base.get("build_cost"),
+        "sales_revenue": base.get("sales_revenue"),
+        "presale_pct": base.get("presale_pct"),
+        "discount_rate": base.get("discount_rate_equity", 0.12),
+    }
+    out: Dict[str, List[float]] = {}
+    for k in AXES:
+        vals = axes_in.get(k)
+        if vals is None or (isinstance(vals, (list, tuple)) and not vals):
+            vals = [defaults[k]]
+        elif not isinstance(vals, (list, tuple)):
+            vals = [vals]
+        out[k] = [_number(v, k) for v in vals]
+    out["presale_pct"] = [min(max(v, 0.0), 1.0) for v in out["presale_pct"]]
+    if any(r <= -1.0 for r in out["discount_rate"]):
+        raise ValueError("discount_rate: values must be > -1")
+    return out
+
+def _irr_annual(irr_m: Optional[float]) -> float:
+    # same convention as compute_equity_cashflows_and_irr: no root → 0.0
+    return (1 + (irr_m or 0.0))**12 - 1
+
+def _grid_numpy(ax: Dict[str, List[float]], soft: float, depo: float, w: Sequence[float], T: int) -> Dict[str, List[Any]]:
+    L = np.asarray(ax["land_cost"])[:, None, None, None]
+    B = np.asarray(ax["build_cost"])[None, :, None, None]
+    R = np.asarray(ax["sales_revenue"])[None, None, :, None]
+    P = np.asarray(ax["presale_pct"])[None, None, None, :]
+    wv = np.asarray(w)
+
+    # Cashflows for every (land, build, revenue, presale) combo: months 0..T+1
+    shape4 = np.broadcast_shapes(L.shape, B.shape, R.shape, P.shape)
+    cfs = np.empty(shape4 + (T + 2,))
+    cfs[..., 0] = -np.broadcast_to(L, shape4)
+    cfs[..., 1:T + 1] = -(B + soft)[..., None] * wv + (R * P * depo / T)[..., None]
+    cfs[..., T + 1] = np.broadcast_to(R * (1 - P * depo), shape4)
+
+    # NPV per discount rate: one discount-factor row per rate, one matmul for all combos
+    r = np.asarray(ax["discount_rate"])
+    r_m = (1 + r) ** (1 / 12) - 1
+    df = (1 + r_m)[:, None] ** -np.arange(T + 2, dtype=float)   # (n_rates, T+2)
+    npv = cfs @ df.T                                             # (..., n_rates)
+
+    invested = -np.minimum(cfs, 0.0).sum(axis=-1)
+    returned = np.maximum(cfs, 0.0).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        em = np.where(invested > 0, returned / invested, np.nan)
+
+    irr_m = _irr.irr_many(cfs.reshape(-1, T + 2))
+    irr_a = np.asarray([_irr_annual(x) for x in irr_m]).reshape(shape4)
+
+    n_r = len(r)
+    em_cells = np.repeat(em[..., None], n_r, axis=-1).ravel()
+    return {
+        "npv": npv.ravel().tolist(),
+        "irr_annual": np.repeat(irr_a[..., None], n_r, axis=-1).ravel().tolist(),
+        "equity_multiple": [None if x != x else x for x in em_cells.tolist()],
+    }
+
+def _grid_python(ax: Dict[str, List[float]], soft: float, depo: float, w: Sequence[float], T: int) -> Dict[str, List[Any]]:
+    out: Dict[str, List[Any]] = {"npv": [], "irr_annual": [], "equity_multiple": []}
+    dfs = [_irr.discount_factors((1 + r) ** (1 / 12) - 1, T + 2) for r in ax["discount_rate"]]
+    for L, B, R, P in itertools.product(ax["land_cost"], ax["build_cost"], ax["sales_revenue"], ax["presale_pct"]):
+        inflow = R * P * depo / T
+        cfs = [-L] + [-(B + soft) * wi + inflow for wi in w] + [R * (1 - P * depo)]
+        invested = -sum(min(0.0, cf) for cf in cfs)
+        returned = sum(max(0.0, cf) for cf in cfs)
+        em = (returned / invested) if invested > 0 else None
+        irr_a = _irr_annual(_irr.irr(cfs, lo=-0.95, hi=2.0))
+        for df in dfs:
+            out["npv"].append(sum(cf * d for cf, d in zip(cfs, df)))
+            out["irr_annual"].append(irr_a)
+            out["equity_multiple"].append(em)
+    return out
+
+# -------------------------- Engine --------------------------
+
+def run(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Sensitivity grid over the equity DCF (same pro forma as valuation.compute_equity_cashflows_and_irr).
+    Input:
+      - base: {land_cost, build_cost, soft_costs, sales_revenue, presale_pct,
+               discount_rate_equity, timeline_months, presale_deposit_pct, spend_curve}
+      - axes: {land_cost|build_cost|sales_revenue|presale_pct|discount_rate: [values...]}
+              (a missing axis is held at its base value)
+    Output (columnar, row-major over AXES with discount_rate fastest):
+      { status, order, axes, shape, cells, metrics: {npv: [...], irr_annual: [...], equity_multiple: [...]} }
+    """
+    params = params or {}
+    base = params.get("base") or {}
+    if not isinstance(base, dict):
+        return {"status": "error", "error": "base must be an object"}
+    try:
+        ax = _axis_values(params, base)
+        max_cells = min(int(_number(params.get("max_cells") or _MAX_CELLS, "max_cells")), _MAX_CELLS)
+        T = max(1, int(_number(base.get("timeline_months") or 24, "timeline_months")))
+        soft = _number(base.get("soft_costs"), "soft_costs")
+        depo = _number(base.get("presale_deposit_pct") if base.get("presale_deposit_pct") is not None else 0.10,
+                       "presale_deposit_pct")
+    except ValueError as e:
+        return {"status": "error", "error": str(e)}
+    shape = [len(ax[k]) for k in AXES]
+    cells = 1
+    for n in shape:
+        cells *= n
+    if cells > max_cells:
+        return {"status": "error", "error": f"grid has {cells} cells; max_cells is {max_cells}"}
+
+    curve = str(base.get("spend_curve") or "s-curve")
+    w = spend_curve_weights(T, curve)
+
+    grid = (_grid_numpy if np is not None else _grid_python)(ax, soft, depo, w, T)
+
+    return {
+        "status": "ok",
+        "order": list(AXES),
+        "axes": ax,
+        "shape": shape,
+        "cells": cells,
+        "metrics": grid,
+        "assumptions": {
+            "timeline_months": T,
+            "spend_curve": curve,
+            "soft_costs": soft,
+            "presale_deposit_pct": depo,
+        },
+    }
+
+register(
+    key="dcf_grid",
+    fn=run,
+    name="DCF Sensitivity Grid",
+    description="NPV / IRR / equity-multiple tables across land, build, revenue, presale and discount-rate axes, evaluated as array operations."
+)
@@ -0,0 +1,138 @@
+# app/engines/Core/irr.py
+from __future__ import annotations
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except Exception:  # numpy is optional — scalar solver below is pure Python
+    np = None
+
+# Shared NPV/IRR math for the equity DCF and credit cashflows.
+# Periods are whatever the caller's cashflows use (monthly for equity, annual for credit).
+
+# -------------------------- NPV --------------------------
+
+@lru_cache(maxsize=256)
+def discount_factors(rate: float, periods: int) -> Tuple[float, ...]:
+    """(1+r)^-t for t = 0..periods-1, built by running product (no pow per period). Cached."""
+    v = 1.0 / (1.0 + rate)
+    out, d = [], 1.0
+    for _ in range(max(0, periods)):
+        out.append(d)
+        d *= v
+    return tuple(out)
+
+def npv(cfs: Sequence[float], rate: float) -> float:
+    """NPV at a per-period rate, cashflow t discounted by (1+rate)^t."""
+    return sum(cf * d for cf, d in zip(cfs, discount_factors(float(rate), len(cfs))))
+
+def npv_and_derivative(cfs: Sequence[float], rate: float) -> Tuple[float, float]:
+    """
+    NPV and dNPV/drate in one Horner pass over v = 1/(1+rate):
+      NPV = Σ cf_t v^t,   dNPV/dr = -v² Σ t cf_t v^(t-1)
+    """
+    v = 1.0 / (1.0 + rate)
+    p, dp = 0.0, 0.0
+    for cf in reversed(cfs):
+        dp = dp * v + p
+        p = p * v + cf
+    return p, -dp * v * v
+
+# -------------------------- IRR --------------------------
+
+def irr(cfs: Sequence[float],
+        lo: float = -0.95,
+        hi: float = 2.0,
+        xtol: float = 1e-12,
+        ftol: float = 1e-10,
+        maxiter: int = 100) -> Optional[float]:
+    """
+    Per-period IRR by safeguarded Newton (Newton steps with an analytic derivative,
+    bisection whenever a step leaves the bracket or stalls). Returns None if NPV has
+    no sign change on [lo, hi].
+    """
+    try:
+        f_lo, _ = npv_and_derivative(cfs, lo)
+        f_hi, _ = npv_and_derivative(cfs, hi)
+        if f_lo * f_hi > 0:
+            return None
+        if f_lo == 0:
+            return lo
+        if f_hi == 0:
+            return hi
+        # orient so that f(xl) < 0 < f(xh)
+        xl, xh = (lo, hi) if f_lo < 0 else (hi, lo)
+        x = 0.5 * (lo + hi)
+        dx_old = dx = abs(hi - lo)
+        f, df = npv_and_derivative(cfs, x)
+        for _ in range(maxiter):
+            if ((x - xh) * df - f) * ((x - xl) * df - f) > 0 or abs(2.0 * f) > abs(dx_old * df):
+                dx_old, dx = dx, 0.5 * (xh - xl)
+                x = xl + dx
+            else:
+                dx_old, dx = dx, f / df
+                x -= dx
+            if abs(dx) < xtol:
+                return x
+            f, df = npv_and_derivative(cfs, x)
+            if abs(f) < ftol:
+                return x
+            if f < 0:
+                xl = x
+            else:
+                xh = x
+        return x
+    except (OverflowError, ZeroDivisionError):
+        return None
+
+def irr_many(cf_rows: Sequence[Sequence[float]],
+             lo: float = -0.95,
+             hi: float = 2.0,
+             xtol: float = 1e-12,
+             maxiter: int = 100) -> List[Optional[float]]:
+    """
+    IRR for many cashflow vectors at once (list of rows or a 2-D array). Rows may differ
+    in length (shorter rows are zero-padded, which leaves their NPV unchanged). With numpy, every row takes its
+    Newton/bisection step together as one matrix operation.
+    """
+    if np is None or len(cf_rows) == 0:
+        return [irr(row, lo=lo, hi=hi, xtol=xtol, maxiter=maxiter) for row in cf_rows]
+
+    if isinstance(cf_rows, np.ndarray) and cf_rows.ndim == 2:
+        C = cf_rows.astype(float, copy=False)
+    else:
+        C = np.zeros((len(cf_rows), max(len(r) for r in cf_rows)))
+        for i, row in enumerate(cf_rows):
+            C[i, :len(row)] = row
+    t = np.arange(C.shape[1], dtype=float)
+
+    def fdf(x):
+        v = 1.0 / (1.0 + x)
+        d = v[:, None] ** t                          # discount factors per row
+        f = (C * d).sum(axis=1)
+        df = -(C * d * t).sum(axis=1) * v
+        return f, df
+
+    with np.errstate(all="ignore"):
+        f_lo, _ = fdf(np.full(len(C), lo))
+        f_hi, _ = fdf(np.full(len(C), hi))
+        ok = f_lo * f_hi <= 0
+        xl = np.where(f_lo < 0, lo, hi)
+        xh = np.where(f_lo < 0, hi, lo)
+        x = np.full(len(C), 0.5 * (lo + hi))
+        done = ~ok
+        for _ in range(maxiter):
+            f, df = fdf(x)
+            done |= np.abs(f) < 1e-10
+            if done.all():
+                break
+            xl = np.where(f < 0, x, xl)
+            xh = np.where(f < 0, xh, x)
+            newton = x - f / df
+            inside = np.isfinite(newton) & ((newton - xl) * (newton - xh) < 0)
+            step = np.where(inside, newton, 0.5 * (xl + xh))
+            moved = np.abs(step - x)
+            x = np.where(done, x, step)
+            done |= moved < xtol
+    return [float(xi) if good else None for xi, good in zip(x, ok)]
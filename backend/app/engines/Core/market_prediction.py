@@ -1,11 +1,21 @@
 # app/engines/Core/market_prediction.py
 from __future__ import annotations
-import os, pickle, random
-from typing import Any, Dict, List, Optional
+import os, random
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from app.engines import register
-
-# Where we look for the trained model (created by your tiny trainer)
-_ART_PATH = "app/engines/Core/_artifacts/market_lin.pkl"
+from app.engines.linear_model import load_artifact
+from app.engines.model_registry import registry as _models
+
+try:
+    import numpy as np
+except Exception:  # numpy is optional — feature matrix falls back to nested lists
+    np = None
+
+# Where we look for the trained model (created by your tiny trainer). The native JSON
+# artifact (app.engines.linear_model) is preferred: no sklearn import, no unpickling.
+_ART_PATH = os.path.join(os.path.dirname(__file__), "_artifacts", "market_lin.pkl")
+_ART_PATH_NATIVE = os.path.join(os.path.dirname(__file__), "_artifacts", "market_lin.json")
+_MODEL_NAME = "market_lin"
 _MODEL_VERSION = "lin_v1"
 
 def _safe_float(x, default=0.0) -> float:
@@ -14,51 +24,73 @@ def _safe_float(x, default=0.0) -> float:
     except Exception:
         return float(default)
 
-def _load_model() -> Optional[dict]:
-    """Load a pickled sklearn model if present; otherwise return None."""
-    if not os.path.exists(_ART_PATH):
-        return None
-    try:
-        with open(_ART_PATH, "rb") as f:
-            model = pickle.load(f)
-        # must include {"feats": [...], "m1": <sk_model>, "m2": <sk_model>}
-        if isinstance(model, dict) and "feats" in model and "m1" in model and "m2" in model:
-            return model
-    except Exception:
-        pass
-    return None
+def _valid_model(model: Any) -> bool:
+    # must include {"feats": [...], "m1": <sk_model>, "m2": <sk_model>}
+    return isinstance(model, dict) and "feats" in model and "m1" in model and "m2" in model
+
+# Default artifact; more versions can sit side by side via register_model_version()
+# (native first; the registry picks whichever exists at each re-check)
+_models.register(_MODEL_NAME, _MODEL_VERSION, (_ART_PATH_NATIVE, _ART_PATH),
+                 loader=load_artifact, validate=_valid_model, default=True)
+
+def register_model_version(version: str, path: str, *, default: bool = False) -> None:
+    """
+    Serve another trained artifact under `version` (select per request with params.model_version).
+    .json paths are native linear artifacts; anything else is unpickled.
+    """
+    _models.register(_MODEL_NAME, version, path, loader=load_artifact, validate=_valid_model, default=default)
+
+def model_fingerprint(version: Optional[str] = None) -> Optional[str]:
+    """sha256 of the artifact run() currently serves for `version` (None → heuristic mode)."""
+    return _models.fingerprint(_MODEL_NAME, version)
+
+def _load_model(version: Optional[str] = None) -> Tuple[Optional[dict], Optional[str]]:
+    """(model, version) from the in-process registry; (None, version) if no usable artifact."""
+    return _models.get(_MODEL_NAME, version)
+
+# Model feature name → (params section, key, neutral default). Keep names stable with your trainer.
+_FEATURES: Dict[str, Tuple[str, str, float]] = {
+    # demand-side signals (from valuation params)
+    "watchlist_count":    ("demand", "watchlist_count", 0),
+    "bids_24h":           ("demand", "bids_24h", 0),
+    "active_users_24h":   ("demand", "active_users_24h", 0),
+    "external_index":     ("demand", "external_index", 1.0),
+
+    # orderbook / liquidity (from valuation params)
+    "spread_bps":         ("liquidity", "spread_bps", 120),
+    "depth_units":        ("liquidity", "depth_units", 0),
+    "turnover_24h_pct":   ("liquidity", "turnover_24h_pct", 0.0),
+
+    # climate proxy (keep simple; expand later)
+    "enso_rain_anom_pct": ("climate_signals", "rain_anom_pct", 0.0),
+
+    # macro proxy (you can feed this later from an API)
+    "rate_10y_bp":        ("macro", "rate_10y_bp", 0.0),
+}
+
+def _feature(params: Dict[str, Any], name: str) -> float:
+    spec = _FEATURES.get(name)
+    if spec is None:
+        return 0.0
+    section, key, default = spec
+    return _safe_float(((params.get(section) or {}) or {}).get(key), default)
 
 def _extract_features(params: Dict[str, Any], feat_names: List[str]) -> List[float]:
     """
-    Build the feature vector the model expects. Keep names stable with your trainer.
+    Build the feature vector the model expects, in the exact order it was trained on.
     Missing fields are filled with neutral defaults so this never throws.
     """
-    demand  = (params.get("demand") or {}) or {}
-    liq     = (params.get("liquidity") or {}) or {}
-    climate = (params.get("climate_signals") or {}) or {}
-    macro   = (params.get("macro") or {}) or {}
-
-    raw = {
-        # demand-side signals (from valuation params)
-        "watchlist_count": _safe_float(demand.get("watchlist_count"), 0),
-        "bids_24h":        _safe_float(demand.get("bids_24h"), 0),
-        "active_users_24h":_safe_float(demand.get("active_users_24h"), 0),
-        "external_index":  _safe_float(demand.get("external_index"), 1.0),
+    return [_feature(params, name) for name in feat_names]
 
-        # orderbook / liquidity (from valuation params)
-        "spread_bps":        _safe_float(liq.get("spread_bps"), 120),
-        "depth_units":       _safe_float(liq.get("depth_units"), 0),
-        "turnover_24h_pct":  _safe_float(liq.get("turnover_24h_pct"), 0.0),
-
-        # climate proxy (keep simple; expand later)
-        "enso_rain_anom_pct": _safe_float(climate.get("rain_anom_pct"), 0.0),
-
-        # macro proxy (you can feed this later from an API)
-        "rate_10y_bp": _safe_float(macro.get("rate_10y_bp"), 0.0),
-    }
-
-    # Return in the exact order the model was trained on
-    return [ _safe_float(raw.get(name), 0.0) for name in feat_names ]
+def feature_matrix(items: Sequence[Dict[str, Any]], feat_names: List[str]) -> Any:
+    """
+    Rows = items, columns = feat_names (same values as _extract_features per row), built
+    one column at a time. A float ndarray with numpy, else a list of row lists.
+    """
+    cols = [[_feature(p or {}, name) for p in items] for name in feat_names]
+    if np is not None:
+        return np.array(cols, dtype=float).T.reshape(len(items), len(feat_names))
+    return [list(row) for row in zip(*cols)] if cols else [[] for _ in items]
 
 def _heuristic(params: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -120,7 +152,7 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
           drivers: { ... }      # optional diagnostics
         }
     """
-    model = _load_model()
+    model, version = _load_model(params.get("model_version"))
     if not model:
         return _heuristic(params)
 
@@ -137,19 +169,50 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
         return {
             "status": "ok",
             "mode": "ml",
-            "version": _MODEL_VERSION,
+            "version": version,
             "forecast_1w": f1w,
             "forecast_1m": f1m,
-            "drivers": {"model": "sklearn.LinearRegression", "features": feats}
+            "drivers": {"model": model.get("kind", "sklearn.LinearRegression"), "features": feats}
         }
     except Exception:
         # If anything fails, never break valuation – just fallback
         return _heuristic(params)
 
+def run_batch(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Many predictions in one call (portfolio re-marks, token repricing).
+    Input:  { items: [valuation params dict, ...], model_version?: str }
+    Output (columnar, in item order):
+      { status, mode: "ml"|"heuristic", version?, count, forecast_1w: [...], forecast_1m: [...] }
+    With a model, one feature matrix is built and m1/m2 each run once over all rows.
+    """
+    items = list(params.get("items") or [])
+    model, version = _load_model(params.get("model_version"))
+    if model and items:
+        try:
+            X = feature_matrix(items, model["feats"])
+            f1w = [float(v) for v in model["m1"].predict(X)]
+            f1m = [float(v) for v in model["m2"].predict(X)]
+            return {"status": "ok", "mode": "ml", "version": version, "count": len(items),
+                    "forecast_1w": f1w, "forecast_1m": f1m}
+        except Exception:
+            pass   # never break callers – fall back like run()
+    preds = [_heuristic(p or {}) for p in items]
+    return {"status": "ok", "mode": "heuristic", "count": len(items),
+            "forecast_1w": [p["forecast_1w"] for p in preds],
+            "forecast_1m": [p["forecast_1m"] for p in preds]}
+
 # Register with the engine registry so valuation can call it
 register(
     key="market_prediction",
     fn=run,
     name="Market Prediction",
-    description="Predicts 1w/1m drift using a pickled ML model if available; otherwise uses a safe heuristic."
-)
\ No newline at end of file
+    description="Predicts 1w/1m drift using a trained linear model (native JSON or pickled) if available; otherwise uses a safe heuristic."
+)
+
+register(
+    key="market_prediction_batch",
+    fn=run_batch,
+    name="Market Prediction (Batch)",
+    description="1w/1m drift for many projects at once: one feature matrix, one model pass per horizon."
+)
@@ -0,0 +1,345 @@
+# app/engines/Core/montecarlo.py
+from __future__ import annotations
+import ast, math, random, statistics, struct
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.engines.Core import quantiles as _q
+
+try:
+    import numpy as np
+except Exception:  # numpy is optional — fall back to the stdlib sampler
+    np = None
+
+# Which backend the kernels below run on ("numpy" | "python")
+KERNEL = "numpy" if np is not None else "python"
+
+# -------------------------- RNG + raw draws --------------------------
+
+def make_rng(seed: Optional[int] = None) -> Any:
+    """numpy Generator when available, else random.Random. Same seed → same draws."""
+    if np is not None:
+        return np.random.default_rng(seed)
+    return random.Random(seed)
+
+def normals(n: int, k: int, rng: Any) -> Sequence[Sequence[float]]:
+    """k independent standard-normal columns of length n (one vectorized draw)."""
+    if np is not None:
+        return rng.standard_normal((k, n))
+    g = rng.gauss
+    return [[g(0.0, 1.0) for _ in range(n)] for _ in range(k)]
+
+def uniforms(n: int, rng: Any) -> Sequence[float]:
+    if np is not None:
+        return rng.random(n)
+    r = rng.random
+    return [r() for _ in range(n)]
+
+_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19)
+_Z95 = 1.959964
+
+def _inv_norm(u: Sequence[float]) -> Sequence[float]:
+    try:
+        from scipy.special import ndtri
+        return ndtri(u)
+    except Exception:
+        inv = statistics.NormalDist().inv_cdf
+        out = [inv(x) for x in u]
+        return np.asarray(out) if np is not None else out
+
+def _halton(start: int, n: int, base: int, shift: float) -> Sequence[float]:
+    """Radical-inverse sequence in `base`, randomly shifted mod 1 (Cranley–Patterson)."""
+    if np is not None:
+        i = np.arange(start + 1, start + n + 1)
+        r, f = np.zeros(n), 1.0
+        while i.any():
+            f /= base
+            r += f * (i % base)
+            i //= base
+        return (r + shift) % 1.0
+    out = []
+    for i in range(start + 1, start + n + 1):
+        r, f = 0.0, 1.0
+        while i:
+            f /= base
+            r += f * (i % base)
+            i //= base
+        out.append((r + shift) % 1.0)
+    return out
+
+class Sampler:
+    """
+    Chunked source of standard normals + uniforms for one Monte Carlo run.
+      - antithetic: each chunk is half fresh draws, half mirrored (z → -z, u → 1-u)
+      - qmc: low-discrepancy points (scrambled Sobol via scipy if present, else shifted Halton)
+    Successive draw() calls continue the same stream, so chunks can be pooled.
+    """
+    def __init__(self, seed: Optional[int] = None, *, antithetic: bool = False, qmc: bool = False):
+        self.rng = make_rng(seed)
+        self.antithetic = bool(antithetic)
+        self.qmc = bool(qmc)
+        self.sequence = "pseudo"
+        self._qmc_mod: Any = None
+        self._sobol: Any = None
+        self._shift: List[float] = []
+        self._index = 0
+        if self.qmc:
+            try:
+                from scipy.stats import qmc as _qmc
+                self._qmc_mod = _qmc
+                self.sequence = "sobol"
+            except Exception:
+                self.sequence = "halton"
+
+    def _points(self, n: int, d: int) -> List[Sequence[float]]:
+        """n low-discrepancy points in [0,1)^d, one column per dimension."""
+        if self.sequence == "sobol":
+            if self._sobol is None:
+                self._sobol = self._qmc_mod.Sobol(d=d, scramble=True, seed=int(self.rng.integers(2**31)))
+            pts = self._sobol.random(n)
+            cols = [pts[:, j] for j in range(d)]
+        else:
+            while len(self._shift) < d:
+                self._shift.append(float(self.rng.random()))
+            cols = [_halton(self._index, n, _PRIMES[j % len(_PRIMES)], self._shift[j]) for j in range(d)]
+        self._index += n
+        eps = 1e-12
+        if np is not None:
+            return [np.clip(c, eps, 1.0 - eps) for c in cols]
+        return [[min(max(x, eps), 1.0 - eps) for x in c] for c in cols]
+
+    def draw(self, n: int, k_normal: int, k_uniform: int = 0) -> Tuple[List[Sequence[float]], List[Sequence[float]]]:
+        half = (n + 1) // 2 if self.antithetic else n
+        if self.qmc:
+            cols = self._points(half, k_normal + k_uniform)
+            z = [_inv_norm(c) for c in cols[:k_normal]]
+            u = cols[k_normal:]
+        else:
+            z = list(normals(half, k_normal, self.rng)) if k_normal else []
+            u = [uniforms(half, self.rng) for _ in range(k_uniform)]
+        if self.antithetic:
+            if np is not None:
+                z = [np.concatenate([c, -np.asarray(c)])[:n] for c in z]
+                u = [np.concatenate([c, 1.0 - np.asarray(c)])[:n] for c in u]
+            else:
+                z = [(list(c) + [-x for x in c])[:n] for c in z]
+                u = [(list(c) + [1.0 - x for x in c])[:n] for c in u]
+        return z, u
+
+# -------------------------- Sample transforms --------------------------
+
+def equity_samples(base_value: float, *,
+                   baseline_delay: float,
+                   monthly_carry: float,
+                   sales_vol: float,
+                   cost_vol: float,
+                   delay_sd_months: float,
+                   liq_premium: float,
+                   z: Sequence[Sequence[float]]) -> Sequence[float]:
+    """
+    Map standard normals (z_sales, z_cost, z_delay) to equity values:
+      v = base * exp(sales_vol*z_s) / exp(cost_vol*z_c) * (1 - carry*max(0, delay)) * (1 + liq)
+    """
+    zs, zc, zd = z[0], z[1], z[2]
+    if np is not None:
+        delay = np.maximum(0.0, baseline_delay + delay_sd_months * np.asarray(zd))
+        v = base_value * np.exp(sales_vol * np.asarray(zs) - cost_vol * np.asarray(zc))
+        v *= (1.0 - monthly_carry * delay) * (1.0 + liq_premium)
+        return np.maximum(0.0, v)
+    exp, liq = math.exp, 1.0 + liq_premium
+    out: List[float] = []
+    for a, b, c in zip(zs, zc, zd):
+        delay = max(0.0, baseline_delay + delay_sd_months * c)
+        v = base_value * exp(sales_vol * a - cost_vol * b) * (1.0 - monthly_carry * delay) * liq
+        out.append(max(0.0, v))
+    return out
+
+def credit_samples(par_value: float, *,
+                   pd_path: float,
+                   lgd: float,
+                   carry: float,
+                   rate_spread_vol_bps: float,
+                   z: Sequence[Sequence[float]],
+                   u: Sequence[float]) -> Sequence[float]:
+    """
+    Map (z_spread, z_recovery) normals + default uniforms to credit prices:
+      default   → par * max(0, 1 - lgd + 0.03*z_r)
+      otherwise → par * (1 - spread_shock + carry)
+    """
+    zsp, zrec = z[0], z[1]
+    if np is not None:
+        shock = (rate_spread_vol_bps / 10000.0) * np.asarray(zsp)
+        recovery = np.maximum(0.0, 1.0 - lgd + 0.03 * np.asarray(zrec))
+        price = par_value * np.where(np.asarray(u) < pd_path, recovery, 1.0 - shock + carry)
+        return np.maximum(0.0, price)
+    out: List[float] = []
+    for a, b, d in zip(zsp, zrec, u):
+        if d < pd_path:
+            price = par_value * max(0.0, 1.0 - lgd + 0.03 * b)
+        else:
+            price = par_value * (1.0 - (rate_spread_vol_bps / 10000.0) * a + carry)
+        out.append(max(0.0, price))
+    return out
+
+def equity_draws(base_value: float, *,
+                 baseline_delay: float,
+                 monthly_carry: float,
+                 sales_vol: float,
+                 cost_vol: float,
+                 delay_sd_months: float,
+                 liq_premium: float,
+                 z: Sequence[Sequence[float]]) -> Dict[str, Sequence[float]]:
+    """equity_samples plus the per-draw drivers, as columns (value, sales_mult, cost_mult, delay_months)."""
+    zs, zc, zd = z[0], z[1], z[2]
+    if np is not None:
+        sales = np.exp(sales_vol * np.asarray(zs))
+        cost = np.exp(cost_vol * np.asarray(zc))
+        delay = np.maximum(0.0, baseline_delay + delay_sd_months * np.asarray(zd))
+        value = np.maximum(0.0, base_value * sales / cost * (1.0 - monthly_carry * delay) * (1.0 + liq_premium))
+        return {"value": value, "sales_mult": sales, "cost_mult": cost, "delay_months": delay}
+    sales = [math.exp(sales_vol * a) for a in zs]
+    cost = [math.exp(cost_vol * b) for b in zc]
+    delay = [max(0.0, baseline_delay + delay_sd_months * c) for c in zd]
+    value = [max(0.0, base_value * s / c * (1.0 - monthly_carry * d) * (1.0 + liq_premium))
+             for s, c, d in zip(sales, cost, delay)]
+    return {"value": value, "sales_mult": sales, "cost_mult": cost, "delay_months": delay}
+
+def credit_draws(par_value: float, *,
+                 pd_path: float,
+                 lgd: float,
+                 carry: float,
+                 rate_spread_vol_bps: float,
+                 z: Sequence[Sequence[float]],
+                 u: Sequence[float]) -> Dict[str, Sequence[float]]:
+    """credit_samples plus the per-draw drivers, as columns (value, spread_shock, defaulted, recovery)."""
+    k = rate_spread_vol_bps / 10000.0
+    if np is not None:
+        shock = k * np.asarray(z[0])
+        recovery = np.maximum(0.0, 1.0 - lgd + 0.03 * np.asarray(z[1]))
+        defaulted = (np.asarray(u) < pd_path).astype(float)
+        value = np.maximum(0.0, par_value * np.where(defaulted > 0, recovery, 1.0 - shock + carry))
+        return {"value": value, "spread_shock": shock, "defaulted": defaulted, "recovery": recovery}
+    shock = [k * a for a in z[0]]
+    recovery = [max(0.0, 1.0 - lgd + 0.03 * b) for b in z[1]]
+    defaulted = [1.0 if d < pd_path else 0.0 for d in u]
+    value = [max(0.0, par_value * (r if f else 1.0 - sh + carry)) for sh, r, f in zip(shock, recovery, defaulted)]
+    return {"value": value, "spread_shock": shock, "defaulted": defaulted, "recovery": recovery}
+
+# -------------------------- Columnar export --------------------------
+
+def npy_chunk(columns: Dict[str, Sequence[float]]) -> bytes:
+    """
+    One self-contained .npy record array (little-endian float64 per column).
+    Concatenated chunks read back with repeated np.load(f) on the same file object.
+    """
+    names = list(columns)
+    n = len(columns[names[0]]) if names else 0
+    header = repr({"descr": [(c, "<f8") for c in names], "fortran_order": False, "shape": (n,)})
+    # magic(6) + version(2) + header_len(2) + header, padded with spaces to a multiple of 64 and ending in \n
+    pad = 64 - (10 + len(header) + 1) % 64
+    header = header + " " * (pad % 64) + "\n"
+    head = b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+    if np is not None:
+        body = np.column_stack([np.asarray(columns[c], dtype="<f8") for c in names]).tobytes() if n else b""
+    else:
+        rows = array("d", (float(columns[c][i]) for i in range(n) for c in names))
+        if struct.pack("=d", 1.0) != struct.pack("<d", 1.0):
+            rows.byteswap()
+        body = rows.tobytes()
+    return head + body
+
+def read_npy_chunks(blob: bytes) -> List[Dict[str, List[float]]]:
+    """Inverse of npy_chunk over a concatenated stream (stdlib only; handy for tests/clients)."""
+    out, pos = [], 0
+    while pos < len(blob):
+        hlen = struct.unpack("<H", blob[pos + 8:pos + 10])[0]
+        meta = ast.literal_eval(blob[pos + 10:pos + 10 + hlen].decode("latin1"))
+        names = [d[0] for d in meta["descr"]]
+        n = meta["shape"][0]
+        start = pos + 10 + hlen
+        vals = struct.unpack(f"<{n * len(names)}d", blob[start:start + 8 * n * len(names)])
+        out.append({c: list(vals[j::len(names)]) for j, c in enumerate(names)})
+        pos = start + 8 * n * len(names)
+    return out
+
+# -------------------------- Summaries --------------------------
+
+def percentiles(samples: Sequence[float], qs: Sequence[float]) -> List[float]:
+    """Linear-interpolated percentiles (same convention as valuation._percentiles), by partial selection."""
+    return _q.exact(samples, qs)
+
+def percentiles_with_error(samples: Sequence[float], qs: Sequence[float]) -> Tuple[List[float], List[float]]:
+    """
+    Percentile estimates plus a distribution-free standard error for each, from the
+    order-statistic 95% interval: se ≈ (x[n*q + 1.96*sqrt(nq(1-q))] - x[n*q - ...]) / (2*1.96).
+    All needed order statistics come from one partial selection.
+    """
+    n = len(samples)
+    if not n:
+        return [math.nan for _ in qs], [math.nan for _ in qs]
+    est = _q.exact(samples, qs)
+    ranks = []
+    for q in qs:
+        half = _Z95 * math.sqrt(n * q * (1 - q))
+        ranks += [int(max(0, math.floor(n * q - half))), int(min(n - 1, math.ceil(n * q + half)))]
+    bounds = _q.select(samples, ranks)
+    ses = [(bounds[2 * j + 1] - bounds[2 * j]) / (2 * _Z95) for j in range(len(qs))]
+    return est, ses
+
+def paired_delta(base: Sequence[float], alt: Sequence[float]) -> Dict[str, Any]:
+    """
+    Mean of alt - base over draws made from the SAME random numbers (common random numbers),
+    with its standard error and 95% CI. variance_ratio = (var(base) + var(alt)) / var(delta)
+    is how many times more draws two independent runs would need for the same CI width.
+    """
+    n = min(len(base), len(alt))
+    if n < 2:
+        return {"mean": math.nan, "std_err": math.nan, "ci95": [math.nan, math.nan], "variance_ratio": None}
+    if np is not None:
+        a, b = np.asarray(base[:n], dtype=float), np.asarray(alt[:n], dtype=float)
+        d = b - a
+        mean, var_d = float(d.mean()), float(d.var(ddof=1))
+        var_ind = float(a.var(ddof=1) + b.var(ddof=1))
+    else:
+        a, b = list(base[:n]), list(alt[:n])
+        d = [y - x for x, y in zip(a, b)]
+        mean, var_d = statistics.fmean(d), statistics.variance(d)
+        var_ind = statistics.variance(a) + statistics.variance(b)
+    se = math.sqrt(var_d / n)
+    return {
+        "mean": mean,
+        "std_err": se,
+        "ci95": [mean - _Z95 * se, mean + _Z95 * se],
+        "variance_ratio": (var_ind / var_d) if var_d > 0 else None,
+    }
+
+def run_adaptive(sample_chunk: Callable[[int], Sequence[float]], *,
+                 qs: Sequence[float],
+                 tol: float,
+                 chunk: int = 512,
+                 max_n: int = 20000) -> Tuple[Sequence[float], List[float], Dict[str, Any]]:
+    """
+    Draw `chunk` samples at a time until every percentile's standard error is within
+    `tol` of its estimate (relative), or `max_n` samples have been used.
+    Returns (pooled samples, estimates, diagnostics).
+    """
+    chunk = max(16, int(chunk))
+    max_n = max(chunk, int(max_n))
+    parts: List[Sequence[float]] = []
+    n, est, ses, rel = 0, [], [], math.inf
+    while n < max_n:
+        parts.append(sample_chunk(min(chunk, max_n - n)))
+        n += len(parts[-1])
+        pooled = np.concatenate(parts) if np is not None else [x for p in parts for x in p]
+        est, ses = percentiles_with_error(pooled, qs)
+        rel = max(se / max(abs(e), 1e-12) for e, se in zip(est, ses))
+        if n >= 2 * chunk and rel <= tol:
+            break
+    pooled = np.concatenate(parts) if np is not None else [x for p in parts for x in p]
+    return pooled, est, {
+        "samples": n,
+        "tol": tol,
+        "rel_err": rel,
+        "std_err": {f"p{int(round(q * 100))}": se for q, se in zip(qs, ses)},
+        "converged": rel <= tol,
+    }
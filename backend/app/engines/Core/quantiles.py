@@ -0,0 +1,185 @@
+# app/engines/Core/quantiles.py
+from __future__ import annotations
+import bisect, math, random
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except Exception:  # numpy is optional — falls back to sorted()/lists
+    np = None
+
+# -------------------------- Exact selection --------------------------
+
+def select(data: Sequence[float], ks: Sequence[int]) -> List[float]:
+    """
+    The k-th smallest values (0-based) for each k in ks. With numpy this is a single
+    introselect partition over all requested ranks (O(n)), not a full sort. Without numpy
+    sorted() is used — the C sort beats a pure-Python quickselect at these sizes.
+    """
+    n = len(data)
+    ks = [min(max(int(k), 0), n - 1) for k in ks]
+    if np is not None:
+        arr = np.asarray(data, dtype=float)
+        uniq = sorted(set(ks))
+        part = np.partition(arr, uniq)
+        return [float(part[k]) for k in ks]
+    xs = sorted(data)
+    return [xs[k] for k in ks]
+
+def _position(q: float, n: int, method: str) -> float:
+    if method == "exclusive":        # statistics.quantiles default: h = q*(n+1) - 1
+        return q * (n + 1) - 1
+    return q * (n - 1)               # "linear" (numpy default / valuation._percentiles)
+
+def exact(data: Sequence[float], qs: Sequence[float], method: str = "linear") -> List[float]:
+    """
+    Interpolated quantiles by partial selection.
+      linear:    h = q*(n-1), clamped to the sample range (valuation's convention)
+      exclusive: h = q*(n+1)-1, as statistics.quantiles(method="exclusive"), n >= 2
+    """
+    n = len(data)
+    if not n:
+        return [math.nan for _ in qs]
+    plan = []
+    for q in qs:
+        if method == "linear" and q <= 0:
+            plan.append((0, 0, 0.0))
+            continue
+        if method == "linear" and q >= 1:
+            plan.append((n - 1, n - 1, 0.0))
+            continue
+        h = _position(q, n, method)
+        if method == "exclusive":
+            lo = min(max(int(math.floor(h)), 0), max(n - 2, 0))
+            hi = min(lo + 1, n - 1)
+        else:
+            lo, hi = int(math.floor(h)), int(math.ceil(h))
+        plan.append((lo, hi, h - lo))
+    vals = select(data, [k for lo, hi, _ in plan for k in (lo, hi)])
+    out = []
+    for j, (lo, hi, w) in enumerate(plan):
+        a, b = vals[2 * j], vals[2 * j + 1]
+        out.append(a if lo == hi else a * (1 - w) + b * w)
+    return out
+
+# -------------------------- KLL streaming sketch --------------------------
+
+class KLLSketch:
+    """
+    Mergeable streaming quantile sketch (Karnin–Lang–Liberty). Keeps O(k log(n/k)) items;
+    normalized rank error is roughly 1.7/k. Sketches built on different workers/chunks
+    merge into one with the same error bound as a single sketch over the union, and
+    serialize with to_dict()/from_dict(), so partial results travel without raw samples.
+    """
+    _C = 2.0 / 3.0
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = max(8, int(k))
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels: List[Any] = [self._empty()]
+        self._rng = random.Random(seed)
+
+    # ---- internals ----
+    def _empty(self) -> Any:
+        return np.empty(0) if np is not None else []
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - 1 - h
+        return max(2, int(math.ceil(self.k * self._C ** depth)))
+
+    def _size(self) -> int:
+        return sum(len(lv) for lv in self.levels)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def _compact(self) -> None:
+        while self._size() > self._max_size():
+            h = next(h for h in range(len(self.levels)) if len(self.levels[h]) >= self._capacity(h))
+            if h + 1 == len(self.levels):
+                self.levels.append(self._empty())
+            lv = np.sort(self.levels[h]) if np is not None else sorted(self.levels[h])
+            keep = lv[:1] if len(lv) % 2 else lv[:0]
+            body = lv[len(keep):]
+            promoted = body[self._rng.randint(0, 1)::2]
+            if np is not None:
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                self.levels[h] = np.array(keep)
+            else:
+                self.levels[h + 1] = self.levels[h + 1] + list(promoted)
+                self.levels[h] = list(keep)
+
+    # ---- public API ----
+    def update(self, x: float) -> None:
+        self.update_many([x])
+
+    def update_many(self, xs: Iterable[float]) -> None:
+        if np is not None:
+            arr = np.asarray(xs if hasattr(xs, "__len__") else list(xs), dtype=float).ravel()
+            if not arr.size:
+                return
+            self.n += int(arr.size)
+            self.min = min(self.min, float(arr.min()))
+            self.max = max(self.max, float(arr.max()))
+            self.levels[0] = np.concatenate([self.levels[0], arr])
+        else:
+            xs = [float(x) for x in xs]
+            if not xs:
+                return
+            self.n += len(xs)
+            self.min = min(self.min, min(xs))
+            self.max = max(self.max, max(xs))
+            self.levels[0] = self.levels[0] + xs
+        self._compact()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        if other.n == 0:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(self._empty())
+        for h, lv in enumerate(other.levels):
+            if np is not None:
+                self.levels[h] = np.concatenate([self.levels[h], np.asarray(lv, dtype=float)])
+            else:
+                self.levels[h] = self.levels[h] + list(lv)
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compact()
+        return self
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        if self.n == 0:
+            return [math.nan for _ in qs]
+        items = sorted((float(v), 1 << h) for h, lv in enumerate(self.levels) for v in lv)
+        cum, acc = [], 0
+        for _, w in items:
+            acc += w
+            cum.append(acc)
+        out = []
+        for q in qs:
+            if q <= 0:
+                out.append(self.min)
+            elif q >= 1:
+                out.append(self.max)
+            else:
+                i = bisect.bisect_left(cum, q * acc)
+                out.append(items[min(i, len(items) - 1)][0])
+        return out
+
+    def rank_error(self) -> float:
+        """Approximate normalized rank error (single-sided, ~99% confidence)."""
+        return 1.7 / self.k if self.n > self._max_size() else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k": self.k, "n": self.n, "min": self.min, "max": self.max,
+                "levels": [[float(v) for v in lv] for lv in self.levels]}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "KLLSketch":
+        sk = cls(k=int(d["k"]))
+        sk.n, sk.min, sk.max = int(d["n"]), float(d["min"]), float(d["max"])
+        sk.levels = [np.asarray(lv, dtype=float) if np is not None else list(lv) for lv in d["levels"]] or [sk._empty()]
+        return sk
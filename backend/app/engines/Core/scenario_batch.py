@@ -0,0 +1,304 @@
+# app/engines/Core/scenario_batch.py
+from __future__ import annotations
+import csv, hashlib, json, os, sys, time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.engines.Core.app.engines.core import scenario as _sc
+from app.engines.Core.comps_store import _last_offset, _map_bytes, _map_column, _write_tail
+
+# Overnight affordability run over a whole customer base.
+# Persons stream from CSV or JSONL in fixed-size chunks, each chunk is evaluated on the
+# job's own process pool (vectorized projection + table safe-until-rate), and results are
+# appended in input order to a columnar output directory:
+#   <out>/meta.json        job signature, committed rows/chunks, progress counters
+#   <out>/<column>.bin     one typed array per numeric column
+#   <out>/person_id.dat/.idx  ids, as address.dat/.idx in comps_store
+# A chunk is committed by fsyncing the column tails and then atomically replacing
+# meta.json; after a crash the job restarts at the first uncommitted chunk and overwrites
+# any torn tail.
+# This is an offline job, run from the command line (see __main__ below); it is not an
+# engine, so it cannot be started through /engines/run.
+
+COLUMNS: Dict[str, str] = {
+    "ok": "b",                        # 1 evaluated, 0 unparseable input row
+    "unlock_year": "h",               # -1 = not within the horizon
+    "unlock_year_faster": "h",
+    "unlock_year_windfall": "h",
+    "safe_until_rate": "d",           # percent
+    "gauge": "b",                     # index into GAUGES
+    "affordability_now": "d",
+    "affordability_end": "d",
+}
+GAUGES = ("green", "amber", "red")
+_VERSION = 1
+_META = "meta.json"
+_DEFAULT_TARGET = 2_000_000.0        # scenario.run's fallback target price
+
+# -------------------------- Input --------------------------
+
+def _records(path: str) -> Iterator[Dict[str, Any]]:
+    if path.endswith((".jsonl", ".ndjson")):
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        yield {}
+    else:
+        with open(path, newline="") as f:
+            yield from csv.DictReader(f)
+
+def iter_chunks(path: str, chunk: int, skip_chunks: int = 0) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """(chunk number, records) in file order; the first skip_chunks chunks are read past, not built."""
+    buf: List[Dict[str, Any]] = []
+    n = 0
+    skip_rows = skip_chunks * chunk
+    for i, rec in enumerate(_records(path)):
+        if i < skip_rows:
+            continue
+        buf.append(rec)
+        if len(buf) >= chunk:
+            yield skip_chunks + n, buf
+            buf, n = [], n + 1
+    if buf:
+        yield skip_chunks + n, buf
+
+# -------------------------- Evaluation --------------------------
+
+def evaluate_chunk(task: Tuple[List[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+    """One chunk → {"person_id": [...], <column>: array}. Runs in a pool worker."""
+    records, job = task
+    ids: List[str] = []
+    persons: List[_sc.Person] = []
+    targets: List[float] = []
+    ok = array("b")
+    for rec in records:
+        ids.append(str(rec.get("person_id") or rec.get("id") or ""))
+        try:
+            p = _sc.person_from(rec)
+            t = float(rec.get("target_price") or job["target_price"])
+            ok.append(1)
+        except (TypeError, ValueError, AttributeError):
+            p, t = _sc.Person(0.0, 0.0, 0.0, 0.2, 6.0), job["target_price"]
+            ok.append(0)
+        persons.append(p)
+        targets.append(t)
+
+    months, start_year = job["months"], job["start_year"]
+    variants = [persons, [_sc._SCENARIOS["faster_savings"](p) for p in persons],
+                [_sc._SCENARIOS["windfall"](p) for p in persons]]
+    n = len(persons)
+    rows = _sc.project_affordability_many([p for v in variants for p in v], [0] * (3 * n), [job["macros"]], months)
+    hit = _sc.unlock_months(rows, targets * 3, per_row=True)
+    years = [start_year + int((int(m) + 1) / 12) if m >= 0 else -1 for m in hit]
+    safe = _sc.safe_until_rates([p.income for p in persons], [p.max_dti for p in persons])
+
+    out: Dict[str, Any] = {
+        "person_id": ids,
+        "ok": ok,
+        "unlock_year": array("h", years[:n]),
+        "unlock_year_faster": array("h", years[n:2 * n]),
+        "unlock_year_windfall": array("h", years[2 * n:]),
+        "safe_until_rate": array("d", safe),
+        "gauge": array("b", [GAUGES.index(_sc._gauge(r)) for r in safe]),
+        "affordability_now": array("d", [float(rows[i][0]) for i in range(n)]),
+        "affordability_end": array("d", [float(rows[i][months - 1]) for i in range(n)]),
+    }
+    for i in range(n):
+        if not ok[i]:
+            for c in COLUMNS:
+                if c != "ok":
+                    out[c][i] = 0
+    return out
+
+# -------------------------- Output --------------------------
+
+def _signature(input_path: str, job: Dict[str, Any], chunk: int) -> str:
+    st = os.stat(input_path)
+    payload = json.dumps({"input": os.path.abspath(input_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                          "job": job, "chunk": chunk}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _read_meta(out_dir: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(out_dir, _META)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _write_meta(out_dir: str, meta: Dict[str, Any]) -> None:
+    tmp = os.path.join(out_dir, _META + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(out_dir, _META))
+
+def _append_tail(fname: str, at: int, data: bytes) -> None:
+    _write_tail(fname, at, data)
+    fd = os.open(fname, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _commit(out_dir: str, meta: Dict[str, Any], res: Dict[str, Any]) -> None:
+    n = meta["rows"]
+    for c, tc in COLUMNS.items():
+        buf = res[c] if isinstance(res[c], array) else array(tc, res[c])
+        _append_tail(os.path.join(out_dir, c + ".bin"), n * buf.itemsize, buf.tobytes())
+    base = _last_offset(os.path.join(out_dir, "person_id.idx"), n)
+    data, ends = bytearray(), array("q")
+    for pid in res["person_id"]:
+        data += pid.encode("utf-8")
+        ends.append(base + len(data))
+    _append_tail(os.path.join(out_dir, "person_id.dat"), base, bytes(data))
+    _append_tail(os.path.join(out_dir, "person_id.idx"), n * 8, ends.tobytes())
+    meta["rows"] = n + len(ends)
+    meta["chunks_done"] += 1
+    _write_meta(out_dir, meta)
+
+def read_results(out_dir: str) -> Dict[str, Any]:
+    """Committed columns of a (possibly still running) job: typed views plus decoded person ids."""
+    meta = _read_meta(out_dir)
+    if meta is None:
+        raise FileNotFoundError(f"no scenario batch output at {out_dir}")
+    n = int(meta["rows"])
+    out: Dict[str, Any] = {c: _map_column(os.path.join(out_dir, c + ".bin"), tc, n) for c, tc in COLUMNS.items()}
+    idx = _map_column(os.path.join(out_dir, "person_id.idx"), "q", n)
+    dat = _map_bytes(os.path.join(out_dir, "person_id.dat"))
+    out["person_id"] = [bytes(dat[(int(idx[k - 1]) if k else 0):int(idx[k])]).decode("utf-8") for k in range(n)]
+    out["meta"] = meta
+    return out
+
+# -------------------------- Job --------------------------
+
+def run_job(input_path: str, out_dir: str, *,
+            chunk: int = 10_000,
+            max_workers: Optional[int] = None,
+            macros: Optional[Dict[str, Any]] = None,
+            target_price: Optional[float] = None,
+            months: int = 36,
+            start_year: int = 2025,
+            restart: bool = False,
+            on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Evaluate every person in input_path (CSV or JSONL) and append results to out_dir.
+    At most 2 × workers chunks are in flight, so memory is bounded by the chunk size, not
+    the file. Re-running the same job resumes after the last committed chunk; a different
+    input/parameters needs restart=True. Returns the final progress counters.
+    """
+    return _run_job(input_path, out_dir, chunk=chunk, max_workers=max_workers, macros=macros,
+                    target_price=target_price, months=months, start_year=start_year,
+                    restart=restart, on_progress=on_progress, stop_after=None)
+
+def _run_job(input_path: str, out_dir: str, *, chunk: int, max_workers: Optional[int],
+             macros: Optional[Dict[str, Any]], target_price: Optional[float], months: int,
+             start_year: int, restart: bool,
+             on_progress: Optional[Callable[[Dict[str, Any]], None]],
+             stop_after: Optional[int]) -> Dict[str, Any]:
+    # stop_after: tests only — stop after N submitted chunks, as a crash would
+    from app.engines import workers
+
+    job = {"macros": macros or {}, "target_price": float(target_price or _DEFAULT_TARGET),
+           "months": max(1, int(months)), "start_year": int(start_year)}
+    chunk = max(1, int(chunk))
+    sig = _signature(input_path, job, chunk)
+    os.makedirs(out_dir, exist_ok=True)
+    meta = _read_meta(out_dir)
+    if meta is not None and meta.get("signature") != sig and not restart:
+        raise ValueError(f"{out_dir} holds a different job; pass restart=True to overwrite it")
+    if meta is None or meta.get("signature") != sig:
+        for name in list(COLUMNS) + ["person_id"]:
+            for ext in ((".dat", ".idx") if name == "person_id" else (".bin",)):
+                open(os.path.join(out_dir, name + ext), "wb").close()
+        meta = {"version": _VERSION, "signature": sig, "input": os.path.abspath(input_path), "job": job,
+                "chunk": chunk, "rows": 0, "chunks_done": 0, "byteorder": sys.byteorder,
+                "columns": COLUMNS, "gauges": list(GAUGES), "complete": False}
+        _write_meta(out_dir, meta)
+    if meta.get("complete"):
+        return meta["progress"]
+
+    n_workers = max(1, min(int(max_workers or workers.available_cpus()), workers.available_cpus()))
+    if n_workers == 1:
+        return _run_chunks(input_path, out_dir, meta, job, None, 1, on_progress, stop_after)
+    # the job's own pool: a shared pool can be replaced (and shut down) by other callers mid-job
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=workers.mp_context()) as pool:
+        try:
+            return _run_chunks(input_path, out_dir, meta, job, pool, n_workers, on_progress, stop_after)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+def _run_chunks(input_path: str, out_dir: str, meta: Dict[str, Any], job: Dict[str, Any],
+                pool: Optional[ProcessPoolExecutor], n_workers: int,
+                on_progress: Optional[Callable[[Dict[str, Any]], None]],
+                stop_after: Optional[int]) -> Dict[str, Any]:
+    chunk = meta["chunk"]
+    resumed_at = meta["chunks_done"]
+    t0 = time.perf_counter()
+    rows_this_run = 0
+    inflight: deque = deque()
+
+    def progress() -> Dict[str, Any]:
+        elapsed = time.perf_counter() - t0
+        return {
+            "chunks_done": meta["chunks_done"],
+            "rows_done": meta["rows"],
+            "resumed_from_chunk": resumed_at,
+            "rows_this_run": rows_this_run,
+            "elapsed_s": round(elapsed, 3),
+            "rows_per_s": round(rows_this_run / elapsed, 1) if elapsed > 0 else None,
+            "in_flight": len(inflight),
+        }
+
+    def drain_one() -> None:
+        nonlocal rows_this_run
+        _no, fut = inflight.popleft()
+        res = fut.result() if pool is not None else fut
+        _commit(out_dir, meta, res)
+        rows_this_run += len(res["person_id"])
+        meta["progress"] = progress()
+        if on_progress is not None:
+            on_progress(meta["progress"])
+
+    stopped = False
+    for no, records in iter_chunks(input_path, chunk, skip_chunks=resumed_at):
+        if stop_after is not None and no - resumed_at >= stop_after:
+            stopped = True
+            break
+        task = (records, job)
+        inflight.append((no, pool.submit(evaluate_chunk, task) if pool is not None else evaluate_chunk(task)))
+        # commit in input order: block when the window is full, otherwise take whatever is ready
+        while inflight and (pool is None or len(inflight) >= 2 * n_workers or inflight[0][1].done()):
+            drain_one()
+    if stopped:
+        return progress()
+    while inflight:
+        drain_one()
+    meta["complete"] = True
+    meta["progress"] = progress()
+    _write_meta(out_dir, meta)
+    return meta["progress"]
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Population affordability run: persons CSV/JSONL → columnar results")
+    ap.add_argument("input_path")
+    ap.add_argument("out_dir")
+    ap.add_argument("--chunk", type=int, default=10_000)
+    ap.add_argument("--workers", type=int)
+    ap.add_argument("--macros", help="JSON object of macro paths (cash_rate_path_bps, wages_path_pct, cpi_path_pct)")
+    ap.add_argument("--target-price", type=float)
+    ap.add_argument("--months", type=int, default=36)
+    ap.add_argument("--restart", action="store_true")
+    a = ap.parse_args()
+    final = run_job(a.input_path, a.out_dir, chunk=a.chunk, max_workers=a.workers,
+                    macros=json.loads(a.macros) if a.macros else None, target_price=a.target_price,
+                    months=a.months, restart=a.restart,
+                    on_progress=lambda s: print(json.dumps(s), file=sys.stderr, flush=True))
+    print(json.dumps(final))
@@ -0,0 +1,66 @@
+# app/engines/Core/test_cache.py
+from __future__ import annotations
+
+from app.engines import cache
+from app.engines.Core import valuation
+
+
+def test_memory_backend_evicts_by_bytes_and_expires():
+    be = cache.MemoryBackend(ttl_s=60, max_bytes=10)
+    be.set("a", b"12345")
+    be.set("b", b"12345")
+    be.set("c", b"12345")          # over budget → least recently used ("a") goes
+    assert be.get("a") is None and be.get("c") == b"12345"
+    assert be.stats.evictions == 1
+
+    be = cache.MemoryBackend(ttl_s=-1)
+    be.set("k", b"x")
+    assert be.get("k") is None and be.stats.expirations == 1
+
+
+def test_sqlite_backend_round_trip(tmp_path):
+    rc = cache.ResultCache(cache.SqliteBackend(str(tmp_path / "c.sqlite"), ttl_s=60))
+    rc.set("k", {"v": [1, 2.5], "s": "x"})
+    assert rc.get("k") == {"v": [1, 2.5], "s": "x"}
+    assert rc.get("missing") is None
+    rc.set("obj", {"v": object()})        # not JSON-shaped → not cached (stored as JSON, never pickled)
+    assert rc.backend.get("obj") is None
+    assert rc.info()["entries"] == 1 and rc.info()["hits"] == 1
+
+
+def test_valuation_run_hits_cache_for_identical_params():
+    params = {"mode": "credit", "address": "1 Example Rd, Sydney", "loan_amount": 800_000,
+              "coupon_apr": 0.10, "tenor_months": 24, "monte_carlo": {"seed": 11}}
+    info = cache.get_cache("valuation").info
+    hits = info()["hits"]
+    first = valuation.run(params)
+    second = valuation.run(dict(params))
+    assert second == first and second is not first
+    assert info()["hits"] == hits + 1
+    assert valuation.cache_key(valuation.ValuationParams(**params)) != \
+        valuation.cache_key(valuation.ValuationParams(**{**params, "monte_carlo": {"seed": 12}}))
+
+
+def test_valuation_run_does_not_cache_unseeded_bands():
+    params = {"mode": "credit", "address": "1 Example Rd, Sydney", "loan_amount": 800_000,
+              "coupon_apr": 0.10, "tenor_months": 24}
+    info = cache.get_cache("valuation").info
+    before = info()
+    valuation.run(params)
+    valuation.run(dict(params))
+    assert info()["hits"] == before["hits"] and info()["entries"] == before["entries"]
+
+
+def test_valuation_cache_key_follows_comps_data_and_served_model(monkeypatch):
+    from app.engines.Core import comps, market_prediction
+    p = valuation.ValuationParams(mode="equity", address="1 Test St, Sydney", use_comps=True,
+                                  monte_carlo={"seed": 3})
+    monkeypatch.setattr(comps, "source_signature", lambda: "csv:1")
+    monkeypatch.setattr(market_prediction, "model_fingerprint", lambda version=None: "sha-a")
+    key = valuation.cache_key(p)
+    assert valuation.cache_key(p) == key
+    monkeypatch.setattr(comps, "source_signature", lambda: "csv:2")
+    assert valuation.cache_key(p) != key
+    moved = valuation.cache_key(p)
+    monkeypatch.setattr(market_prediction, "model_fingerprint", lambda version=None: "sha-b")
+    assert valuation.cache_key(p) != moved
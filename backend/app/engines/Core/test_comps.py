@@ -58,5 +58,137 @@ def main():
     else:
         print("\nNo price/sqft pairs found to compute $/sf.")
 
+def test_csv_provider_index_matches_scan_and_reloads(tmp_path):
+    import csv, os, random
+    path = tmp_path / "comps_seed.csv"
+    rng = random.Random(0)
+
+    def write(n):
+        with open(path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["address", "lat", "lon", "price", "sqft", "beds", "baths", "months_ago", "year_built"])
+            for i in range(n):
+                w.writerow([f"{i} Comp St", -33.9 + rng.random() * 0.2, 151.1 + rng.random() * 0.2,
+                            rng.randint(500_000, 2_000_000), rng.randint(600, 2500), 3, 2, rng.randint(0, 24), 2010])
+
+    write(2_000)
+    prov = comps.LocalCsvProvider(str(path))
+    got = prov.fetch(address="x", lat=-33.8, lon=151.2, radius_km=2.0, limit=10)
+    rows = comps.load_csv_index(str(path)).rows
+    scan = sorted((comps._haversine_km(-33.8, 151.2, r["lat"], r["lon"]), r["months_ago"], r["address"]) for r in rows)
+    assert [c["address"] for c in got] == [a for d, _, a in scan if d <= 2.0][:10]
+
+    write(5)
+    os.utime(path, ns=(1, 1))   # force a new mtime stamp even on coarse-grained filesystems
+    assert len(comps.load_csv_index(str(path)).rows) == 5
+
+def test_columnar_store_appends_and_queries(tmp_path):
+    from app.engines.Core import comps_store
+    store = comps_store.ColumnarCompsStore.create(str(tmp_path / "store"))
+    sales = [{"address": f"{i} Märket St", "lat": -33.8 + i * 1e-3, "lon": 151.2, "price": 900_000 + i,
+              "sqft": 1000, "beds": 2, "baths": 2.1, "months_ago": i % 12, "year_built": 2015} for i in range(50)]
+    assert store.append(sales[:30]) == 30
+    reader = comps_store.ColumnarCompsStore(str(tmp_path / "store"))   # e.g. another worker
+    assert len(reader) == 30
+    assert store.append(sales[30:]) == 50
+    got = comps_store.ColumnarCompsProvider(str(tmp_path / "store")).fetch(
+        address="x", lat=-33.8 + 40e-3, lon=151.2, radius_km=0.5, limit=3)
+    assert got[0]["address"] == "40 Märket St"
+    assert {c["address"] for c in got[1:]} == {"39 Märket St", "41 Märket St"}
+    assert got[0]["price"] == 900_040 and got[0]["baths"] == 2.1 and len(reader) == 50
+
+def test_vectorized_enrichment_matches_loop():
+    import math, random
+    if comps.np is None:
+        return
+    rng = random.Random(3)
+    cands = [{"address": f"{i} Comp St", "price": rng.uniform(3e5, 3e6) if i % 17 else 0.0, "sqft": rng.randint(500, 3000),
+              "lat": -33.8 + rng.uniform(-.02, .02), "lon": 151.2 + rng.uniform(-.02, .02),
+              "beds": rng.choice([None, 2, 3, 4]), "baths": rng.choice([None, 1.0, 2.0]),
+              "months_ago": rng.choice([None, 0, 6, 18]), "source": "t"} for i in range(200)]
+    n_a, rows_a, med_a, wmed_a = comps._enrich_and_trim(cands, -33.8, 151.2, 1500, 3, 2.0)
+    n_b, rows_b, med_b, wmed_b = comps._enrich_and_trim_np(cands, -33.8, 151.2, 1500, 3, 2.0)
+    assert (n_a, med_a, wmed_a) == (n_b, med_b, wmed_b)
+    assert [r["address"] for r in rows_a] == [r["address"] for r in rows_b]
+    for a, b in zip(rows_a, rows_b):
+        assert all(math.isclose(a[k], b[k], rel_tol=1e-12) for k in ("psf_adj", "distance_km", "similarity", "weight"))
+
+def test_batch_comps_matches_single_calls():
+    subjects = [{"address": "1 Harbour St, Sydney", "limit": 6},
+                {"address": "9 Collins St, Melbourne", "radius_miles": 2.0},
+                {"address": "1 Harbour St, Sydney", "limit": 6}]
+    out = comps.run_many({"subjects": subjects})
+    assert out["status"] == "ok" and len(out["results"]) == 3
+    def sans_timing(res):
+        for sm in res["summary"]:
+            sm["quality"].pop("providers")
+        return res
+
+    for subj, res in zip(subjects, out["results"]):
+        assert sans_timing(res) == sans_timing(comps.run(subj))
+    # the repeated subject's candidates are counted once
+    assert out["candidates"]["unique"] < out["candidates"]["requested"]
+    lean = comps.run_many({"subjects": subjects[:1], "include_comps": False})
+    assert "comps" not in lean["results"][0] and lean["results"][0]["summary"]
+
+def test_provider_fanout_deadline_and_hedging():
+    import time
+
+    class Slow(comps.BaseProvider):
+        name, timeout_s = "slow", 0.05
+
+        def fetch(self, **q):
+            time.sleep(0.5)
+            return [{"address": "late", "price": 1.0, "sqft": 1}]
+
+    class Flaky(comps.BaseProvider):
+        name, hedge_after_s = "flaky", 0.02
+
+        def __init__(self):
+            self.calls = 0
+
+        def fetch(self, **q):
+            self.calls += 1
+            if self.calls == 1:
+                time.sleep(0.3)         # first request stalls; the hedge answers
+            return [{"address": f"hedged {q['address']}", "price": 1.0, "sqft": 1}]
+
+    subj = comps._subject({"address": "1 Harbour St, Sydney"})
+    t = time.monotonic()
+    raw, stats = comps._fetch([Slow(), Flaky(), comps.SyntheticProvider()], [subj], deadline_s=1.0)
+    assert time.monotonic() - t < 0.25
+    assert [st["status"] for st in stats] == ["timeout", "ok", "ok"]
+    assert stats[1]["hedged"] and raw[0][0]["address"].startswith("hedged")
+    assert all(c["address"] != "late" for c in raw[0])
+
+def test_local_provider_is_not_cut_off_by_the_request_deadline():
+    import time
+
+    class Rebuilding(comps.BaseProvider):
+        name, local = "rebuilding", True
+
+        def fetch(self, **q):
+            time.sleep(0.15)            # stands in for an inline index rebuild
+            return [{"address": "indexed", "price": 1.0, "sqft": 1}]
+
+    subj = comps._subject({"address": "1 Harbour St, Sydney"})
+    raw, stats = comps._fetch([Rebuilding(), comps.SyntheticProvider()], [subj], deadline_s=0.05)
+    assert [st["status"] for st in stats] == ["ok", "ok"]
+    assert raw[0][0]["address"] == "indexed"
+    assert comps.LocalCsvProvider.local
+
+def test_comps_in_pool_workers_after_parent_used_io_pool():
+    import time
+    from app.engines.Core import valuation
+
+    # the parent's I/O pool is started here; forked workers must not inherit a dead copy of it
+    assert comps.run({"address": "1 Test St, Sydney"})["status"] == "ok"
+    items = [{"mode": "equity", "address": f"{i} Test St, Sydney", "use_comps": True, "sales_revenue": 1_600_000,
+              "build_cost": 700_000, "use_cache": False, "detail": "standard"} for i in range(2)]
+    t = time.monotonic()
+    out = list(valuation.run_batch(items, max_workers=2))
+    assert time.monotonic() - t < 1.5
+    assert all(o["result"]["components"]["comps_value"] is not None for o in out)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+# app/engines/Core/test_executor.py
+from __future__ import annotations
+import asyncio, threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.engines import META, REGISTRY, executor, register
+from app.engines.Core import valuation
+
+CREDIT = {"mode": "credit", "address": "1 Example Rd, Sydney", "loan_amount": 800_000, "coupon_apr": 0.10,
+          "tenor_months": 24, "monte_carlo": {"seed": 5}, "use_cache": False}
+
+
+def test_run_engine_offloads_and_matches_direct_call():
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0)
+                ticks += 1
+
+        t = asyncio.ensure_future(ticker())
+        out = await executor.run_engine("valuation", CREDIT)
+        t.cancel()
+        return out, ticks
+
+    out, ticks = asyncio.run(main())
+    assert executor.lane_for("valuation") == "process"
+    assert out["core_valuation"] == valuation.run(CREDIT)["core_valuation"]
+    assert ticks > 0      # the loop kept running while the engine worked
+
+
+def test_saturated_lane_raises_busy_and_frees_slots(monkeypatch):
+    gate = threading.Event()
+    register("test_blocking", lambda p: (gate.wait(5), {"status": "ok"})[1])
+    lane = executor._Lane("thread", lambda n: ThreadPoolExecutor(max_workers=n), workers=1, queue=1)
+    monkeypatch.setitem(executor._lanes(), "thread", lane)
+
+    async def main():
+        first = asyncio.ensure_future(executor.run_engine("test_blocking", {}))
+        second = asyncio.ensure_future(executor.run_engine("test_blocking", {}))
+        await asyncio.sleep(0)
+        with pytest.raises(executor.EngineBusy):
+            await executor.run_engine("test_blocking", {})
+        gate.set()
+        return await asyncio.gather(first, second)
+
+    try:
+        assert asyncio.run(main()) == [{"status": "ok"}] * 2
+        lane._pool.shutdown(wait=True)
+        assert lane.info()["inflight"] == 0
+    finally:
+        gate.set()
+        lane.reset()
+        REGISTRY.pop("test_blocking", None)
+        META.pop("test_blocking", None)
+
+
+def test_recycle_replaces_process_lane_workers():
+    async def pid():
+        return await executor.run_engine("valuation", CREDIT)
+
+    asyncio.run(pid())
+    lane = executor._lanes()["process"]
+    before = lane._pool
+    assert executor.recycle("process") is True and lane._pool is None
+    asyncio.run(pid())
+    assert lane._pool is not None and lane._pool is not before
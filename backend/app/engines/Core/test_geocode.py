@@ -0,0 +1,56 @@
+# app/engines/Core/test_geocode.py
+from __future__ import annotations
+import os, subprocess, sys
+
+from app.engines import geocode
+
+
+def test_normalized_addresses_share_one_key_and_seed():
+    a = geocode.normalize_address("12 Test St., SYDNEY  New South Wales")
+    assert a == "12 test street, sydney nsw"
+    assert a == geocode.normalize_address("12 test street, Sydney NSW")
+    assert geocode.normalize_address("3 St Kilda Rd, St Kilda") == "3 st kilda road, st kilda"
+    assert geocode.address_seed("12 Test St, Sydney") == geocode.address_seed("12 TEST STREET, sydney")
+
+
+def test_seed_is_stable_across_processes():
+    code = "from app.engines import geocode; print(geocode.hash_lat_lon('1 Harbour St, Sydney'))"
+    outs = set()
+    for seed in ("1", "2"):
+        env = {**os.environ, "PYTHONHASHSEED": seed}
+        outs.add(subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout)
+    assert len(outs) == 1
+
+
+def test_store_persists_and_prewarm_is_bulk(tmp_path):
+    calls = []
+
+    def resolver(addr):
+        calls.append(addr)
+        return geocode.hash_lat_lon(addr)
+
+    path = str(tmp_path / "geocode.sqlite")
+    g = geocode.Geocoder(geocode.GeocodeStore(path), resolver=resolver)
+    info = g.prewarm(["1 A St, Sydney", "1 a street, sydney", "2 B Rd, Melbourne"])
+    assert info["unique"] == 2 and info["resolved"] == 2 and len(calls) == 2
+
+    fresh = geocode.Geocoder(geocode.GeocodeStore(path), resolver=resolver)   # e.g. another worker
+    assert fresh.lookup("2 B Road, Melbourne") == geocode.hash_lat_lon("2 B Rd, Melbourne")
+    assert len(calls) == 2
+
+
+def test_real_resolver_replaces_stored_stub_coordinates(tmp_path):
+    path = str(tmp_path / "geocode.sqlite")
+    stub = geocode.Geocoder(geocode.GeocodeStore(path))
+    assert stub.lookup("1 A St, Sydney") == geocode.hash_lat_lon("1 A St, Sydney")
+
+    real = geocode.Geocoder(geocode.GeocodeStore(path), resolver=lambda a: (-33.87, 151.21), source="api")
+    assert real.lookup("1 A St, Sydney") == (-33.87, 151.21)
+    again = geocode.Geocoder(geocode.GeocodeStore(path), resolver=lambda a: (0.0, 0.0), source="api")
+    assert again.lookup("1 a street, sydney") == (-33.87, 151.21)      # persisted, not re-resolved
+
+
+def test_cache_dir_is_absolute():
+    from app.core.config import Settings
+    assert os.path.isabs(Settings().RESULT_CACHE_DIR)
+    assert os.path.isabs(Settings(RESULT_CACHE_DIR="rel/cache").RESULT_CACHE_DIR)
@@ -0,0 +1,23 @@
+# app/engines/Core/test_irr.py
+from __future__ import annotations
+
+from app.engines.Core import irr
+
+
+def test_irr_matches_known_rates():
+    bullet = [-800_000, 80_000, 880_000]
+    assert abs(irr.irr(bullet) - 0.10) < 1e-10
+    assert abs(irr.npv(bullet, 0.10)) < 1e-6
+    assert irr.irr([100.0, 50.0]) is None  # no sign change → no IRR
+
+
+def test_irr_many_agrees_with_scalar_solver():
+    rows = [
+        [-1_000.0, 300.0, 400.0, 500.0],
+        [-50.0] + [5.0] * 23 + [60.0],
+        [10.0, 20.0],  # no root
+    ]
+    many = irr.irr_many(rows)
+    for row, r in zip(rows, many):
+        one = irr.irr(row)
+        assert (one is None and r is None) or abs(one - r) < 1e-9
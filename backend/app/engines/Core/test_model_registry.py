@@ -0,0 +1,104 @@
+# app/engines/Core/test_model_registry.py
+from __future__ import annotations
+import os, pickle
+
+from app.engines.model_registry import ModelRegistry
+from app.engines.Core import market_prediction
+
+
+class Const:
+    def __init__(self, v):
+        self.v = v
+
+    def predict(self, X):
+        return [self.v for _ in X]
+
+
+def _write(path, v):
+    with open(path, "wb") as f:
+        pickle.dump({"feats": ["bids_24h"], "m1": Const(v), "m2": Const(2 * v)}, f)
+
+
+def test_loads_once_and_hot_swaps_on_change(tmp_path):
+    path = str(tmp_path / "m.pkl")
+    _write(path, 0.01)
+    reg = ModelRegistry(check_interval_s=0.0)
+    reg.register("m", "v1", path)
+    a, _ = reg.get("m")
+    os.utime(path, ns=(1, 1))           # touched, same bytes → no reload
+    b, _ = reg.get("m")
+    assert a is b and reg.info()["models"]["m"]["versions"]["v1"]["loads"] == 1
+
+    _write(path, 0.02)
+    os.utime(path, ns=(2, 2))
+    assert reg.get("m")[0]["m1"].v == 0.02
+
+    with open(path, "wb") as f:          # a broken artifact never evicts a good one
+        f.write(b"not a pickle")
+    assert reg.get("m")[0]["m1"].v == 0.02
+    assert reg.info()["models"]["m"]["versions"]["v1"]["error"]
+
+
+def test_candidate_paths_switch_to_the_preferred_artifact_when_it_appears(tmp_path):
+    from app.engines import linear_model
+    native, legacy = str(tmp_path / "m.json"), str(tmp_path / "m.pkl")
+    _write(legacy, 0.01)
+    reg = ModelRegistry(check_interval_s=0.0)
+    reg.register("m", "v1", (native, legacy), loader=linear_model.load_artifact)
+    assert reg.get("m")[0]["m1"].v == 0.01
+
+    heads = {"feats": ["bids_24h"], "m1": linear_model.LinearHead([0.5]), "m2": linear_model.LinearHead([1.0])}
+    linear_model.export_linear(heads, native, version="v1")
+    model, _ = reg.get("m")
+    assert model["kind"] == "native_linear" and reg.versions("m") == {"v1": native}
+
+def test_market_prediction_serves_named_versions(tmp_path):
+    path = str(tmp_path / "v2.pkl")
+    _write(path, 0.05)
+    market_prediction.register_model_version("test_v2", path)
+    out = market_prediction.run({"model_version": "test_v2", "demand": {"bids_24h": 3}})
+    assert out["mode"] == "ml" and out["version"] == "test_v2"
+    assert out["forecast_1w"] == 0.05 and out["forecast_1m"] == 0.10
+
+
+class Linear:
+    def __init__(self, w):
+        self.w = w
+
+    def predict(self, X):
+        return [sum(a * b for a, b in zip(row, self.w)) for row in X]
+
+
+def test_batch_prediction_matches_single_rows(tmp_path):
+    path = str(tmp_path / "lin.pkl")
+    feats = ["bids_24h", "spread_bps", "external_index", "not_a_feature"]
+    with open(path, "wb") as f:
+        pickle.dump({"feats": feats, "m1": Linear([1e-3, -1e-4, 0.01, 5.0]), "m2": Linear([2e-3, 0, 0, 0])}, f)
+    market_prediction.register_model_version("test_lin", path)
+    items = [{"demand": {"bids_24h": i, "external_index": 1 + i / 10}, "liquidity": {"spread_bps": 50 + i}}
+             for i in range(5)] + [{}]
+    out = market_prediction.run_batch({"items": items, "model_version": "test_lin"})
+    assert out["mode"] == "ml" and out["count"] == 6
+    for i, p in enumerate(items):
+        one = market_prediction.run({**p, "model_version": "test_lin"})
+        assert abs(out["forecast_1w"][i] - one["forecast_1w"]) < 1e-12
+        assert abs(out["forecast_1m"][i] - one["forecast_1m"]) < 1e-12
+
+
+def test_native_linear_artifact_round_trips_without_pickle(tmp_path):
+    from app.engines import linear_model
+
+    bundle = {"feats": ["bids_24h", "spread_bps"],
+              "m1": linear_model.LinearHead([1e-3, -2e-4], 0.01),
+              "m2": linear_model.LinearHead([3e-3, 0.1 / 3], -0.02)}
+    path = linear_model.export_linear(bundle, str(tmp_path / "lin.json"), version="lin_v9")
+    loaded = linear_model.load_linear(path)
+    assert loaded["m2"].coef == bundle["m2"].coef and loaded["version"] == "lin_v9"
+
+    market_prediction.register_model_version("test_native", path)
+    params = {"demand": {"bids_24h": 7}, "liquidity": {"spread_bps": 90}, "model_version": "test_native"}
+    out = market_prediction.run(params)
+    assert out["mode"] == "ml" and out["drivers"]["model"] == "native_linear"
+    assert abs(out["forecast_1w"] - (7e-3 - 90 * 2e-4 + 0.01)) < 1e-15
+    batch = market_prediction.run_batch({"items": [params] * 3, "model_version": "test_native"})
+    assert batch["forecast_1m"] == [out["forecast_1m"]] * 3
@@ -0,0 +1,53 @@
+# app/engines/Core/test_montecarlo.py
+from __future__ import annotations
+
+from app.engines.Core import montecarlo as mc
+from app.engines.Core import valuation
+
+
+def test_seeded_bands_are_reproducible():
+    a = valuation.monte_carlo_equity(1_000_000, 12, 13, n=2000, seed=7)
+    b = valuation.monte_carlo_equity(1_000_000, 12, 13, n=2000, seed=7)
+    assert a == b
+    p10, p50, p90, diag = a
+    assert p10 < p50 < p90
+    assert diag["samples"] == 2000 and diag["kernel"] == mc.KERNEL
+
+
+def test_python_fallback_matches_vectorized_bands(monkeypatch):
+    fast = valuation.monte_carlo_credit(800_000, 0.10, 24, n=50_000, seed=1)
+    monkeypatch.setattr(mc, "np", None)
+    slow = valuation.monte_carlo_credit(800_000, 0.10, 24, n=50_000, seed=1)
+    for x, y in zip(fast[:3], slow[:3]):
+        assert abs(x - y) / y < 0.01
+
+
+def test_adaptive_stops_at_tolerance_and_reports_error():
+    *_, diag = valuation.monte_carlo_equity(1_000_000, 12, 13, seed=3, tol=0.01, chunk=256, max_n=20_000, antithetic=True)
+    assert diag["converged"] and diag["rel_err"] <= 0.01
+    assert diag["samples"] < 20_000 and diag["antithetic"] is True
+
+    *_, capped = valuation.monte_carlo_equity(1_000_000, 12, 13, seed=3, tol=1e-6, chunk=256, max_n=1024, qmc=True)
+    assert capped["samples"] == 1024 and not capped["converged"]
+    assert capped["sequence"] in ("sobol", "halton")
+
+
+def test_export_samples_streams_npy_chunks():
+    params = {"mode": "equity", "address": "123 Test St, Sydney", "sales_revenue": 1_600_000,
+              "build_cost": 700_000, "monte_carlo": {"seed": 5}}
+    columns, chunks = valuation.export_samples(params, n=2_500, chunk=1_000)
+    frames = mc.read_npy_chunks(b"".join(chunks))
+    assert [len(f["value"]) for f in frames] == [1_000, 1_000, 500]
+    assert tuple(frames[0]) == columns == valuation.SAMPLE_COLUMNS["equity"]
+    assert all(v >= 0 for f in frames for v in f["value"])
+
+
+def test_scenario_deltas_share_random_numbers():
+    params = {"mode": "equity", "address": "123 Test St, Sydney", "sales_revenue": 1_600_000,
+              "build_cost": 700_000, "monte_carlo": {"seed": 2}}
+    out = valuation.compare_scenarios(params, [{"name": "+25bps", "macro": {"discount_rate_delta_bps": 25}}], n=1_000)
+    delta = out["variants"][0]["delta"]
+    # a pure macro shift scales every draw by the same factor: the paired delta is exact
+    assert abs(delta["rel_mean"] + 0.0125) < 1e-12
+    assert delta["ci95"][0] <= delta["mean"] <= delta["ci95"][1]
+    assert delta["variance_ratio"] > 100
@@ -0,0 +1,94 @@
+# app/engines/Core/test_scenario.py
+from __future__ import annotations
+
+from app.engines.Core.app.engines.core import scenario
+
+MACROS = {"cash_rate_path_bps": [435, 410, 385], "wages_path_pct": [3.5, 3.0], "cpi_path_pct": [4.1, 2.9]}
+
+
+def test_vectorized_projection_matches_monthly_loop():
+    base = scenario.Person(150_000, 80_000, 0.2, 0.2, 6.0)
+    persons = [base, scenario.replace(base, savings_rate_pct=0.28), scenario.replace(base, income=90_000)]
+    macro_list = [MACROS, {**MACROS, "cash_rate_path_bps": [300]}, {}]
+    grid = scenario.affordability_grid(persons, macro_list, months=60)
+    for i, p in enumerate(persons):
+        for k, m in enumerate(macro_list):
+            ref = scenario._project_affordability(p, m, 60)
+            got = list(grid[i][k])
+            assert all(abs(a - b) <= 1e-9 * max(b, 1.0) for a, b in zip(got, ref))
+
+
+def test_run_variants_and_longer_horizon():
+    out = scenario.run({
+        "person": {"income": 150_000, "savings": 80_000, "savings_rate_pct": 0.2},
+        "macros": MACROS,
+        "scenarios": ["baseline", "windfall"],
+        "months": 120,
+        "variants": [{"name": "raise", "income_mult": 1.2}, {"name": "cuts", "macros": {"cash_rate_path_bps": [250]}}],
+    })
+    assert out["status"] == "ok" and out["series"]["months"] == 120
+    base = out["series"]["affordability_baseline"]
+    assert len(base) == 120
+    assert out["series"]["affordability_faster"] == base     # not requested → mirrors baseline
+    assert out["series"]["affordability_windfall"][0] > base[0]
+    raise_, cuts = out["variants"]
+    assert raise_["name"] == "raise" and raise_["affordability"][-1] > base[-1]
+    assert cuts["affordability"][0] > base[0]
+
+
+def test_safe_until_rate_table_matches_bisection():
+    incomes = [0, 60_000, 150_000, 150_000, 150_000, 150_000, 90_000]
+    dtis = [6.0, 0.0, 2.0, 4.5, 6.0, 9.0, 14.0]
+    fast = scenario.safe_until_rates(incomes, dtis)
+    assert fast == [scenario._safe_until_rate_bisect(i, d) for i, d in zip(incomes, dtis)]
+    assert fast[0] == fast[1] == 12.0 and fast[-1] == 0.0
+
+
+def test_unlock_months_uses_first_crossing_of_non_monotone_series():
+    rows = [[1, 5, 3, 7, 2], [0, 0, 0, 0, 0]]
+    got = [list(r) for r in scenario.unlock_months(rows, [4, 6, 8])]
+    assert got == [[1, 3, -1], [-1, -1, -1]]
+    assert scenario._unlock_years(rows, 4.0) == [scenario._unlock_year(rows[0], 4.0), None]
+
+
+def test_population_batch_resumes_after_crash(tmp_path):
+    import json
+    from app.engines.Core import scenario_batch
+
+    src = tmp_path / "persons.jsonl"
+    with open(src, "w") as f:
+        for i in range(23):
+            f.write(json.dumps({"person_id": f"p{i}", "income": 60_000 + 10_000 * i, "savings": 5_000 * i,
+                                "savings_rate_pct": 0.15, "target_price": 700_000}) + "\n")
+        f.write('{"person_id": "bad", "income": "n/a"}\n')
+
+    whole = scenario_batch.run_job(str(src), str(tmp_path / "a"), chunk=5, max_workers=1, macros=MACROS)
+    assert whole["rows_done"] == 24 and whole["chunks_done"] == 5
+
+    crashed = scenario_batch._run_job(str(src), str(tmp_path / "b"), chunk=5, max_workers=1, macros=MACROS,
+                                      target_price=None, months=36, start_year=2025, restart=False,
+                                      on_progress=None, stop_after=2)
+    assert crashed["chunks_done"] == 2
+    resumed = scenario_batch.run_job(str(src), str(tmp_path / "b"), chunk=5, max_workers=1, macros=MACROS)
+    assert resumed["resumed_from_chunk"] == 2 and resumed["rows_this_run"] == 14
+
+    a, b = scenario_batch.read_results(str(tmp_path / "a")), scenario_batch.read_results(str(tmp_path / "b"))
+    assert a["person_id"] == b["person_id"] and a["person_id"][-1] == "bad"
+    for c in scenario_batch.COLUMNS:
+        assert list(a[c]) == list(b[c])
+    assert a["ok"][-1] == 0 and a["ok"][0] == 1
+
+    single = scenario.run({"person": {"income": 60_000 + 10_000 * 20, "savings": 100_000, "savings_rate_pct": 0.15},
+                           "macros": MACROS})
+    assert a["safe_until_rate"][20] == single["series"]["safe_until_rate"]
+    assert scenario_batch.GAUGES[a["gauge"][20]] == single["stress_gauge"]
+
+
+def test_targets_use_their_own_anchor_price():
+    out = scenario.run({"person": {"income": 180_000, "savings": 150_000, "savings_rate_pct": 0.2},
+                        "targets": [{"suburb": "Parramatta"}, {"suburb": "Bondi"}], "months": 120})
+    base = out["series"]["affordability_baseline"]
+    assert [t["suburb"] for t in out["targets"]] == ["Parramatta", "Bondi"]
+    assert out["targets"][0]["current_median"] != out["targets"][1]["current_median"]
+    for t in out["targets"]:
+        assert t["unlock_year"] == scenario._unlock_year(base, t["current_median"])
@@ -85,6 +85,104 @@ def test_market_prediction_if_present():
     assert out.get("status") == "ok", pretty(out)
 
 
+def test_valuation_batch_tags_index_and_errors():
+    items = [
+        {"mode": "credit", "address": "1 Example Rd, Sydney", "loan_amount": 800_000, "coupon_apr": 0.10, "tenor_months": 24},
+        {"mode": "equity"},  # missing address → validation error
+        {"mode": "equity", "address": "123 Test St, Sydney", "sales_revenue": 1_600_000, "build_cost": 700_000},
+    ]
+    out = list(valuation.run_batch(items, ordered=True, max_workers=2))
+    assert [o["index"] for o in out] == [0, 1, 2], pretty(out)
+    assert out[0]["status"] == "done" and out[2]["status"] == "done", pretty(out)
+    assert out[1]["status"] == "error" and out[1]["errors"], pretty(out)
+
+
+
+def test_fan_out_shares_one_pool_and_keeps_order():
+    from app.engines import workers
+    items = [(i, -i) for i in range(40)]
+    out = list(workers.fan_out(abs, items, ordered=True, max_workers=2))
+    assert [(i, r) for i, r, _e in out] == [(i, i) for i in range(40)]
+    pool = workers.process_pool()
+    assert pool._max_workers == workers.available_cpus()
+    unordered = list(workers.fan_out(abs, items, ordered=False, max_workers=10_000))
+    assert sorted(r for _i, r, _e in unordered) == list(range(40))
+    assert workers.process_pool() is pool       # never replaced under its users
+
+
+def test_fan_out_recovers_from_a_dead_worker(monkeypatch):
+    import os
+    from concurrent.futures.process import BrokenProcessPool
+    from app.engines import workers
+    monkeypatch.setattr(workers, "available_cpus", lambda: 2)   # use the pool even on a 1-core box
+    workers.shutdown()
+    try:
+        crashed = list(workers.fan_out(os._exit, [(0, 1), (1, 1)], max_workers=2))
+        assert all(isinstance(e, BrokenProcessPool) for _i, _r, e in crashed)
+        out = list(workers.fan_out(abs, [(i, -i) for i in range(6)], max_workers=2))
+        assert [(i, r, e) for i, r, e in out] == [(i, i, None) for i in range(6)]
+    finally:
+        workers.shutdown()
+
+def test_dcf_grid_matches_scalar_dcf():
+    from app.engines.Core import dcf_grid
+    base = {"land_cost": 50_000, "build_cost": 700_000, "soft_costs": 150_000, "sales_revenue": 1_600_000, "timeline_months": 24}
+    axes = {"build_cost": [600_000, 900_000], "presale_pct": [0.0, 0.5], "discount_rate": [0.10, 0.15]}
+    out = dcf_grid.run({"base": base, "axes": axes})
+    assert out["status"] == "ok" and out["cells"] == 8 and out["shape"] == [1, 2, 1, 2, 2], pretty(out)
+    # last cell: build 900k, presale 50%, 15% discount rate
+    ref = valuation.compute_equity_cashflows_and_irr(50_000, 900_000, 150_000, 1_600_000, None, 0.15, 24, 0.5)
+    assert abs(out["metrics"]["npv"][-1] - ref["npv"]) < 1e-6
+    assert abs(out["metrics"]["irr_annual"][-1] - ref["irr_annual"]) < 1e-9
+
+
+
+def test_dcf_grid_rejects_bad_axis_values():
+    from app.engines.Core import dcf_grid
+    base = {"land_cost": 50_000, "build_cost": 700_000, "sales_revenue": 1_600_000}
+    for axes in ({"build_cost": ["lots"]}, {"land_cost": [{"x": 1}]}, {"discount_rate": [float("nan")]},
+                 {"discount_rate": [-1.5]}, ["build_cost"]):
+        out = dcf_grid.run({"base": base, "axes": axes})
+        assert out["status"] == "error" and out["error"], pretty(out)
+    assert dcf_grid.run({"base": base, "max_cells": "many"})["status"] == "error"
+
+def test_valuation_detail_levels_skip_heavy_sections():
+    params = {"mode": "equity", "address": "123 Test St, Sydney", "use_comps": True,
+              "sales_revenue": 1_600_000, "build_cost": 700_000, "use_cache": False}
+    full = unwrap(valuation.run(params))
+    std = unwrap(valuation.run({**params, "detail": "standard"}))
+    summ = unwrap(valuation.run({**params, "detail": "summary"}))
+    assert "inputs" in full and "comps_used" in full["components"], pretty(full)
+    assert "inputs" not in std and "comps_count" in std["components"], pretty(std)
+    assert "cashflows_monthly" not in std["expected_returns"]["equity_dcf"], pretty(std)
+    assert set(summ) == {"status", "mode", "core_valuation", "nav", "token_pricing", "risk_meta", "investor_summary"}, pretty(summ)
+    assert "prediction_overlay" not in summ["token_pricing"], pretty(summ)
+    only = unwrap(valuation.run({**params, "fields": ["nav"]}))
+    assert set(only) == {"status", "mode", "nav"}, pretty(only)
+
+
+def test_engine_manifest_matches_registrations_and_imports_lazily():
+    import subprocess, sys
+    from app import engines
+    from app.engines.manifest import ENGINES
+
+    engines.discover_engines()
+    assert set(engines.META) == set(ENGINES), sorted(set(engines.META) ^ set(ENGINES))
+    for key, (module, name, description) in ENGINES.items():
+        assert engines.REGISTRY[key].__module__ == module, key
+        assert engines.META[key] == {"name": name, "description": description}, key
+
+    probe = (
+        "import sys, app.engines as e; "
+        "before = {m for m in sys.modules if m.startswith('app.engines.')}; "
+        "assert 'audit' in e.REGISTRY and len(e.list_engines()) == len(e.MANIFEST); "
+        "e.REGISTRY['audit']({}); "
+        "print(sorted(before), e.REGISTRY.loaded())"
+    )
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "['app.engines.manifest'] ['audit']", out
+
+
 if __name__ == "__main__":
     # Simple runner without pytest
     try:
@@ -0,0 +1,54 @@
+# app/engines/Core/test_token_mark.py
+from __future__ import annotations
+
+from app.engines.Core import token_mark, valuation
+
+BASE = {
+    "mode": "equity",
+    "address": "1 Test St, Sydney",
+    "bedrooms": 3,
+    "living_area_sqft": 1500,
+    "land_cost": 50_000,
+    "build_cost": 700_000,
+    "soft_costs": 150_000,
+    "sales_revenue": 1_600_000,
+    "debt_outstanding": 200_000,
+    "liquidity": {"spread_bps": 80},
+    "monte_carlo": {"seed": 7},
+    "use_cache": False,
+}
+SIGNALS = {
+    "demand": {"bids_24h": 40, "watchlist_count": 100},
+    "liquidity": {"spread_bps": 80},
+    "macro": {"discount_rate_delta_bps": 150},
+}
+
+
+def test_mark_matches_full_valuation_and_skips_unchanged():
+    book = token_mark.MarkBook()
+    full = valuation._run_unwrapped({**BASE, **SIGNALS})["token_pricing"]
+
+    first = book.mark_many([{"project_id": "p1", "params": BASE, **SIGNALS}])
+    assert first["stats"]["rebased"] == 1
+    mark = first["marks"][0]
+    assert abs(mark["market_price_per_token"] - full["market_price_per_token"]) < 1e-9
+    assert abs(mark["nav_per_token"] - full["nav_per_token"]) < 1e-9
+
+    # same signals, no params → cached mark; new signals → re-marked without a rebase
+    again = book.mark_many([{"project_id": "p1", **SIGNALS}])
+    assert again["stats"]["unchanged"] == 1 and again["marks"][0]["changed"] is False
+    moved = book.mark_many([{"project_id": "p1", "demand": {"bids_24h": 90}}])
+    assert moved["stats"]["rebased"] == 0
+    assert moved["marks"][0]["market_price_per_token"] > mark["market_price_per_token"]
+
+    missing = book.mark_many([{"project_id": "nope"}])
+    assert missing["marks"][0]["status"] == "error"
+
+
+def test_mark_without_liquidity_uses_the_base_liquidity():
+    book = token_mark.MarkBook()
+    deep = {**BASE, "liquidity": {"spread_bps": 20, "depth_units": 80_000, "turnover_24h_pct": 4.0}}
+    demand = {"demand": {"bids_24h": 40, "watchlist_count": 100}}
+    full = valuation._run_unwrapped({**deep, **demand})["token_pricing"]
+    mark = book.mark_many([{"project_id": "p1", "params": deep, **demand}])["marks"][0]
+    assert abs(mark["market_price_per_token"] - full["market_price_per_token"]) < 1e-9
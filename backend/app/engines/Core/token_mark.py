@@ -0,0 +1,208 @@
+# app/engines/Core/token_mark.py
+from __future__ import annotations
+import threading, time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from pydantic import BaseModel, ValidationError
+
+from app.engines import register
+from app.engines.Core import valuation as _val
+from app.engines.Core.valuation import Liquidity, MacroOverlay, MarketDemand
+
+# Hourly token marks without re-running valuation.
+# valuation._tokenize_from_value hints at
+#   final = base_price * (1 + demand_k) * (1 - macro_penalty_k)
+# Each project's base value comes from one valuation run with the macro and demand
+# overlays stripped and is cached here. A mark then re-applies only the cheap overlays
+# to it — apply_macro_delta (linear in value), NAV per token, _compute_demand_index and
+# _price_from_nav — so it matches valuation.run's token_pricing for the same signals.
+# Liquidity feeds the demand index on every mark (a mark without it uses the liquidity
+# the base was valued with); its effect on the Monte Carlo band (liquidity_premium)
+# stays as at the last rebase.
+
+_ALPHA = 0.6   # demand elasticity, as in valuation._run
+
+class MarkItem(BaseModel):
+    project_id: str
+    params: Optional[Dict[str, Any]] = None      # ValuationParams dict; (re)bases when new or changed
+    demand: Optional[MarketDemand] = None
+    liquidity: Optional[Liquidity] = None
+    macro: Optional[MacroOverlay] = None
+
+class _Base:
+    __slots__ = ("mode", "value", "debt", "tokens_out", "liquidity", "key", "built_at")
+
+    def __init__(self, mode: str, value: float, debt: float, tokens_out: int,
+                 liquidity: Optional[Liquidity], key: str):
+        self.mode, self.value, self.debt, self.tokens_out, self.key = mode, value, debt, tokens_out, key
+        self.liquidity = liquidity
+        self.built_at = time.time()
+
+def _base_params(params: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """Overlay-free valuation request for a project and its content key."""
+    raw = {**params, "macro": None, "demand": None, "detail": "summary", "fields": None}
+    return raw, _val.cache_key(_val.ValuationParams(**raw))
+
+class MarkBook:
+    """Per-process cache of project base values plus the last mark per project."""
+
+    def __init__(self):
+        self._bases: Dict[str, _Base] = {}
+        self._last: Dict[str, Tuple[Tuple[Any, Any, Any], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    # ---- bases ----
+    def set_base(self, project_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self.rebase_many([(project_id, params)])[project_id]
+
+    def rebase_many(self, items: Sequence[Tuple[str, Dict[str, Any]]], *,
+                    max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Value each project once (overlays stripped) over the valuation batch pool and cache it.
+        Returns {project_id: {"status": "ok"} | {"status": "error", "errors": [...]}}.
+        """
+        out: Dict[str, Dict[str, Any]] = {}
+        todo: List[Tuple[str, Dict[str, Any], str]] = []
+        for pid, params in items:
+            try:
+                raw, key = _base_params(params or {})
+            except ValidationError as ve:
+                out[pid] = {"status": "error", "errors": ve.errors(include_url=False, include_context=False)}
+                continue
+            todo.append((pid, raw, key))
+        results = _val.run_batch([raw for _pid, raw, _key in todo], max_workers=max_workers)
+        for item in results:
+            pid, raw, key = todo[item["index"]]
+            res = item.get("result") or {}
+            band = res.get("core_valuation") if isinstance(res, dict) else None
+            if item["status"] == "error" or not band:
+                out[pid] = {"status": "error", "errors": item.get("errors") or [{"msg": "valuation returned no band"}]}
+                continue
+            p = _val.ValuationParams(**raw)
+            base = _Base(
+                mode=p.mode.lower(),
+                value=float(band["base"]),
+                debt=float(p.debt_outstanding or 0.0) if p.mode.lower() != "credit" else 0.0,
+                tokens_out=max(int(p.tokens_outstanding or 1_000_000), 1),
+                liquidity=p.liquidity,
+                key=key,
+            )
+            with self._lock:
+                self._bases[pid] = base
+                self._last.pop(pid, None)
+            out[pid] = {"status": "ok"}
+        return out
+
+    def drop(self, project_id: str) -> None:
+        with self._lock:
+            self._bases.pop(project_id, None)
+            self._last.pop(project_id, None)
+
+    # ---- marks ----
+    def _mark(self, pid: str, base: _Base, item: MarkItem) -> Dict[str, Any]:
+        value = _val.apply_macro_delta(base.value, item.macro)
+        if base.mode == "credit":
+            nav_per_token = value / base.tokens_out
+        else:
+            nav_per_token = _val.build_token_nav(value, base.debt, base.tokens_out)["nav_per_token"]
+        d_idx = _val._compute_demand_index(item.demand, item.liquidity or base.liquidity)
+        return {
+            "project_id": pid,
+            "status": "ok",
+            "nav_per_token": nav_per_token,
+            "market_price_per_token": _val._price_from_nav(nav_per_token, d_idx, alpha=_ALPHA),
+            "demand_index": d_idx,
+            "demand_k": _ALPHA * (d_idx - 1.0),
+            "macro_penalty_k": (1.0 - value / base.value) if base.value else 0.0,
+            "base_value": base.value,
+            "base_at": base.built_at,
+        }
+
+    def mark_many(self, items: Sequence[Dict[str, Any]], *, max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Mark a list of {"project_id", "params"?, "demand"?, "liquidity"?, "macro"?}.
+        Projects with new/changed params are (re)valued first, in one batch; projects whose
+        signals are unchanged since the last mark return the previous mark.
+        """
+        t0 = time.perf_counter()
+        marks: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        parsed: Dict[int, MarkItem] = {}
+        rebase: Dict[str, Dict[str, Any]] = {}
+        unchanged = 0
+        for i, raw in enumerate(items):
+            pid = str((raw or {}).get("project_id", ""))
+            sig = ((raw or {}).get("demand"), (raw or {}).get("liquidity"), (raw or {}).get("macro"))
+            last = self._last.get(pid)
+            if last is not None and last[0] == sig and not (raw or {}).get("params"):
+                marks[i] = {**last[1], "changed": False}
+                unchanged += 1
+                continue
+            try:
+                item = MarkItem(**(raw or {}))
+            except ValidationError as ve:
+                marks[i] = {"project_id": pid, "status": "error", "errors": ve.errors(include_url=False, include_context=False)}
+                continue
+            parsed[i] = item
+            if item.params is not None:
+                base = self._bases.get(item.project_id)
+                try:
+                    key = _base_params(item.params)[1]
+                except ValidationError as ve:
+                    marks[i] = {"project_id": pid, "status": "error", "errors": ve.errors(include_url=False, include_context=False)}
+                    del parsed[i]
+                    continue
+                if base is None or base.key != key:
+                    rebase[item.project_id] = item.params
+
+        rebased = self.rebase_many(list(rebase.items()), max_workers=max_workers) if rebase else {}
+
+        for i, item in parsed.items():
+            pid = item.project_id
+            if rebased.get(pid, {}).get("status") == "error":
+                marks[i] = {"project_id": pid, **rebased[pid]}
+                continue
+            base = self._bases.get(pid)
+            if base is None:
+                marks[i] = {"project_id": pid, "status": "error", "errors": [{"msg": "no base value cached; pass params"}]}
+                continue
+            mark = self._mark(pid, base, item)
+            raw = items[i]
+            with self._lock:
+                self._last[pid] = ((raw.get("demand"), raw.get("liquidity"), raw.get("macro")), mark)
+            marks[i] = {**mark, "changed": True}
+
+        errors = sum(1 for m in marks if m and m["status"] == "error")
+        return {
+            "status": "ok",
+            "marks": marks,
+            "stats": {
+                "requested": len(items),
+                "marked": len(items) - errors,
+                "unchanged": unchanged,
+                "rebased": sum(1 for r in rebased.values() if r["status"] == "ok"),
+                "errors": errors,
+                "ms": (time.perf_counter() - t0) * 1000.0,
+            },
+        }
+
+    def info(self) -> Dict[str, Any]:
+        return {"bases": len(self._bases), "marked": len(self._last)}
+
+# process-wide book; the scheduled job calls token_mark with the latest signals each hour
+book = MarkBook()
+
+def run(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    params: {"marks": [{"project_id", "params"?, "demand"?, "liquidity"?, "macro"?}, ...],
+             "max_workers"?: int}
+    """
+    items = (params or {}).get("marks")
+    if not isinstance(items, list):
+        return {"status": "error", "errors": [{"msg": "marks must be a list"}]}
+    return book.mark_many(items, max_workers=(params or {}).get("max_workers"))
+
+register(
+    key="token_mark",
+    fn=run,
+    name="Token Mark",
+    description="Incremental token repricing: cached base NAV per project with demand/macro overlays re-applied per mark.",
+)
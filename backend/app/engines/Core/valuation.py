@@ -1,10 +1,18 @@
 # app/engines/core/valuation.py
 from __future__ import annotations
 import math, random, statistics
-from typing import Any, Dict, Optional, Sequence, Tuple
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from pydantic import BaseModel, Field, ValidationError
 
 from app.engines import register, REGISTRY
+from app.engines import cache as _cache
+from app.engines.Core import irr as _irr
+from app.engines.Core import montecarlo as _mc
+from app.engines.Core import quantiles as _q
+
+# Bump when valuation math changes so cached results from older code are never served
+ENGINE_VERSION = "valuation-2"
 
 # -------------------------- Pydantic Schemas --------------------------
 
@@ -48,6 +56,27 @@ class Covenants(BaseModel):
 
 
 
+class MonteCarloOptions(BaseModel):
+    n: Optional[int] = Field(3000, ge=1, description="Fixed sample count (ignored when tol is set)")
+    tol: Optional[float] = Field(None, gt=0.0, description="Relative std. error target on p10/p50/p90; enables adaptive sampling")
+    max_n: Optional[int] = Field(20000, ge=1, description="Sample cap for adaptive mode")
+    chunk: Optional[int] = Field(512, ge=16, description="Samples per adaptive step")
+    antithetic: Optional[bool] = False
+    qmc: Optional[bool] = Field(False, description="Quasi-random (Sobol/Halton) draws instead of pseudo-random")
+    seed: Optional[int] = Field(None, description="Fix the RNG seed for reproducible (and cache-stable) bands")
+
+def _mc_kwargs(mc: MonteCarloOptions | None) -> Dict[str, Any]:
+    mc = mc or MonteCarloOptions()
+    return {
+        "n": int(mc.n or 3000),
+        "tol": mc.tol,
+        "max_n": int(mc.max_n or 20000),
+        "chunk": int(mc.chunk or 512),
+        "antithetic": bool(mc.antithetic),
+        "qmc": bool(mc.qmc),
+        "seed": mc.seed,
+    }
+
 class MarketDemand(BaseModel):
     # Simple signals — you can feed these from your marketplace later
     watchlist_count: Optional[int] = 0
@@ -152,30 +181,57 @@ class ValuationParams(BaseModel):
     # demand signals for token pricing
     demand: Optional[MarketDemand] = None
 
+    # Monte Carlo sampling controls (fixed n by default; adaptive when tol is set)
+    monte_carlo: Optional[MonteCarloOptions] = None
+
+    # serve identical requests from the result cache (keyed on these params + ENGINE_VERSION);
+    # applies only to seeded runs — an unseeded band is a fresh Monte Carlo draw each time
+    use_cache: Optional[bool] = True
+
+    # response shape: summary (band/NAV/pricing only) | standard (no heavy lists) | full (everything)
+    detail: Optional[str] = Field("full", pattern="^(summary|standard|full)$")
+    fields: Optional[List[str]] = Field(None, description="Top-level result sections to build; overrides detail's section set")
+
     tokens_outstanding: Optional[int] = 1_000_000
 # -------------------------- Utilities --------------------------
 
+_SUMMARY_SECTIONS = frozenset({"core_valuation", "nav", "token_pricing", "risk_meta", "investor_summary"})
+
+class _View:
+    """
+    Which parts of the result to build for a request. Heavy parts (params echo, comps list,
+    monthly cashflows, prediction call) are skipped up front rather than trimmed afterwards.
+    """
+    def __init__(self, detail: Optional[str], fields: Optional[List[str]]):
+        self.detail = detail or "full"
+        self.fields = set(fields) if fields else None
+
+    @property
+    def full(self) -> bool:
+        return self.detail == "full"
+
+    def wants(self, section: str) -> bool:
+        if section in ("status", "mode"):
+            return True
+        if self.fields is not None:
+            return section in self.fields
+        if self.detail == "summary":
+            return section in _SUMMARY_SECTIONS
+        if self.detail == "standard":
+            return section != "inputs"
+        return True
+
+    def project(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        if self.full and self.fields is None:
+            return result
+        return {k: v for k, v in result.items() if self.wants(k)}
+
 def _dump_model(m: BaseModel | None) -> Dict[str, Any] | None:
     if m is None: return None
     return m.model_dump() if hasattr(m, "model_dump") else m.dict()
 
 def _percentiles(data: Sequence[float], qs: Sequence[float]) -> list[float]:
-    if not data:
-        return [math.nan for _ in qs]
-    xs = sorted(data)
-    n = len(xs)
-    out = []
-    for q in qs:
-        if q <= 0: out.append(xs[0]); continue
-        if q >= 1: out.append(xs[-1]); continue
-        i = q * (n - 1)
-        lo, hi = math.floor(i), math.ceil(i)
-        if lo == hi:
-            out.append(xs[lo])
-        else:
-            w = i - lo
-            out.append(xs[lo]*(1-w) + xs[hi]*w)
-    return out
+    return _q.exact(data, qs)
 
 def _lognormal_mult(mu_pct: float = 0.0, sigma_pct: float = 0.10) -> float:
     mu = math.log(1 + mu_pct)
@@ -187,6 +243,21 @@ def _lognormal_mult(mu_pct: float = 0.0, sigma_pct: float = 0.10) -> float:
 
 # -------------------------- Equity DCF (cashflows, IRR/NPV) --------------------------
 
+@lru_cache(maxsize=128)
+def spend_curve_weights(T: int, spend_curve: str = "s-curve") -> Tuple[float, ...]:
+    """Normalized monthly build/soft spend weights over T months (cached per (T, curve))."""
+    if spend_curve == "linear":
+        w = [1.0] * T
+    elif spend_curve == "front":
+        w = [max(1, int(T - i)) for i in range(T)]
+    elif spend_curve == "back":
+        w = [max(1, int(i + 1)) for i in range(T)]
+    else:  # s-curve
+        # normalized logistic-ish curve
+        w = [1/(1+math.exp(-12*((i+0.5)/T-0.5))) for i in range(T)]
+    wsum = sum(w)
+    return tuple(x/wsum for x in w)
+
 def compute_equity_cashflows_and_irr(
     land_cost: float | None,
     build_cost: float | None,
@@ -216,18 +287,7 @@ def compute_equity_cashflows_and_irr(
     R = float(sales_revenue or 0.0)
 
     # Spend curve weights over T months
-    import math as _m
-    if spend_curve == "linear":
-        w = [_ for _ in [1]*T]
-    elif spend_curve == "front":
-        w = [max(1, int(T - i)) for i in range(T)]
-    elif spend_curve == "back":
-        w = [max(1, int(i + 1)) for i in range(T)]
-    else:  # s-curve
-        # normalized logistic-ish curve
-        w = [1/(1+_m.exp(-12*((i+0.5)/T-0.5))) for i in range(T)]
-    wsum = sum(w)
-    w = [x/wsum for x in w]
+    w = spend_curve_weights(T, spend_curve)
 
     monthly_build = [B * wi for wi in w]
     monthly_soft  = [S * wi for wi in w]
@@ -250,29 +310,12 @@ def compute_equity_cashflows_and_irr(
         )
     cfs_m.append(settlement)  # month T+1: settlement inflow
 
-    # IRR (monthly) via bisection, then annualize
-    def _npv(rate_m: float) -> float:
-        return sum(cf / ((1 + rate_m) ** t) for t, cf in enumerate(cfs_m))
-    lo, hi = -0.95, 2.0
-    f_lo, f_hi = _npv(lo), _npv(hi)
-    irr_m = None
-    if f_lo * f_hi <= 0:
-        for _ in range(100):
-            mid = 0.5*(lo+hi)
-            f_mid = _npv(mid)
-            if abs(f_mid) < 1e-10:
-                irr_m = mid
-                break
-            if f_lo * f_mid < 0:
-                hi, f_hi = mid, f_mid
-            else:
-                lo, f_lo = mid, f_mid
-        if irr_m is None:
-            irr_m = 0.5*(lo+hi)
+    # IRR (monthly) via safeguarded Newton, then annualize
+    irr_m = _irr.irr(cfs_m, lo=-0.95, hi=2.0)
     irr_a = (1 + (irr_m or 0.0))**12 - 1
 
     # NPV at equity discount rate
-    npv = sum(cf / ((1 + r_m) ** t) for t, cf in enumerate(cfs_m))
+    npv = _irr.npv(cfs_m, r_m)
 
     invested = -sum(min(0.0, cf) for cf in cfs_m)
     returned = sum(max(0.0, cf) for cf in cfs_m)
@@ -484,23 +527,8 @@ def _annual_debt_service(loan: float, apr: float, tenor_m: int, schedule: str) -
     return float(loan * apr)
 
 def _irr_bisection(cfs: Sequence[float], lo: float = -0.95, hi: float = 1.0, iters: int = 80) -> Optional[float]:
-    def npv(rate: float) -> float:
-        return sum(cf / ((1 + rate) ** t) for t, cf in enumerate(cfs))
-    try:
-        f_lo, f_hi = npv(lo), npv(hi)
-        if f_lo * f_hi > 0:
-            return None
-        for _ in range(iters):
-            mid = 0.5 * (lo + hi)
-            f_mid = npv(mid)
-            if abs(f_mid) < 1e-10: return mid
-            if f_lo * f_mid < 0:
-                hi, f_hi = mid, f_mid
-            else:
-                lo, f_lo = mid, f_mid
-        return 0.5 * (lo + hi)
-    except Exception:
-        return None
+    # Kept for callers of the old name; now the shared safeguarded-Newton solver.
+    return _irr.irr(cfs, lo=lo, hi=hi, maxiter=iters)
 
 def compute_credit_cashflows_and_irr(loan: float, apr: float, tenor_m: int, schedule: str) -> Dict[str, float]:
     tenor_y = tenor_m / 12.0
@@ -521,7 +549,7 @@ def compute_credit_cashflows_and_irr(loan: float, apr: float, tenor_m: int, sche
     irr = _irr_bisection(cfs)
     # NPV at discount_rate_credit ~ apr as placeholder
     disc = apr if apr and apr > 0 else 0.10
-    npv = sum(cf / ((1 + disc) ** t) for t, cf in enumerate(cfs))
+    npv = _irr.npv(cfs, disc)
     return {"irr": irr, "npv": npv, "apy": apr}
 
 def credit_metrics(collateral_value: Optional[float], loan: float, apr: float, tenor_m: int, schedule: str, noi_annual: Optional[float], build: Optional[float], soft: Optional[float]) -> dict:
@@ -550,6 +578,36 @@ def covenant_eval(metrics: dict, covenants: Optional[Covenants]) -> dict:
 
 # -------------------------- Monte Carlo --------------------------
 
+# Fixed-n runs above this many draws are summarized by a KLL sketch instead of held in memory
+_SKETCH_ABOVE = 1_000_000
+_SKETCH_CHUNK = 262_144
+
+def _mc_band(draw, sampler: _mc.Sampler, *, n: int, tol: Optional[float], chunk: int, max_n: int) -> Tuple[float, float, float, dict]:
+    """Fixed-n draw, or chunked draws until the p10/p50/p90 std. errors are within `tol` (relative)."""
+    qs = [0.10, 0.50, 0.90]
+    if tol:
+        _samples, est, diag = _mc.run_adaptive(draw, qs=qs, tol=tol, chunk=chunk, max_n=max_n)
+    elif n > _SKETCH_ABOVE:
+        # very large fixed-n runs: stream chunks through a mergeable sketch, bounded memory
+        sketch = _q.KLLSketch(k=2048, seed=0)
+        left = n
+        while left > 0:
+            k = min(_SKETCH_CHUNK, left)
+            sketch.update_many(draw(k))
+            left -= k
+        est = sketch.quantiles(qs)
+        diag = {"samples": n, "quantile_method": "kll", "rank_error": sketch.rank_error()}
+    else:
+        samples = draw(n)
+        est, ses = _mc.percentiles_with_error(samples, qs)
+        diag = {
+            "samples": len(samples),
+            "rel_err": max(se / max(abs(e), 1e-12) for e, se in zip(est, ses)),
+            "std_err": {"p10": ses[0], "p50": ses[1], "p90": ses[2]},
+        }
+    diag.update({"kernel": _mc.KERNEL, "sequence": sampler.sequence, "antithetic": sampler.antithetic})
+    return (est[0], est[1], est[2], diag)
+
 def monte_carlo_equity(base_value: float,
                        planned_months: float,
                        expected_months: float,
@@ -558,23 +616,34 @@ def monte_carlo_equity(base_value: float,
                        cost_vol: float = 0.06,
                        delay_sd_months: float = 1.0,
                        liq_premium: float = 0.0,
-                       n: int = 3000) -> Tuple[float, float, float, dict]:
+                       n: int = 3000,
+                       seed: Optional[int] = None,
+                       tol: Optional[float] = None,
+                       max_n: int = 20000,
+                       chunk: int = 512,
+                       antithetic: bool = False,
+                       qmc: bool = False) -> Tuple[float, float, float, dict]:
     if base_value <= 0 or n <= 0:
         return (base_value, base_value, base_value, {"samples": 0})
     baseline_delay = max(0.0, (expected_months or planned_months) - (planned_months or 0.0))
-    monthly_carry = finance_apr / 12.0
-    samples = []
-    for _ in range(n):
-        sales_mult = _lognormal_mult(0.0, sales_vol)
-        cost_mult  = _lognormal_mult(0.0, cost_vol)
-        delay_noise = max(0.0, random.gauss(baseline_delay, delay_sd_months))
-        delay_penalty = monthly_carry * delay_noise
-        v = base_value * sales_mult / cost_mult
-        v = v * (1 - delay_penalty)
-        v = v * (1 + liq_premium)
-        samples.append(max(0.0, v))
-    p10, p50, p90 = _percentiles(samples, [0.10, 0.50, 0.90])
-    return (p10, p50, p90, {"samples": len(samples), "baseline_delay_m": baseline_delay})
+    sampler = _mc.Sampler(seed, antithetic=antithetic, qmc=qmc)
+
+    def draw(k: int):
+        z, _ = sampler.draw(k, 3)
+        return _mc.equity_samples(
+            base_value,
+            baseline_delay=baseline_delay,
+            monthly_carry=finance_apr / 12.0,
+            sales_vol=sales_vol,
+            cost_vol=cost_vol,
+            delay_sd_months=delay_sd_months,
+            liq_premium=liq_premium,
+            z=z,
+        )
+
+    p10, p50, p90, diag = _mc_band(draw, sampler, n=n, tol=tol, chunk=chunk, max_n=max_n)
+    diag["baseline_delay_m"] = baseline_delay
+    return (p10, p50, p90, diag)
 
 def monte_carlo_credit(par_value: float,
                        coupon_apr: float,
@@ -582,23 +651,260 @@ def monte_carlo_credit(par_value: float,
                        pd_annual: float = 0.02,
                        lgd: float = 0.35,
                        rate_spread_vol_bps: float = 50.0,
-                       n: int = 3000) -> Tuple[float, float, float, dict]:
+                       n: int = 3000,
+                       seed: Optional[int] = None,
+                       tol: Optional[float] = None,
+                       max_n: int = 20000,
+                       chunk: int = 512,
+                       antithetic: bool = False,
+                       qmc: bool = False) -> Tuple[float, float, float, dict]:
     if par_value <= 0 or tenor_months <= 0 or n <= 0:
         return (par_value, par_value, par_value, {"samples": 0})
     horizon_years = tenor_months / 12.0
     pd_path = 1 - (1 - pd_annual) ** horizon_years
-    samples = []
-    for _ in range(n):
-        spread_shock = random.gauss(0.0, rate_spread_vol_bps) / 10000.0
-        if random.random() < pd_path:
-            recovery = max(0.0, 1.0 - lgd + random.gauss(0.0, 0.03))
-            price = par_value * recovery
-        else:
-            carry = coupon_apr * horizon_years * 0.2
-            price = par_value * (1.0 - spread_shock + carry)
-        samples.append(max(0.0, price))
-    p10, p50, p90 = _percentiles(samples, [0.10, 0.50, 0.90])
-    return (p10, p50, p90, {"samples": len(samples), "pd_path": pd_path, "lgd": lgd})
+    sampler = _mc.Sampler(seed, antithetic=antithetic, qmc=qmc)
+
+    def draw(k: int):
+        z, u = sampler.draw(k, 2, 1)
+        return _mc.credit_samples(
+            par_value,
+            pd_path=pd_path,
+            lgd=lgd,
+            carry=coupon_apr * horizon_years * 0.2,
+            rate_spread_vol_bps=rate_spread_vol_bps,
+            z=z,
+            u=u[0],
+        )
+
+    p10, p50, p90, diag = _mc_band(draw, sampler, n=n, tol=tol, chunk=chunk, max_n=max_n)
+    diag.update({"pd_path": pd_path, "lgd": lgd})
+    return (p10, p50, p90, diag)
+
+# -------------------------- Monte Carlo inputs per mode --------------------------
+
+def credit_mc_args(p: ValuationParams) -> Dict[str, Any]:
+    """monte_carlo_credit arguments for a request (par ~ loan)."""
+    return {
+        "par_value": float(p.loan_amount or 0.0),
+        "coupon_apr": float(p.coupon_apr or 0.0),
+        "tenor_months": int(p.tenor_months or 0) or 1,
+        "pd_annual": 0.02,
+        "lgd": 0.35,
+        "rate_spread_vol_bps": 50.0,
+    }
+
+def equity_blend(p: ValuationParams) -> Tuple[float, Dict[str, Any]]:
+    """Blended pre-overlay value from hedonic/residual/comps. Returns (value, component values)."""
+    # components
+    hedonic = compute_hedonic(p)
+    residual = compute_residual_land_value(p)
+    comps_val, comps_used = compute_comps_value(p)
+
+    # blend (start: hedonic; if residual exists, average; if comps exists, blend by weights)
+    if comps_val is not None:
+        w_c = float(p.blend_comps or 0.6)
+        w_h = float(p.blend_hedonic or 0.4)
+        base_value = w_c * comps_val + w_h * hedonic
+    else:
+        base_value = hedonic
+
+    if residual is not None:
+        base_value = (base_value + residual) / 2.0
+
+    return base_value, {"hedonic": hedonic, "residual": residual, "comps_value": comps_val, "comps_used": comps_used}
+
+def equity_mc_args(p: ValuationParams, blend: Optional[Tuple[float, Dict[str, Any]]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Deterministic part of the equity path: blend hedonic/residual/comps, apply macro and
+    progress/delay overlays. Returns (monte_carlo_equity arguments, component values).
+    Pass a precomputed equity_blend(p) to re-apply overlays without re-running comps.
+    """
+    progress = p.progress or Progress()
+    base_value, components = blend if blend is not None else equity_blend(p)
+
+    # macro delta
+    base_value = apply_macro_delta(base_value, p.macro or MacroOverlay())
+
+    # progress + delay penalties
+    value_after_progress, prog_diag = apply_progress_and_delay(
+        base_value,
+        progress,
+        finance_apr=float(p.discount_rate_equity or 0.12),
+        climate=p.climate_signals,
+    )
+
+    planned = float(progress.planned_completion_months or 12.0)
+    expected = float(
+        progress.expected_completion_months
+        if (progress and progress.expected_completion_months is not None)
+        else planned + progress_delay_months(progress, p.climate_signals)
+    )
+
+    args = {
+        "base_value": value_after_progress,
+        "planned_months": planned,
+        "expected_months": expected,
+        "finance_apr": float(p.discount_rate_equity or 0.12),
+        "sales_vol": 0.08,
+        "cost_vol": 0.06,
+        "delay_sd_months": 1.0,
+        "liq_premium": liquidity_premium(p.liquidity or Liquidity()),
+    }
+    setup = {**components, "progress": prog_diag}
+    return args, setup
+
+def _credit_kernel_args(a: Dict[str, Any]) -> Dict[str, Any]:
+    """credit_mc_args → keyword arguments for the montecarlo credit kernels (minus par/z/u)."""
+    horizon_years = a["tenor_months"] / 12.0
+    return {
+        "pd_path": 1 - (1 - a["pd_annual"]) ** horizon_years,
+        "lgd": a["lgd"],
+        "carry": a["coupon_apr"] * horizon_years * 0.2,
+        "rate_spread_vol_bps": a["rate_spread_vol_bps"],
+    }
+
+def _equity_kernel_args(a: Dict[str, Any]) -> Dict[str, Any]:
+    """equity_mc_args → keyword arguments for the montecarlo equity kernels (minus base/z)."""
+    return {
+        "baseline_delay": max(0.0, (a["expected_months"] or a["planned_months"]) - (a["planned_months"] or 0.0)),
+        "monthly_carry": a["finance_apr"] / 12.0,
+        "sales_vol": a["sales_vol"],
+        "cost_vol": a["cost_vol"],
+        "delay_sd_months": a["delay_sd_months"],
+        "liq_premium": a["liq_premium"],
+    }
+
+# -------------------------- Sample export --------------------------
+
+SAMPLE_COLUMNS = {
+    "equity": ("value", "sales_mult", "cost_mult", "delay_months"),
+    "credit": ("value", "spread_shock", "defaulted", "recovery"),
+}
+
+def export_samples(params: Dict[str, Any], *, n: int = 100_000, chunk: int = 65_536) -> Tuple[Tuple[str, ...], Iterator[bytes]]:
+    """
+    Raw Monte Carlo draws (value + per-draw drivers) for a request, as a stream of
+    self-contained .npy record-array chunks. Params are validated (and the deterministic
+    setup, incl. comps, is run) before returning, so errors surface up front; the draws
+    themselves are generated one chunk at a time. Honors monte_carlo.seed/antithetic/qmc.
+    """
+    p = ValuationParams(**(params or {}))
+    mc = p.monte_carlo or MonteCarloOptions()
+    sampler = _mc.Sampler(mc.seed, antithetic=bool(mc.antithetic), qmc=bool(mc.qmc))
+    n, chunk = max(0, int(n)), max(1, int(chunk))
+
+    if p.mode.lower() == "credit":
+        a = credit_mc_args(p)
+        fixed = _credit_kernel_args(a)
+
+        def draw(k: int) -> Dict[str, Sequence[float]]:
+            z, u = sampler.draw(k, 2, 1)
+            return _mc.credit_draws(a["par_value"], z=z, u=u[0], **fixed)
+        columns = SAMPLE_COLUMNS["credit"]
+    else:
+        a, _setup = equity_mc_args(p)
+        fixed = _equity_kernel_args(a)
+
+        def draw(k: int) -> Dict[str, Sequence[float]]:
+            z, _ = sampler.draw(k, 3)
+            return _mc.equity_draws(a["base_value"], z=z, **fixed)
+        columns = SAMPLE_COLUMNS["equity"]
+
+    def chunks() -> Iterator[bytes]:
+        left = n
+        while left > 0:
+            k = min(chunk, left)
+            yield _mc.npy_chunk(draw(k))
+            left -= k
+
+    return columns, chunks()
+
+# -------------------------- Scenario comparison (common random numbers) --------------------------
+
+class ScenarioVariant(BaseModel):
+    name: str
+    # overlay fields given here replace the base request's; unset fields are inherited
+    macro: Optional[MacroOverlay] = None
+    progress: Optional[Progress] = None
+    liquidity: Optional[Liquidity] = None
+    climate_signals: Optional[ClimateSignals] = None
+
+_OVERLAYS = ("macro", "progress", "liquidity", "climate_signals")
+
+def apply_variant(p: ValuationParams, v: ScenarioVariant) -> ValuationParams:
+    """The base request with a variant's overlays merged in (field by field)."""
+    update = {}
+    for k in _OVERLAYS:
+        ov = getattr(v, k)
+        if ov is None:
+            continue
+        cur = getattr(p, k)
+        merged = {**(cur.model_dump() if cur is not None else {}), **ov.model_dump(exclude_unset=True)}
+        update[k] = type(ov)(**merged)
+    return p.model_copy(update=update)
+
+def _band_summary(values: Sequence[float]) -> Dict[str, float]:
+    p10, p50, p90 = _mc.percentiles(values, [0.10, 0.50, 0.90])
+    mean = float(values.mean()) if hasattr(values, "mean") else statistics.fmean(values)
+    return {"p10": p10, "p50": p50, "p90": p90, "mean": mean}
+
+def compare_scenarios(params: Dict[str, Any], variants: Sequence[Dict[str, Any]], *, n: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Evaluate overlay variants (macro / progress / liquidity / climate) against the base request
+    on ONE shared set of random draws, and report paired deltas (variant - base) with 95% CIs.
+    Because both sides see the same sales/cost/delay (or spread/default) shocks, the noise
+    cancels in the difference and small effects resolve at a fraction of the sample count
+    two independent runs would need (see delta.variance_ratio).
+    The deterministic setup (hedonic/residual/comps) runs once; only overlays are re-applied.
+    Credit overlays act on each draw as they do on the band mid (macro delta, liquidity premium).
+    """
+    try:
+        p = ValuationParams(**(params or {}))
+        vs = [ScenarioVariant(**(v or {})) for v in variants]
+    except ValidationError as ve:
+        return {"status": "error", "errors": ve.errors()}
+
+    mc = p.monte_carlo or MonteCarloOptions()
+    n = max(2, int(n or mc.n or 3000))
+    sampler = _mc.Sampler(mc.seed, antithetic=bool(mc.antithetic), qmc=bool(mc.qmc))
+
+    if p.mode.lower() == "credit":
+        a = credit_mc_args(p)
+        z, u = sampler.draw(n, 2, 1)
+        raw = _mc.credit_samples(a["par_value"], z=z, u=u[0], **_credit_kernel_args(a))
+
+        def values(q: ValuationParams) -> Sequence[float]:
+            factor = apply_macro_delta(1.0, q.macro) * (1 + liquidity_premium(q.liquidity or Liquidity()))
+            return raw * factor if hasattr(raw, "dtype") else [v * factor for v in raw]
+    else:
+        blend = equity_blend(p)
+        z, _ = sampler.draw(n, 3)
+
+        def values(q: ValuationParams) -> Sequence[float]:
+            a, _setup = equity_mc_args(q, blend)
+            return _mc.equity_samples(a["base_value"], z=z, **_equity_kernel_args(a))
+
+    base_vals = values(p)
+    base = _band_summary(base_vals)
+    out = []
+    for v in vs:
+        alt_vals = values(apply_variant(p, v))
+        band = _band_summary(alt_vals)
+        delta = _mc.paired_delta(base_vals, alt_vals)
+        delta["rel_mean"] = (delta["mean"] / base["mean"]) if base["mean"] else None
+        delta.update({k: band[k] - base[k] for k in ("p10", "p50", "p90")})
+        out.append({"name": v.name, "band": band, "delta": delta})
+
+    return {
+        "status": "ok",
+        "mode": p.mode.lower(),
+        "samples": n,
+        "kernel": _mc.KERNEL,
+        "sequence": sampler.sequence,
+        "antithetic": sampler.antithetic,
+        "base": base,
+        "variants": out,
+    }
 
 # -------------------------- AI Explainer (stub) --------------------------
 
@@ -609,13 +915,50 @@ def ai_explainer(summary: Dict[str, Any]) -> str:
 
 # -------------------------- Main entrypoint --------------------------
 
+def _dependencies(p: ValuationParams) -> Dict[str, Any]:
+    """Data outside the params a result is built from: the comps source and the served prediction model."""
+    deps: Dict[str, Any] = {}
+    if p.use_comps:
+        from app.engines.Core import comps as _comps
+        deps["comps"] = _comps.source_signature()
+    view = _View(p.detail, p.fields)
+    if (p.mode or "").lower() != "credit" and view.wants("token_pricing") and view.detail != "summary":
+        try:
+            from app.engines.Core import market_prediction
+            deps["prediction_model"] = market_prediction.model_fingerprint()
+        except Exception:
+            deps["prediction_model"] = None
+    return deps
+
+def cache_key(p: ValuationParams) -> str:
+    """
+    Content address of a validated request: canonical params (incl. MC seed) + ENGINE_VERSION,
+    plus the comps data and prediction model it would use, so a data change or model reload
+    is a miss rather than a stale overlay.
+    """
+    payload = {"params": p.model_dump(mode="json", exclude={"use_cache"}), "deps": _dependencies(p)}
+    return _cache.content_key("valuation", ENGINE_VERSION, payload)
+
 def run(params: Dict[str, Any]) -> Dict[str, Any]:
     try:
         p = ValuationParams(**(params or {}))
     except ValidationError as ve:
         return {"status": "error", "errors": ve.errors()}
 
+    if not p.use_cache or p.monte_carlo is None or p.monte_carlo.seed is None:
+        return _run(p)
+    cache = _cache.get_cache("valuation")
+    key = cache_key(p)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit
+    result = _run(p)
+    cache.set(key, result)
+    return result
+
+def _run(p: ValuationParams) -> Dict[str, Any]:
     # Common helpers/inputs
+    view = _View(p.detail, p.fields)
     tokens_out = int(p.tokens_outstanding or 1_000_000)
     macro_adj = p.macro or MacroOverlay()
     liq = p.liquidity or Liquidity()
@@ -638,15 +981,7 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
         cov = covenant_eval(metrics, p.covenants)
 
         # price band via credit MC (use par ~ loan as base)
-        p10, p50, p90, diag = monte_carlo_credit(
-            par_value=loan or 0.0,
-            coupon_apr=apr or 0.0,
-            tenor_months=tenor or 1,
-            pd_annual=0.02,
-            lgd=0.35,
-            rate_spread_vol_bps=50.0,
-            n=3000
-        )
+        p10, p50, p90, diag = monte_carlo_credit(**credit_mc_args(p), **_mc_kwargs(p.monte_carlo))
 
         # Macro & liquidity nudges on the mid
         base_mid = apply_macro_delta(p50, macro_adj)
@@ -669,10 +1004,10 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
         token_econ = _tokenize_from_value(core_value=risk_band["base"], tokens_out=tokens_out)
         summary = _investor_summary("credit", risk_band, irr=returns.get("irr"))
 
-        result = {
+        result = view.project({
             "status": "done",
             "mode": "credit",
-            "inputs": {"params": p.model_dump() if hasattr(p, "model_dump") else p.dict()},
+            "inputs": {"params": p.model_dump()} if view.wants("inputs") else None,
             "core_valuation": risk_band,
             "token_economics": token_econ,
             "investor_summary": summary,
@@ -707,62 +1042,23 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
             },
             "diagnostics": {"credit_mc": diag},
             "explain": ai_explainer({"mode": "credit", "metrics": metrics, "returns": returns}),
-        }
+        })
         return result
 
        # ==================== EQUITY PATH ====================
-    # components
-    hedonic = compute_hedonic(p)
-    residual = compute_residual_land_value(p)
-    comps_val, comps_used = compute_comps_value(p)
-
-    # blend (start: hedonic; if residual exists, average; if comps exists, blend by weights)
-    if comps_val is not None:
-        w_c = float(p.blend_comps or 0.6)
-        w_h = float(p.blend_hedonic or 0.4)
-        base_value = w_c * comps_val + w_h * hedonic
-    else:
-        base_value = hedonic
-
-    if residual is not None:
-        base_value = (base_value + residual) / 2.0
-
-    # macro delta
-    base_value = apply_macro_delta(base_value, macro_adj)
-
-    # progress + delay penalties
-    value_after_progress, prog_diag = apply_progress_and_delay(
-        base_value,
-        progress,
-        finance_apr=float(p.discount_rate_equity or 0.12),
-        climate=p.climate_signals,
-    )
+    mc_args, setup = equity_mc_args(p)
+    hedonic, residual = setup["hedonic"], setup["residual"]
+    comps_val, comps_used = setup["comps_value"], setup["comps_used"]
+    prog_diag = setup["progress"]
 
     # ---- equity Monte Carlo around that value ----
-    planned = float(progress.planned_completion_months or 12.0)
-    expected = float(
-        progress.expected_completion_months
-        if (progress and progress.expected_completion_months is not None)
-        else planned + progress_delay_months(progress, p.climate_signals)
-    )
-
-    p10, p50, p90, diag = monte_carlo_equity(
-        base_value=value_after_progress,
-        planned_months=planned,
-        expected_months=expected,
-        finance_apr=float(p.discount_rate_equity or 0.12),
-        sales_vol=0.08,
-        cost_vol=0.06,
-        delay_sd_months=1.0,
-        liq_premium=liquidity_premium(liq),
-        n=3000,
-    )
+    p10, p50, p90, diag = monte_carlo_equity(**mc_args, **_mc_kwargs(p.monte_carlo))
 
     # define band vars for downstream use
     low, mid, high = p10, p50, p90
 
     # ---- Equity DCF result (monthly pro forma → IRR/NPV/EM) ----
-    dcf = compute_equity_cashflows_and_irr(
+    dcf = None if not view.wants("expected_returns") else compute_equity_cashflows_and_irr(
         land_cost=p.land_cost,
         build_cost=p.build_cost,
         soft_costs=p.soft_costs,
@@ -774,6 +1070,8 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
         presale_deposit_pct=0.10,
         spend_curve="s-curve",
     )
+    if dcf is not None and not view.full:
+        dcf.pop("cashflows_monthly", None)
 
     # Token NAV (equity)
     nav = build_token_nav(project_value=mid, debt=float(p.debt_outstanding or 0.0), tokens_out=tokens_out)
@@ -781,13 +1079,15 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
     d_idx = _compute_demand_index(p.demand, liq)
 
     # ---- fetch prediction overlay (Market Prediction Engine) ----
-    try:
-        from app.engines.Core import market_prediction
-        pred = market_prediction.run(
-            p.model_dump() if hasattr(p, "model_dump") else p.dict()
-        )
-    except Exception:
-        pred = {"status": "none"}
+    pred = None
+    if view.wants("token_pricing") and view.detail != "summary":
+        try:
+            from app.engines.Core import market_prediction
+            pred = market_prediction.run(
+                p.model_dump() if hasattr(p, "model_dump") else p.dict()
+            )
+        except Exception:
+            pred = {"status": "none"}
 
     nav_per_token = nav["nav_per_token"]
     demand_idx = d_idx
@@ -797,8 +1097,9 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
         "nav_per_token": nav_per_token,
         "market_price_per_token": market_price,
         "demand_index": demand_idx,
-        "prediction_overlay": pred,
     }
+    if pred is not None:
+        token_pricing["prediction_overlay"] = pred
     # Demand-aware token pricing (equity)
     d_idx = _compute_demand_index(p.demand, liq)
     market_price = _price_from_nav(nav["nav_per_token"], d_idx, alpha=0.6)
@@ -817,16 +1118,21 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
     debt_ratio = (float(p.debt_outstanding or 0.0) / max(mid, 1.0)) if (mid and mid > 0) else None
 
     # ---- build final result ----
-    result = {
+    components = {
+        "hedonic": hedonic,
+        "residual_land_value": residual,
+        "comps_value": comps_val,
+    }
+    if view.full:
+        components["comps_used"] = comps_used
+    else:
+        components["comps_count"] = len(comps_used)
+
+    result = view.project({
         "status": "done",
         "mode": "equity",
-        "inputs": {"params": p.model_dump() if hasattr(p, "model_dump") else p.dict()},
-        "components": {
-            "hedonic": hedonic,
-            "residual_land_value": residual,
-            "comps_value": comps_val,
-            "comps_used": comps_used,
-        },
+        "inputs": {"params": p.model_dump()} if view.wants("inputs") else None,
+        "components": components,
         "overlays": {
             "progress_discount": prog_diag["progress_discount"],
             "delay_months": prog_diag["delay_months"],
@@ -847,10 +1153,59 @@ def run(params: Dict[str, Any]) -> Dict[str, Any]:
         "token_pricing": token_pricing,
                        # ---- fetch prediction overlay (Market Prediction Engine) ---
 
-},
+}),
     
 
     return result
+
+# -------------------------- Batch entrypoint --------------------------
+
+def _run_unwrapped(params: Dict[str, Any]) -> Dict[str, Any]:
+    out = run(params)
+    return out[0] if isinstance(out, tuple) else out
+
+def validate_batch(items: Iterable[Dict[str, Any]]) -> Tuple[List[Optional[Dict[str, Any]]], Dict[int, list]]:
+    """One validation pass over a batch. Returns (validated params or None, {index: errors})."""
+    valid: List[Optional[Dict[str, Any]]] = []
+    errors: Dict[int, list] = {}
+    for i, raw in enumerate(items):
+        try:
+            ValuationParams(**(raw or {}))
+            valid.append(raw or {})
+        except ValidationError as ve:
+            valid.append(None)
+            errors[i] = ve.errors(include_url=False, include_context=False)
+        except TypeError as te:
+            valid.append(None)
+            errors[i] = [{"msg": str(te)}]
+    return valid, errors
+
+def run_batch(items: Sequence[Dict[str, Any]], *, ordered: bool = True, max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Validate a list of ValuationParams dicts once, then fan valid items out over the
+    shared process pool. Yields {index, status, result|errors} per item — in input
+    order, or as each finishes when ordered=False (invalid items then come first).
+    """
+    from app.engines import workers
+
+    valid, errors = validate_batch(items)
+    pending = sorted(errors)
+    if not ordered:
+        for i in pending:
+            yield {"index": i, "status": "error", "errors": errors[i]}
+        pending = []
+    todo = [(i, params) for i, params in enumerate(valid) if params is not None]
+    for i, result, err in workers.fan_out(_run_unwrapped, todo, ordered=ordered, max_workers=max_workers):
+        while pending and pending[0] < i:
+            j = pending.pop(0)
+            yield {"index": j, "status": "error", "errors": errors[j]}
+        if err is not None:
+            yield {"index": i, "status": "error", "errors": [{"msg": str(err)}]}
+        else:
+            yield {"index": i, "status": (result or {}).get("status", "done"), "result": result}
+    for j in pending:
+        yield {"index": j, "status": "error", "errors": errors[j]}
+
 # Register with the engine registry
 register(
     key="valuation",
@@ -1,12 +1,45 @@
 from __future__ import annotations
 
-from typing import Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 import importlib
 import pkgutil
+import threading
 from pathlib import Path
 
+from app.engines.manifest import ENGINES as MANIFEST
+
 # --- Engine registry ---
-REGISTRY: Dict[str, Callable[[dict, object | None], dict]] = {}
+class _LazyRegistry(dict):
+    """
+    key → runner. Keys from the manifest resolve on first lookup by importing the engine's
+    module (whose register() call fills the entry); nothing is imported up front.
+    """
+    _lock = threading.RLock()
+
+    def __missing__(self, key: str) -> Callable[..., dict]:
+        spec = MANIFEST.get(key)
+        if spec is None:
+            raise KeyError(key)
+        with self._lock:
+            if not dict.__contains__(self, key):
+                importlib.import_module(spec[0])
+        if not dict.__contains__(self, key):
+            raise KeyError(f"{spec[0]} did not register engine {key!r}")
+        return dict.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        return dict.__contains__(self, key) or key in MANIFEST
+
+    def loaded(self) -> List[str]:
+        return sorted(dict.keys(self))
+
+REGISTRY: Dict[str, Callable[[dict, object | None], dict]] = _LazyRegistry()
 META: Dict[str, dict] = {}
 
 def register(key: str, fn: Callable[[dict, object | None], dict], description: str = "", name: Optional[str] = None) -> None:
@@ -18,10 +51,10 @@ def register(key: str, fn: Callable[[dict, object | None], dict], description: s
     }
 
 def list_engines() -> List[dict]:
-    """Return a list of registered engines for /engines/list."""
+    """Return a list of known engines for /engines/list (manifest + anything registered at runtime)."""
     out: List[dict] = []
-    for k in sorted(REGISTRY.keys()):
-        meta = META.get(k, {})
+    for k in sorted(set(MANIFEST) | set(META)):
+        meta = META.get(k) or {"name": MANIFEST[k][1], "description": MANIFEST[k][2]}
         out.append({
             "key": k,
             "name": meta.get("name", k),
@@ -29,23 +62,25 @@ def list_engines() -> List[dict]:
         })
     return out
 
+def _engine_modules() -> List[str]:
+    pkg_dir = Path(__file__).resolve().parent
+    return [name for _, name, _ in pkgutil.walk_packages([str(pkg_dir)], prefix="app.engines.")
+            if not name.rsplit(".", 1)[-1].startswith("test_")]
+
 def discover() -> None:
     """
     Import all submodules under app.engines.* so each module can call register().
     """
-    base_pkg = __name__               # "app.engines"
-    base_path = Path(__file__).parent # app/engines/
-
-    for _finder, modname, _ispkg in pkgutil.walk_packages([str(base_path)], prefix=base_pkg + "."):
+    for modname in _engine_modules():
         importlib.import_module(modname)
+
 def discover_engines():
-    """Auto-import all engine modules so they can self-register."""
-    pkg_dir = Path(__file__).resolve().parent
-    for _, module_name, _ in pkgutil.walk_packages([str(pkg_dir)], prefix="app.engines."):
+    """
+    Eagerly import every engine module (tooling / manifest checks only — the app resolves
+    engines lazily through REGISTRY).
+    """
+    for module_name in _engine_modules():
         try:
             importlib.import_module(module_name)
         except Exception as e:
             print(f"[engine discovery] Failed loading {module_name}: {e}")
-
-# Trigger discovery at import
-discover_engines()
@@ -0,0 +1,209 @@
+# app/engines/cache.py
+from __future__ import annotations
+import hashlib, json, os, sqlite3, threading, time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Content-addressed result cache for engine outputs.
+# Values are stored as canonical JSON: hits hand back a fresh copy (callers may mutate
+# freely), the byte budget is exact, and a shared on-disk cache never unpickles bytes
+# another process wrote. Values that aren't JSON-shaped are simply not cached.
+
+def content_key(namespace: str, version: str, payload: Any) -> str:
+    """sha256 over namespace/version + canonical JSON (sorted keys, no whitespace)."""
+    canon = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{namespace}|{version}|{canon}".encode()).hexdigest()
+
+class _Stats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else None,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+class MemoryBackend:
+    """Per-process LRU with TTL, bounded by entry count and total encoded bytes."""
+    name = "memory"
+
+    def __init__(self, *, ttl_s: float = 300.0, max_bytes: int = 64 * 2**20, max_entries: int = 10_000):
+        self.ttl_s = float(ttl_s)
+        self.max_bytes = int(max_bytes)
+        self.max_entries = int(max_entries)
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = _Stats()
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.stats.misses += 1
+                return None
+            expires, blob = item
+            if expires <= now:
+                self._drop(key)
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return blob
+
+    def set(self, key: str, blob: bytes) -> None:
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (time.time() + self.ttl_s, blob)
+            self._bytes += len(blob)
+            self.stats.sets += 1
+            while self._data and (self._bytes > self.max_bytes or len(self._data) > self.max_entries):
+                self._drop(next(iter(self._data)))
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _drop(self, key: str) -> None:
+        _exp, blob = self._data.pop(key)
+        self._bytes -= len(blob)
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": self.name, "entries": len(self._data), "bytes": self._bytes,
+                "max_bytes": self.max_bytes, "ttl_s": self.ttl_s, **self.stats.as_dict()}
+
+class SqliteBackend:
+    """
+    Local stand-in for Redis: one SQLite file shared by every worker process on the host
+    (WAL mode, so readers don't block the writer). LRU by last access, TTL, byte budget.
+    Counters are per process.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str, *, ttl_s: float = 300.0, max_bytes: int = 256 * 2**20):
+        self.path = path
+        self.ttl_s = float(ttl_s)
+        self.max_bytes = int(max_bytes)
+        self._local = threading.local()
+        self.stats = _Stats()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as c:
+            c.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, size INTEGER, expires REAL, atime REAL)")
+            c.execute("CREATE INDEX IF NOT EXISTS cache_atime ON cache(atime)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread, re-opened after fork (pool workers)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        c = self._conn()
+        row = c.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.stats.misses += 1
+            return None
+        if row[1] <= now:
+            c.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        c.execute("UPDATE cache SET atime = ? WHERE key = ?", (now, key))
+        self.stats.hits += 1
+        return bytes(row[0])
+
+    def set(self, key: str, blob: bytes) -> None:
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        c = self._conn()
+        c.execute("INSERT OR REPLACE INTO cache (key, value, size, expires, atime) VALUES (?, ?, ?, ?, ?)",
+                  (key, sqlite3.Binary(blob), len(blob), now + self.ttl_s, now))
+        self.stats.sets += 1
+        c.execute("DELETE FROM cache WHERE expires <= ?", (now,))
+        total = c.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        while total > self.max_bytes:
+            row = c.execute("SELECT key, size FROM cache ORDER BY atime ASC LIMIT 1").fetchone()
+            if row is None:
+                break
+            c.execute("DELETE FROM cache WHERE key = ?", (row[0],))
+            total -= row[1]
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM cache")
+
+    def info(self) -> Dict[str, Any]:
+        entries, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        return {"backend": self.name, "path": self.path, "entries": entries, "bytes": size,
+                "max_bytes": self.max_bytes, "ttl_s": self.ttl_s, **self.stats.as_dict()}
+
+class ResultCache:
+    """JSON front-end over a backend; get() returns None on miss."""
+
+    def __init__(self, backend: Any):
+        self.backend = backend
+
+    def get(self, key: str) -> Any:
+        blob = self.backend.get(key)
+        if blob is None:
+            return None
+        try:
+            return json.loads(blob)
+        except Exception:
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            blob = json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+        except (TypeError, ValueError):
+            return
+        try:
+            self.backend.set(key, blob)
+        except Exception:
+            pass
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def info(self) -> Dict[str, Any]:
+        return self.backend.info()
+
+_CACHES: Dict[str, ResultCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+def get_cache(namespace: str) -> ResultCache:
+    """Process-wide cache per namespace, built from settings (RESULT_CACHE_*)."""
+    with _CACHES_LOCK:
+        cache = _CACHES.get(namespace)
+        if cache is None:
+            from app.core.config import settings
+            if settings.RESULT_CACHE_BACKEND == "sqlite":
+                path = os.path.join(settings.RESULT_CACHE_DIR, f"{namespace}.sqlite")
+                backend: Any = SqliteBackend(path, ttl_s=settings.RESULT_CACHE_TTL_S, max_bytes=settings.RESULT_CACHE_MAX_BYTES)
+            else:
+                backend = MemoryBackend(ttl_s=settings.RESULT_CACHE_TTL_S, max_bytes=settings.RESULT_CACHE_MAX_BYTES)
+            cache = _CACHES[namespace] = ResultCache(backend)
+        return cache
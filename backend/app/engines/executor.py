@@ -0,0 +1,135 @@
+# app/engines/executor.py
+from __future__ import annotations
+import asyncio, threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from app.engines import REGISTRY
+from app.engines.workers import available_cpus, mp_context
+
+# Async engine invocation for request handlers: `await run_engine(key, params)`.
+# Engines never run on the event loop. CPU-heavy, stateless engines go to a dedicated
+# process pool (the GIL would otherwise serialize concurrent Monte Carlo runs); the rest
+# go to a thread pool, which keeps per-process state such as token_mark's base cache and
+# the model registry. Each lane admits at most workers + queue calls; beyond that the
+# call fails fast with EngineBusy (HTTP 429) instead of piling up behind the pool.
+# A slot is released when the engine call itself finishes, not when the awaiting
+# request gives up, so abandoned calls still count against the bound.
+
+PROCESS_ENGINES = frozenset({"valuation", "dcf_grid", "scenario", "stress_test"})
+
+class EngineBusy(Exception):
+    """The lane for this engine is saturated; retry later (→ 429)."""
+    def __init__(self, key: str, lane: str, retry_after_s: float = 1.0):
+        super().__init__(f"engine {key!r} busy ({lane} lane saturated)")
+        self.key, self.lane, self.retry_after_s = key, lane, retry_after_s
+
+def _call(key: str, params: Dict[str, Any]) -> Any:
+    # module-level so it pickles for the process lane; the worker resolves the engine lazily
+    return REGISTRY[key](params)
+
+class _Lane:
+    def __init__(self, name: str, make: Callable[[int], Executor], workers: int, queue: int):
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.limit = self.workers + max(0, int(queue))
+        self._make = make
+        self._pool: Optional[Executor] = None
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    def _executor(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._make(self.workers)
+            return self._pool
+
+    def _release(self, fut: Any = None) -> None:
+        with self._lock:
+            self._inflight -= 1
+        if fut is not None and not fut.cancelled() and isinstance(fut.exception(), BrokenProcessPool):
+            self.reset()     # a worker died; start a fresh pool for the next call
+
+    def submit(self, key: str, params: Dict[str, Any]) -> Future:
+        with self._lock:
+            if self._inflight >= self.limit:
+                raise EngineBusy(key, self.name)
+            self._inflight += 1
+        try:
+            fut = self._executor().submit(_call, key, params)
+        except BrokenProcessPool:
+            self.reset()
+            self._release()
+            raise
+        except BaseException:
+            self._release()
+            raise
+        fut.add_done_callback(self._release)
+        return fut
+
+    def reset(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)     # queued/running calls still complete
+
+    def info(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "limit": self.limit, "inflight": self._inflight, "started": self._pool is not None}
+
+def _process_executor(n: int) -> ProcessPoolExecutor:
+    # same start method as the shared batch pool (workers.mp_context); engines resolve lazily
+    return ProcessPoolExecutor(max_workers=n, mp_context=mp_context())
+
+_LANES: Dict[str, _Lane] = {}
+_LANES_LOCK = threading.Lock()
+
+def _lanes() -> Dict[str, _Lane]:
+    with _LANES_LOCK:
+        if not _LANES:
+            from app.core.config import settings
+            cpu = settings.ENGINE_PROCESS_WORKERS or available_cpus()
+            _LANES["process"] = _Lane("process", _process_executor, cpu, settings.ENGINE_QUEUE_DEPTH)
+            _LANES["thread"] = _Lane(
+                "thread", lambda n: ThreadPoolExecutor(max_workers=n, thread_name_prefix="engine-run"),
+                settings.ENGINE_THREAD_WORKERS, settings.ENGINE_QUEUE_DEPTH)
+        return _LANES
+
+def lane_for(key: str) -> str:
+    return "process" if key in PROCESS_ENGINES else "thread"
+
+async def run_engine(key: str, params: Optional[Dict[str, Any]] = None, *, timeout_s: Optional[float] = None) -> Any:
+    """
+    Run engine `key` off the event loop and await its result. Raises KeyError for an
+    unknown key, EngineBusy when saturated, asyncio.TimeoutError past timeout_s, and
+    whatever the engine itself raises.
+    """
+    if key not in REGISTRY:
+        raise KeyError(key)
+    fut = _lanes()[lane_for(key)].submit(key, params or {})
+    wrapped = asyncio.wrap_future(fut)
+    if timeout_s is None:
+        return await wrapped
+    return await asyncio.wait_for(asyncio.shield(wrapped), timeout_s)
+
+def recycle(lane: str) -> bool:
+    """
+    Replace a lane's workers: calls in flight finish on the old pool, new calls start fresh
+    processes. This is how per-process state in process-lane workers (memory result cache,
+    loaded models) is invalidated, since a pool gives no way to address each worker.
+    Returns whether a pool had been started.
+    """
+    cur = _lanes().get(lane)
+    if cur is None or cur._pool is None:
+        return False
+    cur.reset()
+    return True
+
+def info() -> Dict[str, Any]:
+    return {name: lane.info() for name, lane in _lanes().items()}
+
+def shutdown() -> None:
+    with _LANES_LOCK:
+        for lane in _LANES.values():
+            lane.reset()
+        _LANES.clear()
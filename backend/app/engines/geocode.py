@@ -0,0 +1,217 @@
+# app/engines/geocode.py
+from __future__ import annotations
+import hashlib, os, re, sqlite3, threading, time, unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Address normalization + geocoding shared by comps, valuation and scenario.
+# Everything here is process-independent: hashes come from blake2b (not the per-process
+# salted hash()), so every worker maps an address to the same key, seed and coordinates,
+# and the on-disk cache can be shared between them.
+
+LatLon = Tuple[float, float]
+
+# -------------------------- Normalization --------------------------
+
+# street-type abbreviations, expanded only when they end an address segment ("12 Test St,")
+# so that "St Kilda" / "Mt Eliza" are left alone
+_STREET_TYPES = {
+    "st": "street", "rd": "road", "ave": "avenue", "av": "avenue", "dr": "drive", "ct": "court",
+    "pl": "place", "ln": "lane", "cres": "crescent", "cr": "crescent", "tce": "terrace",
+    "pde": "parade", "hwy": "highway", "blvd": "boulevard", "bvd": "boulevard", "cl": "close",
+    "sq": "square", "cct": "circuit", "esp": "esplanade", "gr": "grove", "wy": "way",
+}
+_STATES = {
+    "new south wales": "nsw", "victoria": "vic", "queensland": "qld", "south australia": "sa",
+    "western australia": "wa", "tasmania": "tas", "northern territory": "nt",
+    "australian capital territory": "act",
+}
+_PUNCT = re.compile(r"[^\w\s,/-]")
+_SPACES = re.compile(r"\s+")
+
+def normalize_address(addr: str) -> str:
+    """
+    Canonical form used as the geocode/seed key: case- and accent-folded, punctuation and
+    repeated whitespace removed, state names shortened, trailing street types expanded.
+    "12 Test St., SYDNEY  New South Wales" → "12 test street, sydney nsw"
+    """
+    s = unicodedata.normalize("NFKD", addr or "")
+    s = "".join(ch for ch in s if not unicodedata.combining(ch)).lower()
+    s = _PUNCT.sub(" ", s)
+    for name, abbr in _STATES.items():
+        s = re.sub(rf"\b{name}\b", abbr, s)
+    parts = []
+    for seg in s.split(","):
+        toks = _SPACES.sub(" ", seg).strip().split(" ")
+        if len(toks) > 1 and toks[-1] in _STREET_TYPES:
+            toks[-1] = _STREET_TYPES[toks[-1]]
+        if toks != [""]:
+            parts.append(" ".join(toks))
+    return ", ".join(parts)
+
+def stable_hash(text: str) -> int:
+    """64-bit blake2b of the UTF-8 text — identical in every process and on every host."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+def address_seed(addr: str) -> int:
+    """Deterministic 32-bit seed for an address (normalized first)."""
+    return stable_hash(normalize_address(addr)) % (2**32)
+
+def hash_lat_lon(addr: str) -> LatLon:
+    # Cheap, deterministic "geocode"; roughly AU-ish bbox, harmless for offline dev
+    h = address_seed(addr)
+    lat = -37.0 + (h % 1000) / 1000.0 * 10.0          # -37 .. -27
+    lon = 144.0 + ((h >> 10) % 1000) / 1000.0 * 10.0  # 144 .. 154
+    return (round(lat, 6), round(lon, 6))
+
+# -------------------------- Persistent cache --------------------------
+
+class GeocodeStore:
+    """
+    SQLite table of normalized address → (lat, lon, source), shared by every worker process
+    on the host (WAL mode). No TTL: reads ask for one source, so entries from another
+    resolver (e.g. hash-stub coordinates once a real geocoder is wired in) are misses and
+    get replaced by the next resolve.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS geocode (key TEXT PRIMARY KEY, lat REAL, lon REAL, source TEXT, updated REAL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread, re-opened after fork (pool workers)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get_many(self, keys: Sequence[str], source: Optional[str] = None) -> Dict[str, LatLon]:
+        """Stored coordinates per key; with source, only entries that source resolved."""
+        out: Dict[str, LatLon] = {}
+        c = self._conn()
+        for i in range(0, len(keys), 500):   # stay under SQLite's bound-parameter limit
+            chunk = list(keys[i:i + 500])
+            q = f"SELECT key, lat, lon FROM geocode WHERE key IN ({','.join('?' * len(chunk))})"
+            if source is not None:
+                q += " AND source = ?"
+                chunk.append(source)
+            out.update({k: (lat, lon) for k, lat, lon in c.execute(q, chunk)})
+        return out
+
+    def put_many(self, rows: Iterable[Tuple[str, float, float, str]]) -> None:
+        now = time.time()
+        c = self._conn()
+        c.execute("BEGIN")
+        try:
+            c.executemany("INSERT OR REPLACE INTO geocode (key, lat, lon, source, updated) VALUES (?, ?, ?, ?, ?)",
+                          [(k, lat, lon, src, now) for k, lat, lon, src in rows])
+            c.execute("COMMIT")
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+
+# -------------------------- Geocoder --------------------------
+
+class Geocoder:
+    """
+    normalize → in-process LRU → persistent store → resolver. The resolver is any
+    addr → (lat, lon) callable (hash_lat_lon until a real geocoding API is wired in).
+    """
+    def __init__(self, store: Optional[GeocodeStore] = None,
+                 resolver: Callable[[str], LatLon] = hash_lat_lon,
+                 source: str = "hash_stub",
+                 memo_size: int = 100_000):
+        self.store = store
+        self.resolver = resolver
+        self.source = source
+        self.memo_size = int(memo_size)
+        self._memo: "OrderedDict[str, LatLon]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, ll: LatLon) -> None:
+        with self._lock:
+            self._memo[key] = ll
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    def lookup(self, addr: str) -> LatLon:
+        return self.lookup_many([addr])[0]
+
+    def lookup_many(self, addrs: Sequence[str]) -> List[LatLon]:
+        """Coordinates per address; one store round-trip and one bulk write for all misses."""
+        keys = [normalize_address(a) for a in addrs]
+        original = dict(zip(keys, addrs))
+        found: Dict[str, LatLon] = {}
+        with self._lock:
+            for k in keys:
+                if k in self._memo:
+                    found[k] = self._memo[k]
+        missing = sorted(set(keys) - set(found))
+        if missing and self.store is not None:
+            try:
+                found.update(self.store.get_many(missing, source=self.source))
+            except sqlite3.Error:
+                pass
+            missing = [k for k in missing if k not in found]
+        if missing:
+            fresh = {k: self.resolver(original[k]) for k in missing}
+            found.update(fresh)
+            if self.store is not None:
+                try:
+                    self.store.put_many((k, lat, lon, self.source) for k, (lat, lon) in fresh.items())
+                except sqlite3.Error:
+                    pass
+        for k in set(keys):
+            self._remember(k, found[k])
+        return [found[k] for k in keys]
+
+    def prewarm(self, addrs: Iterable[str], *, chunk: int = 5_000) -> Dict[str, Any]:
+        """Resolve and persist a bulk address list ahead of traffic (e.g. a portfolio re-mark)."""
+        addrs = list(addrs)
+        before = self.store.count() if self.store is not None else None
+        for i in range(0, len(addrs), chunk):
+            self.lookup_many(addrs[i:i + chunk])
+        after = self.store.count() if self.store is not None else None
+        return {
+            "requested": len(addrs),
+            "unique": len({normalize_address(a) for a in addrs}),
+            "resolved": (after - before) if before is not None else None,
+            "stored": after,
+        }
+
+    def info(self) -> Dict[str, Any]:
+        return {"memo_entries": len(self._memo), "store": self.store.path if self.store else None,
+                "stored": self.store.count() if self.store else None, "source": self.source}
+
+_GEOCODER: Optional[Geocoder] = None
+_GEOCODER_LOCK = threading.Lock()
+
+def get_geocoder() -> Geocoder:
+    """Process-wide geocoder; persistent store from settings (GEOCODE_CACHE_*)."""
+    global _GEOCODER
+    with _GEOCODER_LOCK:
+        if _GEOCODER is None:
+            from app.core.config import settings
+            store = None
+            if settings.GEOCODE_CACHE_BACKEND == "sqlite":
+                try:
+                    store = GeocodeStore(os.path.join(settings.RESULT_CACHE_DIR, "geocode.sqlite"))
+                except (OSError, sqlite3.Error):
+                    store = None   # read-only FS etc. — memo only
+            _GEOCODER = Geocoder(store)
+        return _GEOCODER
+
+def geocode(addr: str) -> LatLon:
+    return get_geocoder().lookup(addr)
+
+def geocode_many(addrs: Sequence[str]) -> List[LatLon]:
+    return get_geocoder().lookup_many(addrs)
@@ -0,0 +1,96 @@
+# app/engines/linear_model.py
+from __future__ import annotations
+import json, os, pickle
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except Exception:  # numpy is optional — predict() falls back to a Python dot product
+    np = None
+
+# Native artifact for linear prediction models: plain JSON coefficients, no pickle and no
+# sklearn at serving time.
+#   {"format": "aurexus-linear", "format_version": 1, "version": "lin_v1",
+#    "feats": [...], "heads": {"m1": {"coef": [...], "intercept": 0.0}, "m2": {...}}}
+# Floats are written with repr(), so a round trip is exact.
+
+FORMAT = "aurexus-linear"
+FORMAT_VERSION = 1
+
+class LinearHead:
+    """y = X·coef + intercept; predict() takes rows like sklearn's LinearRegression.predict."""
+
+    def __init__(self, coef: Sequence[float], intercept: float = 0.0):
+        self.coef = [float(c) for c in coef]
+        self.intercept = float(intercept)
+        self._w = np.asarray(self.coef, dtype=float) if np is not None else None
+
+    def predict(self, X: Any) -> List[float]:
+        if np is not None:
+            return (np.asarray(X, dtype=float).reshape(-1, len(self.coef)) @ self._w + self.intercept).tolist()
+        return [sum(x * c for x, c in zip(row, self.coef)) + self.intercept for row in X]
+
+def load_linear(path: str) -> Dict[str, Any]:
+    """Native artifact → {"feats", "version", "kind", <head name>: LinearHead, ...}."""
+    with open(path) as f:
+        doc = json.load(f)
+    if doc.get("format") != FORMAT or int(doc.get("format_version", 0)) > FORMAT_VERSION:
+        raise ValueError(f"{path}: not a {FORMAT} v{FORMAT_VERSION} artifact")
+    feats = list(doc["feats"])
+    out: Dict[str, Any] = {"feats": feats, "version": doc.get("version"), "kind": "native_linear"}
+    for name, head in doc["heads"].items():
+        if len(head["coef"]) != len(feats):
+            raise ValueError(f"{path}: head {name} has {len(head['coef'])} coefficients for {len(feats)} features")
+        out[name] = LinearHead(head["coef"], head.get("intercept", 0.0))
+    return out
+
+def export_linear(model: Dict[str, Any], path: str, *, version: Optional[str] = None,
+                  heads: Sequence[str] = ("m1", "m2")) -> str:
+    """
+    Write a {"feats": [...], "m1": <linear model>, ...} bundle (sklearn LinearRegression or
+    anything with coef_/intercept_, or a LinearHead) as a native artifact. Atomic replace,
+    so a serving registry never reads a half-written file.
+    """
+    def coefs(m: Any) -> Dict[str, Any]:
+        if isinstance(m, LinearHead):
+            return {"coef": m.coef, "intercept": m.intercept}
+        coef = getattr(m, "coef_")
+        coef = coef.tolist() if hasattr(coef, "tolist") else list(coef)
+        if coef and isinstance(coef[0], list):      # (1, n_features) from a 2-D target
+            coef = coef[0]
+        intercept = getattr(m, "intercept_", 0.0)
+        intercept = intercept.tolist() if hasattr(intercept, "tolist") else intercept
+        if isinstance(intercept, list):
+            intercept = intercept[0]
+        return {"coef": [float(c) for c in coef], "intercept": float(intercept)}
+
+    doc = {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "version": version or model.get("version"),
+        "feats": list(model["feats"]),
+        "heads": {h: coefs(model[h]) for h in heads},
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(doc, f, indent=1)
+    os.replace(tmp, path)
+    return path
+
+def load_artifact(path: str) -> Any:
+    """Registry loader: native .json artifacts directly, anything else as a pickle."""
+    if path.endswith(".json"):
+        return load_linear(path)
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Convert a pickled {feats, m1, m2} linear model bundle to the native format")
+    ap.add_argument("pickle_path")
+    ap.add_argument("out_path")
+    ap.add_argument("--version")
+    a = ap.parse_args()
+    with open(a.pickle_path, "rb") as f:
+        bundle = pickle.load(f)      # needs sklearn importable here, and only here
+    print(export_linear(bundle, a.out_path, version=a.version))
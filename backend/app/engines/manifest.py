@@ -0,0 +1,173 @@
+# app/engines/manifest.py
+# Static engine manifest: key → (module, display name, description).
+# /engines/list is served from this table, and an engine's module is imported the first time
+# its key is looked up in REGISTRY. Keep it in step with each module's register() call;
+# test_smoke checks that they agree.
+
+ENGINES = {
+    "ai_agent": (
+        "app.engines.trust.ai_agent",
+        "AI Agent",
+        "Autonomous negotiator/orchestrator that can call other engines.",
+    ),
+    "allocation": (
+        "app.engines.ops.allocation",
+        "Allocation / Matching",
+        "Allocate inventory across orders or investor buckets.",
+    ),
+    "audit": (
+        "app.engines.ops.audit",
+        "Audit / Logging",
+        "Produce immutable audit trails for critical actions.",
+    ),
+    "compliance_rules": (
+        "app.engines.compliance.compliance_rules",
+        "Compliance Rules",
+        "Evaluate jurisdiction/product rules and constraints.",
+    ),
+    "comps": (
+        "app.engines.Core.comps",
+        "Comparable Sales",
+        "Comps engine with filtering, adjustments, weighting, outlier control, and quality metrics. CSV-backed with synthetic fallback.",
+    ),
+    "comps_batch": (
+        "app.engines.Core.comps",
+        "Comparable Sales (Batch)",
+        "Comps summaries for many subjects in one pass: shared provider setup and index lookups, overlapping candidates fetched once.",
+    ),
+    "contracts": (
+        "app.engines.trust.contracts",
+        "Contracts",
+        "Generate and validate contractual docs/artifacts.",
+    ),
+    "data_ingestion": (
+        "app.engines.data.ingestion",
+        "Data Ingestion / ETL",
+        "Load and normalize feeds from external sources.",
+    ),
+    "data_quality": (
+        "app.engines.data.data_quality",
+        "Data Quality / Anomaly",
+        "Rules and anomaly detection on ingested data.",
+    ),
+    "dcf_grid": (
+        "app.engines.Core.dcf_grid",
+        "DCF Sensitivity Grid",
+        "NPV / IRR / equity-multiple tables across land, build, revenue, presale and discount-rate axes, evaluated as array operations.",
+    ),
+    "deal_screen": (
+        "app.engines.Core.deal_screen",
+        "Deal Screening",
+        "Screen deals against investor/strategy criteria.",
+    ),
+    "eligibility": (
+        "app.engines.compliance. eligibility",
+        "Eligibility / Suitability",
+        "Check investor status and product suitability rules.",
+    ),
+    "escrow": (
+        "app.engines.trust.escrow",
+        "Escrow",
+        "Hold and release funds based on milestones and oracles.",
+    ),
+    "fees_billing": (
+        "app.engines.ops.fees_billing",
+        "Fees & Billing",
+        "Calculate and post fees, rebates, and invoices.",
+    ),
+    "kyc_kyb_aml": (
+        "app.engines.compliance.kyc_kyb_aml",
+        "KYC/KYB/AML",
+        "Identity verification and AML screening.",
+    ),
+    "liquidity_stimulation": (
+        "app.engines.market.liquidity_stimulation",
+        "Liquidity Stimulation",
+        "Tighten spreads/depth via incentives or market-making.",
+    ),
+    "macro_overlay": (
+        "app.engines.data.macro_overlay",
+        "Macro Overlay",
+        "Apply macro scenarios and overlays to valuations/returns.",
+    ),
+    "market_prediction": (
+        "app.engines.Core.market_prediction",
+        "Market Prediction",
+        "Predicts 1w/1m drift using a trained linear model (native JSON or pickled) if available; otherwise uses a safe heuristic.",
+    ),
+    "market_prediction_batch": (
+        "app.engines.Core.market_prediction",
+        "Market Prediction (Batch)",
+        "1w/1m drift for many projects at once: one feature matrix, one model pass per horizon.",
+    ),
+    "negotiation": (
+        "app.engines.trust.negotiation",
+        "Negotiation",
+        "Rule-driven negotiation flows over deal terms.",
+    ),
+    "notifications": (
+        "app.engines.ops.notifications",
+        "Notifications / Workflow",
+        "Route tasks and notifications to users/systems.",
+    ),
+    "order_matching": (
+        "app.engines.market.order_matching",
+        "Order Matching",
+        "Match bids/asks; allocate fills under market rules.",
+    ),
+    "portfolio_analytics": (
+        "app.engines.Core.portfolio_analytics",
+        "Portfolio Analytics",
+        "Aggregate performance, attribution, and exposures.",
+    ),
+    "pricing": (
+        "app.engines.market.pricing",
+        "Pricing / Quote",
+        "Indicative and executable pricing with slippage controls.",
+    ),
+    "resale": (
+        "app.engines.market.resale",
+        "Resale",
+        "List/settle secondary trades for units/interests.",
+    ),
+    "risk_underwriting": (
+        "app.engines.Core.risk_underwritting",
+        "Risk / Underwriting",
+        "Underwrite a deal: risks, covenants, buffers, and flags.",
+    ),
+    "scenario": (
+        "app.engines.Core.app.engines.core.scenario",
+        "Scenario Simulator",
+        "Projects affordability under macro & personal scenarios; provides unlock year and stress gauge.",
+    ),
+    "settlement": (
+        "app.engines.trust.settlement",
+        "Settlement",
+        "Atomic settle of cash and records; postings and receipts.",
+    ),
+    "stress_test": (
+        "app.engines.Core.stress_test",
+        "Stress Test",
+        "Shock key inputs (rates, rents, capex) to test resilience.",
+    ),
+    "token_mark": (
+        "app.engines.Core.token_mark",
+        "Token Mark",
+        "Incremental token repricing: cached base NAV per project with demand/macro overlays re-applied per mark.",
+    ),
+    "treasury": (
+        "app.engines.trust.treasury",
+        "Treasury",
+        "Cash management, ladders, liquidity buffers.",
+    ),
+    "valuation": (
+        "app.engines.Core.valuation",
+        "Valuation",
+        "Project & token valuation for equity and credit with risk/macro/liquidity overlays, demand-aware token pricing, and Monte Carlo.",
+    ),
+    "waterfall": (
+        "app.engines.Core.waterfall",
+        "Waterfall / Distributions",
+        "Model distributions across the capital stack and hurdles.",
+    ),
+}
@@ -0,0 +1,153 @@
+# app/engines/model_registry.py
+from __future__ import annotations
+import hashlib, os, pickle, threading, time
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+# In-process registry for model artifacts (market_prediction etc.).
+# Each (name, version) is loaded once per process and served from memory. The file is
+# re-checked at most every check_interval_s: a changed (mtime, size) triggers a content
+# hash, and only a changed hash triggers a reload. The new artifact is fully loaded and
+# validated before it replaces the old one, so readers never see a half-loaded model and a
+# bad file never evicts a good one.
+# An artifact may be registered as several candidate paths in order of preference (e.g. a
+# native export before the legacy pickle); the first that exists is picked at each
+# re-check, so dropping in the preferred file switches over without a restart.
+
+def pickle_loader(path: str) -> Any:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+class _Entry:
+    def __init__(self, paths: Tuple[str, ...], loader: Callable[[str], Any], validate: Optional[Callable[[Any], bool]]):
+        self.paths = paths
+        self.path = paths[0]          # the candidate last found on disk
+        self.loader = loader
+        self.validate = validate
+        self.model: Any = None
+        self.stamp: Optional[Tuple[str, int, int]] = None
+        self.sha256: Optional[str] = None
+        self.checked = float("-inf")
+        self.loaded_at: Optional[float] = None
+        self.load_ms: Optional[float] = None
+        self.loads = 0
+        self.hits = 0
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "loaded": self.model is not None,
+            "sha256": self.sha256,
+            "loaded_at": self.loaded_at,
+            "load_ms": self.load_ms,
+            "loads": self.loads,
+            "hits": self.hits,
+            "error": self.error,
+        }
+
+class ModelRegistry:
+    def __init__(self, check_interval_s: float = 5.0):
+        self.check_interval_s = float(check_interval_s)
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._defaults: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, version: str, path: Union[str, Sequence[str]], *,
+                 loader: Callable[[str], Any] = pickle_loader,
+                 validate: Optional[Callable[[Any], bool]] = None,
+                 default: bool = False) -> None:
+        """Declare an artifact (one path, or candidates in order of preference); nothing is read until the first get()."""
+        paths = (path,) if isinstance(path, str) else tuple(path)
+        with self._lock:
+            cur = self._entries.get((name, version))
+            if cur is None or cur.paths != paths or cur.loader is not loader:
+                self._entries[(name, version)] = _Entry(paths, loader, validate)
+            if default or name not in self._defaults:
+                self._defaults[name] = version
+
+    def versions(self, name: str) -> Dict[str, str]:
+        return {v: e.path for (n, v), e in self._entries.items() if n == name}
+
+    def default_version(self, name: str) -> Optional[str]:
+        return self._defaults.get(name)
+
+    def get(self, name: str, version: Optional[str] = None) -> Tuple[Any, Optional[str]]:
+        """(model or None, version served). None when the artifact is missing or invalid."""
+        version = version or self._defaults.get(name)
+        entry = self._entries.get((name, version)) if version else None
+        if entry is None:
+            return None, version
+        now = time.monotonic()
+        if now - entry.checked >= self.check_interval_s:
+            self._refresh(entry, now)
+        entry.hits += 1
+        return entry.model, version
+
+    def fingerprint(self, name: str, version: Optional[str] = None) -> Optional[str]:
+        """sha256 of the artifact get() would serve now (None if none is usable); re-checks the file like get()."""
+        version = version or self._defaults.get(name)
+        entry = self._entries.get((name, version)) if version else None
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if now - entry.checked >= self.check_interval_s:
+            self._refresh(entry, now)
+        return entry.sha256 if entry.model is not None else None
+
+    def _refresh(self, entry: _Entry, now: float) -> None:
+        with entry.lock:
+            if now - entry.checked < self.check_interval_s:
+                return   # another thread just did it
+            entry.checked = now
+            for path in entry.paths:
+                try:
+                    st = os.stat(path)
+                    break
+                except OSError:
+                    continue
+            else:
+                entry.error = "missing"
+                return   # keep serving whatever was loaded last
+            stamp = (path, st.st_mtime_ns, st.st_size)
+            if stamp == entry.stamp and entry.model is not None:
+                return
+            try:
+                digest = _sha256(path)
+                if digest == entry.sha256 and path == entry.path and entry.model is not None:
+                    entry.stamp = stamp      # touched, not changed
+                    return
+                t0 = time.perf_counter()
+                model = entry.loader(path)
+                if entry.validate is not None and not entry.validate(model):
+                    raise ValueError("artifact failed validation")
+                entry.load_ms = (time.perf_counter() - t0) * 1000.0
+            except Exception as e:
+                entry.error = f"{type(e).__name__}: {e}"
+                return
+            # swap in one assignment; readers hold either the old or the new model
+            entry.model, entry.stamp, entry.sha256, entry.path = model, stamp, digest, path
+            entry.loaded_at, entry.error = time.time(), None
+            entry.loads += 1
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Force a re-check on next get() (all entries, or one model name)."""
+        for (n, _v), e in self._entries.items():
+            if name is None or n == name:
+                e.checked = float("-inf")
+
+    def info(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for (n, v), e in sorted(self._entries.items()):
+            out.setdefault(n, {"default": self._defaults.get(n), "versions": {}})["versions"][v] = e.info()
+        return {"check_interval_s": self.check_interval_s, "models": out}
+
+# process-wide registry
+registry = ModelRegistry()
@@ -0,0 +1,138 @@
+# app/engines/workers.py
+from __future__ import annotations
+import multiprocessing, os, threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Shared process pool for CPU-heavy engine work (batch valuation, etc.). Sized once to the
+# usable cores and only replaced when it breaks (a worker died): callers share it, and a
+# caller's max_workers bounds how much of it that call occupies (see fan_out).
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_SIZE = 0
+_LOCK = threading.Lock()
+
+# Shared thread pool for I/O-bound fan-out (comps providers, etc.)
+_IO_POOL: Optional[ThreadPoolExecutor] = None
+_IO_POOL_SIZE = 32
+
+def _after_fork_in_child() -> None:
+    # A forked child inherits the pool objects but none of their threads/processes:
+    # anything submitted there would never run. Drop them; they are rebuilt on demand.
+    global _POOL, _POOL_SIZE, _IO_POOL, _LOCK
+    _POOL, _POOL_SIZE, _IO_POOL = None, 0, None
+    _LOCK = threading.Lock()    # may have been held by another parent thread at fork time
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+def available_cpus() -> int:
+    """Cores this process may actually run on (respects taskset/cgroup affinity)."""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except Exception:
+        return max(1, os.cpu_count() or 1)
+
+def mp_context() -> Any:
+    # Never fork the (threaded) server process: a forked worker would inherit locks and
+    # pool objects mid-use. forkserver/spawn workers start clean and import what they need.
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+def process_pool() -> ProcessPoolExecutor:
+    """Lazily create the shared pool (one worker per usable core). Reused across requests to avoid spawn cost."""
+    global _POOL, _POOL_SIZE
+    with _LOCK:
+        if _POOL is None:
+            _POOL_SIZE = available_cpus()
+            _POOL = ProcessPoolExecutor(max_workers=_POOL_SIZE, mp_context=mp_context())
+        return _POOL
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    # a broken pool rejects every later submit; drop it so the next caller gets a fresh one
+    global _POOL, _POOL_SIZE
+    with _LOCK:
+        if _POOL is pool:
+            _POOL, _POOL_SIZE = None, 0
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def io_pool() -> ThreadPoolExecutor:
+    """Lazily created thread pool for blocking I/O (network/disk providers). Threads, not processes."""
+    global _IO_POOL
+    with _LOCK:
+        if _IO_POOL is None:
+            _IO_POOL = ThreadPoolExecutor(max_workers=_IO_POOL_SIZE, thread_name_prefix="engine-io")
+        return _IO_POOL
+
+def shutdown() -> None:
+    global _POOL, _POOL_SIZE, _IO_POOL
+    with _LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True, cancel_futures=True)
+        if _IO_POOL is not None:
+            _IO_POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL, _POOL_SIZE, _IO_POOL = None, 0, None
+
+def fan_out(fn: Callable[[Any], Any],
+            items: Iterable[Tuple[int, Any]],
+            *,
+            ordered: bool = True,
+            max_workers: Optional[int] = None) -> Iterator[Tuple[int, Any, Optional[BaseException]]]:
+    """
+    Run fn(item) for each (index, item) on the shared process pool.
+    Yields (index, result, error) in input order, or as they complete when ordered=False.
+    At most max_workers items (capped at the usable cores) are in the pool at once.
+    With a single worker (or a single item) runs inline — no pickling round-trip.
+    If a worker dies, the items in the pool at the time yield BrokenProcessPool and the
+    rest continue on a fresh pool.
+    """
+    work: List[Tuple[int, Any]] = list(items)
+    workers = min(max(1, int(max_workers or available_cpus())), available_cpus(), max(1, len(work)))
+    if workers == 1:
+        for i, item in work:
+            try:
+                yield i, fn(item), None
+            except Exception as e:
+                yield i, None, e
+        return
+
+    pending = iter(enumerate(work))
+    inflight: Dict[Future, Tuple[int, int, ProcessPoolExecutor]] = {}    # future → (position, index, pool)
+    ready: Dict[int, Tuple[int, Any, Optional[BaseException]]] = {}
+    next_pos = 0
+
+    def submit_next() -> None:
+        nxt = next(pending, None)
+        if nxt is None:
+            return
+        pos, (i, item) = nxt
+        pool = process_pool()
+        try:
+            fut = pool.submit(fn, item)
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            pool = process_pool()
+            fut = pool.submit(fn, item)
+        inflight[fut] = (pos, i, pool)
+
+    for _ in range(workers):
+        submit_next()
+    while inflight:
+        done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+        for fut in done:
+            pos, i, pool = inflight.pop(fut)
+            try:
+                out = (i, fut.result(), None)
+            except BrokenProcessPool as e:
+                _discard_pool(pool)
+                out = (i, None, e)
+            except Exception as e:
+                out = (i, None, e)
+            submit_next()
+            if not ordered:
+                yield out
+            else:
+                ready[pos] = out
+        while next_pos in ready:
+            yield ready.pop(next_pos)
+            next_pos += 1